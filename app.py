@@ -1,14 +1,53 @@
+import atexit
+import csv
+import functools
+import hashlib
 import html
+import inspect
+import io
+import itertools
 import json
+import mmap
+import multiprocessing
 import os
 import random
-from datetime import datetime
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timezone
 from pathlib import Path
+from types import MappingProxyType
 from urllib.parse import quote_plus
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from workers import WORD_PATTERN, compute_minhash_chunk, match_entity_chunk
 
 st.set_page_config(page_title="Auto News Intelligence", page_icon="🚗", layout="wide")
 
@@ -30,10 +69,213 @@ CATEGORY_COLORS = {
 
 CATEGORY_NAMES = list(CATEGORY_COLORS.keys())
 
+SOURCE_ALIASES = {
+    "et auto": "The Economic Times",
+    "etauto": "The Economic Times",
+    "etauto.com": "The Economic Times",
+    "economic times": "The Economic Times",
+    "livemint": "mint",
+    "times of india": "The Times of India",
+    "car blog india car & bike news, comparisons & upcoming launches": "Car Blog India",
+    "motoroids | quality website for daily auto news, in-depth car and bike reviews from india": "Motoroids",
+    "rohit nalawade, principal correspondent, evo india": "evo India",
+}
 
-def apply_global_css() -> None:
-    st.markdown(
-        """
+BRAND_DICTIONARY = {
+    "Maruti Suzuki": [
+        "maruti", "maruti suzuki", "msil", "maruti swift", "suzuki swift", "dzire", "baleno", "brezza", "ertiga",
+        "fronx", "grand vitara", "e vitara", "wagonr", "jimny", "invicto", "nexa",
+    ],
+    "Tata Motors": [
+        "tata motors", "tata passenger", "tpem", "nexon", "tata punch", "punch ev", "harrier", "tata safari",
+        "tiago", "tigor", "altroz", "curvv", "tata sierra",
+    ],
+    "Mahindra": [
+        "mahindra", "scorpio", "scorpio n", "mahindra thar", "thar roxx", "bolero", "xuv700", "xuv 7xo",
+        "xuv 3xo", "xuv400", "mahindra be 6", "xev 9e", "xev 9s",
+    ],
+    "Hyundai": ["hyundai", "hmil", "creta", "hyundai venue", "verna", "exter", "alcazar", "hyundai aura", "ioniq"],
+    "Kia": ["kia", "seltos", "sonet", "carens", "syros", "kia carnival", "ev6", "ev9"],
+    "Toyota": [
+        "toyota", "toyota kirloskar", "tkm", "innova", "innova hycross", "fortuner", "hyryder", "glanza",
+        "rumion", "urban cruiser", "camry", "hilux",
+    ],
+    "Honda": ["honda cars", "honda car", "honda amaze", "honda city", "honda elevate", "hmsi", "honda motorcycle"],
+    "JSW MG Motor": [
+        "mg motor", "jsw mg", "comet ev", "mg windsor", "windsor ev", "mg hector", "mg astor", "zs ev", "gloster",
+        "cyberster",
+    ],
+    "Skoda Volkswagen": [
+        "skoda", "kylaq", "kushaq", "slavia", "kodiaq", "volkswagen", "vw", "taigun", "virtus", "tiguan",
+    ],
+    "Renault Nissan": ["renault", "kiger", "triber", "kwid", "nissan", "magnite"],
+    "BYD": ["byd", "atto 3", "byd seal", "sealion", "emax"],
+    "Tesla": ["tesla", "tesla model y", "tesla model 3"],
+    "VinFast": ["vinfast", "vf6", "vf7"],
+    "Citroen": ["citroen", "basalt", "c3 aircross"],
+    "Mercedes-Benz": ["mercedes", "mercedes benz", "mercedes-benz"],
+    "BMW": ["bmw", "mini cooper"],
+    "Audi": ["audi"],
+    "JLR": ["jlr", "jaguar land rover", "land rover", "range rover", "land rover defender"],
+    "Ola Electric": ["ola electric", "ola s1", "roadster x"],
+    "Ather": ["ather", "ather energy", "rizta", "450x"],
+    "TVS Motor": ["tvs", "tvs motor", "iqube", "tvs apache", "tvs jupiter", "ntorq"],
+    "Bajaj Auto": ["bajaj", "bajaj auto", "pulsar", "chetak", "dominar", "freedom 125"],
+    "Hero MotoCorp": ["hero motocorp", "hero splendor", "hero vida", "vida vx2", "vida v2", "xpulse", "karizma"],
+    "Royal Enfield": [
+        "royal enfield", "eicher motors", "classic 350", "bullet 350", "re himalayan", "enfield himalayan",
+        "hunter 350", "meteor 350",
+    ],
+    "Ashok Leyland": ["ashok leyland", "switch mobility"],
+    "Eicher VECV": ["vecv", "volvo eicher", "eicher trucks"],
+}
+ENTITY_MATCH_FIELDS = ("title", "content_preview")
+ENTITY_MATCH_CACHE_ITEMS = 200000
+STORY_TEXT_FIELDS = ("summary",)
+ARTICLE_TEXT_FIELDS = ("content_preview",)
+TEXT_INLINE_CHARS = 80
+
+ARTICLE_SCHEMA = {
+    "id": ("str", "", True),
+    "title": ("str", "", True),
+    "source": ("source", "Unknown", True),
+    "published_at": ("str", "", True),
+    "url": ("str", "", True),
+    "content_preview": ("str", "", False),
+    "auto_score": ("float", 0.0, True),
+    "category_confidence": ("float", 0.0, True),
+    "is_representative": ("bool", False, False),
+}
+STORY_SCHEMA = {
+    "sub_cluster_id": ("str", "", True),
+    "representative_title": ("str", "", True),
+    "summary": ("str", "", False),
+    "story_count": ("int", 0, False),
+}
+STATS_SCHEMA = {
+    "total_input": ("int", None, True),
+    "total_automobile": ("int", None, True),
+    "unique_sources": ("int", None, False),
+    "similarity_threshold": ("float", 0.85, False),
+}
+
+RESULTS_MANIFEST_NAME = "manifest.json"
+RESULTS_REFRESH_SECONDS = 300
+RESULTS_FETCH_TIMEOUT_SECONDS = 30
+REMOTE_READ_BYTES = 1024 * 1024
+DATA_WATCH_SECONDS = 5.0
+DATA_FIRST_LOAD_TIMEOUT_SECONDS = 120
+AUTO_REFRESH_SECONDS = 30
+DATA_LIVE_SECONDS = 3600
+SNAPSHOT_KEEP = 5
+SHARED_SNAPSHOT_KEEP = 3
+SHARED_SNAPSHOT_POINTER = "CURRENT"
+SHARED_SNAPSHOT_ARRAYS = ("article_offsets", "article_brands", "related_neighbors", "related_scores")
+DERIVED_CACHE_NAME = "auto-news-dashboard"
+DERIVED_CACHE_MAX_MB = 512
+DERIVED_CACHE_STAGING_SECONDS = 3600
+DERIVED_CACHE_SOURCES = ("app.py", "workers.py")
+SNAPSHOT_FEED_ROWS = 8
+SNAPSHOT_STORIES_PER_CATEGORY = 100
+SNAPSHOT_CSS = """
+<style>
+body { margin: 0; font-family: "Source Sans Pro", "Segoe UI", sans-serif; color: #0f172a; }
+.stApp { min-height: 100vh; }
+.block-container { max-width: 1400px; margin: 0 auto; }
+.snapshot-caption { color: #64748b; font-size: 0.8rem; margin-bottom: 0.4rem; }
+.snapshot-grid-4 { display: grid; grid-template-columns: repeat(4, minmax(0, 1fr)); gap: 0.5rem; }
+.snapshot-grid-2 { display: grid; grid-template-columns: repeat(2, minmax(0, 1fr)); gap: 0.5rem; }
+.snapshot-columns { display: grid; grid-template-columns: minmax(0, 2fr) minmax(0, 1fr); gap: 1rem; }
+.snapshot-story { background: #ffffff; border: 1px solid #e2e8f0; border-radius: 8px; margin: 0.3rem 0; padding: 0.4rem 0.7rem; }
+.snapshot-story summary { cursor: pointer; font-weight: 600; font-size: 0.86rem; }
+.snapshot-story p, .snapshot-story li { font-size: 0.8rem; color: #334155; }
+@media (max-width: 900px) {
+    .snapshot-grid-4, .snapshot-grid-2, .snapshot-columns { grid-template-columns: minmax(0, 1fr); }
+}
+</style>
+"""
+CUBE_AXES = ("category", "source", "day")
+TIMELINE_TOP_SOURCES = 8
+
+TRENDING_HALF_LIFE_HOURS = 12.0
+TRENDING_SOURCE_WEIGHT = 2.0
+TRENDING_LIMIT = 8
+TRENDING_PRUNE_EPSILON = 1e-3
+TRENDING_MAX_ARTICLES = 200000
+TRENDING_VERSION_HISTORY = 16
+
+RANKING_FEATURES = {
+    "sources": ("Source count", 1.0),
+    "auto_score": ("Relevance score", 2.0),
+    "confidence": ("Category confidence", 2.0),
+    "recency": ("Recency", 0.0),
+    "diversity": ("Source diversity", 0.0),
+    "velocity": ("Trending velocity", 0.0),
+}
+RANKING_WEIGHT_MAX = 10.0
+RANKING_RECENCY_HALF_LIFE_HOURS = 24.0
+
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_COLUMNS = {
+    "Stories": [
+        "story_id", "category", "title", "sources", "source_count", "article_count",
+        "latest_published", "score", "url",
+    ],
+    "Articles": [
+        "article_id", "story_id", "category", "source", "title", "published_at",
+        "auto_score", "category_confidence", "url",
+    ],
+}
+SESSION_STALE_SECONDS = 3600
+INTERACTION_LOG_MAX_MB = 64
+INTERACTION_LOG_FLUSH_SECONDS = 1.0
+INTERACTION_LOG_BUFFER = 10000
+INTERACTION_STATE_KEYS = (
+    "view_mode",
+    "recluster_",
+    "rank_weight_",
+    "facet_",
+    "grid_",
+    "timeline_",
+    "scatter_filter",
+    "detailed_story_category",
+    "comparison_baseline",
+    "export_level",
+)
+INTERACTION_TRIGGER_KEYS = ("rank_weight_reset",)
+INTERACTION_OUTCOMES = {"RerunException": "rerun", "StopException": "stop"}
+COMPARISON_ROW_LIMIT = 500
+
+RENDER_BUDGET_SECONDS = {"scatter": 0.8, "detailed_stories": 0.8}
+RENDER_COST_SECONDS = {"scatter": 0.0004, "detailed_stories": 0.004}
+RENDER_MIN_ITEMS = {"scatter": 200, "detailed_stories": 25}
+RENDER_COST_SMOOTHING = 0.3
+
+MINHASH_PERMUTATIONS = 128
+MINHASH_BATCH_SIZE = 256
+MINHASH_SEED = 2026
+MINHASH_CACHE_ITEMS = 100000
+
+RELATED_STORIES_K = 5
+RELATED_MIN_TOKEN = 3
+RELATED_TITLE_WEIGHT = 3
+RELATED_MAX_DF = 200
+RELATED_MAX_DF_RATIO = 0.05
+RELATED_MIN_SIMILARITY = 0.15
+
+WORKER_CHUNK_ITEMS = 1000
+WORKER_JOB_HISTORY = 4
+WORKER_POLL_SECONDS = 1.0
+RECLUSTER_CACHE_ENTRIES = 4
+
+CACHE_BUDGET_MB = 1024
+CACHE_EVICTION_WINDOW = 8
+
+NON_PRINTABLE_PATTERN = re.compile(r"[^\x20-\x7f\n\t]+")
+
+
+def get_global_css() -> str:
+    return """
         <style>
         .stApp {
             background: radial-gradient(circle at top right, #e8eefb 0%, #f3f6fc 38%, #f8fafc 100%);
@@ -373,9 +615,11 @@ def apply_global_css() -> None:
             }
         }
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def apply_global_css() -> None:
+    st.markdown(get_global_css(), unsafe_allow_html=True)
 
 
 def subtle_hr() -> None:
@@ -410,8 +654,7 @@ def safe_float(value, default: float = 0.0) -> float:
 def clean_text(text: str) -> str:
     if text is None:
         return ""
-    text = str(text)
-    return "".join(ch for ch in text if ord(ch) < 128 and (ord(ch) >= 32 or ch in "\n\t")).strip()
+    return NON_PRINTABLE_PATTERN.sub("", str(text)).strip()
 
 
 def parse_datetime(value: str):
@@ -444,110 +687,931 @@ def format_run_at(run_at_value) -> str:
     return dt.strftime("%d %b %Y, %H:%M")
 
 
-def load_data():
+def decode_json_bytes(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def read_results_file(path: Path):
+    try:
+        return decode_json_bytes(path.read_bytes())
+    except (ValueError, OSError):
+        return None
+
+
+def get_shard_paths(directory: Path, manifest):
+    shard_names = manifest.get("shards") if isinstance(manifest, dict) else None
+    if isinstance(shard_names, list):
+        return [directory / str(name) for name in shard_names]
+    return sorted(path for path in directory.glob("*.json") if path.name != RESULTS_MANIFEST_NAME)
+
+
+def decode_shards(raw_shards):
+    # Parsed in this process: sending decoded shards back from the worker
+    # pool costs more in pickling than the parse itself.
+    shards = []
+    for raw in raw_shards:
+        try:
+            shards.append(decode_json_bytes(raw))
+        except ValueError:
+            # Malformed or non-UTF-8 shards are skipped like any non-object.
+            continue
+    return shards
+
+
+def merge_results_shards(manifest, shards):
+    merged = {
+        "run_at": manifest.get("run_at"),
+        "stats": dict(manifest.get("stats") or {}),
+        "categories": {},
+    }
+    for shard in shards:
+        if not isinstance(shard, dict):
+            continue
+        if not merged["run_at"]:
+            merged["run_at"] = shard.get("run_at")
+        if not merged["stats"] and isinstance(shard.get("stats"), dict):
+            merged["stats"] = dict(shard["stats"])
+
+        for category_name, category_payload in get_categories(shard).items():
+            stories = get_story_list(category_payload)
+            target = merged["categories"].setdefault(
+                category_name,
+                {"total_articles": 0, "unique_stories": 0, "stories": []},
+            )
+            target["stories"].extend(stories)
+            target["total_articles"] += safe_int(
+                category_payload.get("total_articles"),
+                default=sum(len(story.get("articles") or []) for story in stories),
+            )
+            target["unique_stories"] += safe_int(category_payload.get("unique_stories"), default=len(stories))
+    return merged
+
+
+def load_results_directory(directory: Path):
+    manifest_path = directory / RESULTS_MANIFEST_NAME
+    manifest = read_results_file(manifest_path) if manifest_path.exists() else {}
+    if not isinstance(manifest, dict):
+        return None
+
+    try:
+        raw_shards = [path.read_bytes() for path in get_shard_paths(directory, manifest)]
+    except OSError:
+        return None
+    shards = [shard for shard in decode_shards(raw_shards) if isinstance(shard, dict)]
+    if not shards:
+        return None
+    return merge_results_shards(manifest, shards)
+
+
+def load_results(path: Path):
+    if path.is_dir():
+        return load_results_directory(path)
+    return read_results_file(path)
+
+
+def get_remote_cache_path() -> Path:
+    cache_dir = clean_text(os.getenv("RESULTS_CACHE_DIR", ""))
+    base_dir = Path(cache_dir).expanduser() if cache_dir else Path(tempfile.gettempdir()) / "auto-news-dashboard"
+    return base_dir / "results.json"
+
+
+def write_atomically(path: Path, chunks) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(mode="wb", dir=path.parent, prefix=f".{path.name}.", delete=False) as f:
+        try:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def read_remote_meta(cache_path: Path):
+    meta = read_results_file(cache_path.with_suffix(".meta.json"))
+    try:
+        stat = cache_path.stat()
+    except OSError:
+        return {}
+    # Body and meta are replaced one after the other; meta describing a
+    # different body is ignored so the next fetch is unconditional.
+    if not isinstance(meta, dict) or (meta.get("size"), meta.get("mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+        return {}
+    return meta
+
+
+def fetch_remote_results(url: str, cache_path: Path, timeout: float = RESULTS_FETCH_TIMEOUT_SECONDS) -> str:
+    meta = read_remote_meta(cache_path)
+    headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+    if meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return "not_modified"
+        raise
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, partial_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.")
+    partial = Path(partial_name)
+    try:
+        with response, os.fdopen(fd, "wb") as output:
+            decompressor = zlib.decompressobj(wbits=31) if response.headers.get("Content-Encoding") == "gzip" else None
+            expected_bytes = safe_int(response.headers.get("Content-Length"), default=-1)
+            received_bytes = 0
+            for chunk in iter(lambda: response.read(REMOTE_READ_BYTES), b""):
+                received_bytes += len(chunk)
+                output.write(decompressor.decompress(chunk) if decompressor is not None else chunk)
+            # read(n) returns short instead of raising when the server closes early.
+            if 0 <= expected_bytes != received_bytes:
+                raise ValueError("truncated response body")
+            if decompressor is not None:
+                output.write(decompressor.flush())
+                if not decompressor.eof:
+                    raise ValueError("truncated gzip response body")
+            output.flush()
+            os.fsync(output.fileno())
+            headers = response.headers
+        if read_results_file(partial) is None:
+            raise ValueError("response body is not valid JSON")
+        stat = partial.stat()
+        os.replace(partial, cache_path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    meta = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    write_atomically(cache_path.with_suffix(".meta.json"), [json.dumps(meta).encode("utf-8")])
+    return "updated"
+
+
+def run_remote_sync(state) -> None:
+    while True:
+        try:
+            state["status"] = fetch_remote_results(state["url"], state["cache_path"])
+            state["error"] = None
+            if state["status"] == "updated":
+                for wake in state["listeners"]:
+                    wake.set()
+        except Exception as exc:
+            # Anything escaping here would end the sync thread for good.
+            state["status"] = "failed"
+            state["error"] = str(exc) or exc.__class__.__name__
+        state["checked_at"] = datetime.now()
+        state["wake"].wait(state["interval"])
+        state["wake"].clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_remote_sync(url: str, cache_path: str):
+    state = {
+        "url": url,
+        "cache_path": Path(cache_path),
+        "interval": max(safe_int(os.getenv("RESULTS_REFRESH_SECONDS"), default=RESULTS_REFRESH_SECONDS), 5),
+        "status": "pending",
+        "error": None,
+        "checked_at": None,
+        "wake": threading.Event(),
+        "listeners": [],
+    }
+    threading.Thread(target=run_remote_sync, args=(state,), name="results-remote-sync", daemon=True).start()
+    return state
+
+
+def get_configured_remote_sync():
+    remote_url = clean_text(os.getenv("RESULTS_JSON_URL", ""))
+    if not remote_url:
+        return None
+    return get_remote_sync(remote_url, str(get_remote_cache_path()))
+
+
+def resolve_results_path():
+    remote_sync = get_configured_remote_sync()
+    if remote_sync is not None:
+        cache_path = remote_sync["cache_path"]
+        return cache_path if cache_path.exists() else None
+
     env_results_path = clean_text(os.getenv("RESULTS_JSON_PATH", ""))
     if env_results_path:
         configured_path = Path(env_results_path).expanduser()
         if configured_path.exists():
-            try:
-                with configured_path.open("r", encoding="utf-8") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, OSError):
-                return None
+            return configured_path
 
     local_path = Path("results.json")
     app_dir_path = Path(__file__).resolve().parent / "results.json"
     results_path = local_path if local_path.exists() else app_dir_path
     if not results_path.exists():
         return None
+    return results_path
+
+
+def get_results_files(results_path: Path):
+    if not results_path.is_dir():
+        return [results_path]
+    # The files the loader reads: the manifest may list shards outside the
+    # top level of the directory.
+    manifest_path = results_path / RESULTS_MANIFEST_NAME
+    manifest = read_results_file(manifest_path) if manifest_path.exists() else {}
+    paths = get_shard_paths(results_path, manifest)
+    return [manifest_path, *paths] if manifest_path.exists() else paths
+
+
+def get_data_version(results_path):
+    if results_path is None:
+        return None
     try:
-        with results_path.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
+        parts = [str(results_path.resolve())]
+        for path in get_results_files(results_path):
+            stat = path.stat()
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+    except OSError:
+        return None
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def load_data(results_path=None):
+    results_path = results_path or resolve_results_path()
+    if results_path is None:
         return None
+    return load_results(results_path)
+
+
+def coerce_str(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError(type(value).__name__)
+
+
+def coerce_float(value):
+    if isinstance(value, float):
+        return value
+    if isinstance(value, bool):
+        raise TypeError("bool")
+    return float(value)
+
+
+def coerce_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    coerced = float(value)
+    if not coerced.is_integer():
+        raise ValueError(value)
+    return int(coerced)
+
+
+def coerce_bool(value):
+    if isinstance(value, bool):
+        return value
+    if value in (0, 1, "true", "false", "True", "False"):
+        return value in (1, "true", "True")
+    raise ValueError(value)
+
+
+def coerce_source(value):
+    return normalize_source(coerce_str(value))
+
+
+SCHEMA_COERCERS = {
+    "str": coerce_str,
+    "float": coerce_float,
+    "int": coerce_int,
+    "bool": coerce_bool,
+    "source": coerce_source,
+}
+
+
+def compile_schema(scope: str, schema):
+    return tuple(
+        (field, SCHEMA_COERCERS[kind], default, required, f"{scope}.{field}")
+        for field, (kind, default, required) in schema.items()
+    )
+
+
+def apply_schema(item, compiled, issues) -> None:
+    for field, coerce, default, required, label in compiled:
+        value = item.get(field)
+        if value is None:
+            if required:
+                issues[f"{label} missing"] += 1
+            item[field] = default
+            continue
+        try:
+            coerced = coerce(value)
+        except (TypeError, ValueError):
+            issues[f"{label} malformed"] += 1
+            item[field] = default
+            continue
+        if type(coerced) is not type(value):
+            issues[f"{label} coerced"] += 1
+        item[field] = coerced
+
+
+def validate_payload(data):
+    issues = Counter()
+    if not isinstance(data, dict):
+        issues["payload not an object"] += 1
+        return None, {"categories": 0, "stories": 0, "articles": 0, "issues": dict(issues)}
+
+    article_schema = compile_schema("article", ARTICLE_SCHEMA)
+    story_schema = compile_schema("story", STORY_SCHEMA)
+    stats = data.get("stats")
+    if not isinstance(stats, dict):
+        if stats is not None:
+            issues["stats not an object"] += 1
+        stats = {}
+    stats = dict(stats)
+    apply_schema(stats, compile_schema("stats", STATS_SCHEMA), issues)
+
+    raw_categories = data.get("categories")
+    if not isinstance(raw_categories, dict):
+        issues["categories not an object"] += 1
+        raw_categories = {}
+
+    categories = {}
+    story_total = 0
+    article_total = 0
+    sources = set()
+    for category_name, category_payload in raw_categories.items():
+        if not isinstance(category_payload, dict):
+            issues["category not an object"] += 1
+            continue
+        raw_stories = category_payload.get("stories")
+        if not isinstance(raw_stories, list):
+            issues["category.stories not a list"] += 1
+            raw_stories = []
+
+        stories = []
+        category_articles = 0
+        for story in raw_stories:
+            if not isinstance(story, dict):
+                issues["story not an object"] += 1
+                continue
+            raw_articles = story.get("articles")
+            if not isinstance(raw_articles, list):
+                issues["story.articles not a list"] += 1
+                raw_articles = []
+            articles = []
+            for article in raw_articles:
+                if not isinstance(article, dict):
+                    issues["article not an object"] += 1
+                    continue
+                apply_schema(article, article_schema, issues)
+                sources.add(article["source"])
+                articles.append(article)
+            story["articles"] = articles
+            apply_schema(story, story_schema, issues)
+
+            story_sources = story.get("sources")
+            if story_sources is not None and not isinstance(story_sources, list):
+                issues["story.sources not a list"] += 1
+                story_sources = None
+            if story_sources:
+                story["sources"] = sorted({normalize_source(source) for source in story_sources})
+            else:
+                story["sources"] = sorted({article["source"] for article in articles})
+            if story["story_count"] <= 0:
+                story["story_count"] = max(len(story["sources"]), 1)
+            stories.append(story)
+            category_articles += len(articles)
+
+        for field, actual in (("total_articles", category_articles), ("unique_stories", len(stories))):
+            if safe_int(category_payload.get(field), default=-1) != actual:
+                issues[f"category.{field} reconciled"] += 1
+        display_name = clean_text(str(category_name)) or "Uncategorized"
+        merged = categories.get(display_name)
+        if merged is not None:
+            # Keys that clean to the same name are one category to every
+            # renderer, so their stories are merged rather than overwritten.
+            issues["category name merged"] += 1
+            merged["stories"].extend(stories)
+            merged["total_articles"] += category_articles
+            merged["unique_stories"] = len(merged["stories"])
+        else:
+            categories[display_name] = {
+                "total_articles": category_articles,
+                "unique_stories": len(stories),
+                "stories": stories,
+            }
+        story_total += len(stories)
+        article_total += category_articles
+
+    fallbacks = {"total_input": article_total, "total_automobile": article_total, "unique_sources": len(sources)}
+    for field, fallback in fallbacks.items():
+        if stats[field] is None:
+            stats[field] = fallback
+
+    run_at = data.get("run_at")
+    if run_at is not None and not isinstance(run_at, str):
+        issues["run_at malformed"] += 1
+        run_at = None
+    payload = {"run_at": run_at, "stats": stats, "categories": categories}
+    report = {
+        "categories": len(categories),
+        "stories": story_total,
+        "articles": article_total,
+        "issues": dict(sorted(issues.items())),
+    }
+    return payload, report
+
+
+@st.cache_resource(show_spinner=False)
+def get_cache_manager():
+    budget_mb = safe_float(os.getenv("CACHE_BUDGET_MB"), default=CACHE_BUDGET_MB)
+    return {
+        "lock": threading.Lock(),
+        "entries": OrderedDict(),
+        "computing": {},
+        "bytes": 0,
+        "pinned": {},
+        "budget": int(max(budget_mb, 1.0) * 1024 * 1024),
+        "stats": {},
+    }
+
+
+def get_cache_stats(manager, namespace: str):
+    return manager["stats"].setdefault(namespace, {"hits": 0, "misses": 0, "evictions": 0})
+
+
+def get_shared_object_ids(inputs):
+    # Cached views reuse most of the dataset they were derived from; only the
+    # objects they add should count against the budget.
+    shared = set()
+    for value in inputs:
+        shared.add(id(value))
+        if not isinstance(value, (dict, MappingProxyType)):
+            continue
+        shared.update(id(item) for item in value.values())
+        table = value if "articles" in value else value.get("table")
+        if table is not None:
+            shared.update(id(item) for item in table.values())
+            shared.update(id(item) for item in table["stories"])
+            shared.update(id(item) for item in table["articles"])
+        shared.update(id(item) for item in value.get("ranked_stories", ()))
+    return shared
+
+
+def evict_cache_entry(manager, key) -> None:
+    entry = manager["entries"].pop(key)
+    manager["bytes"] -= entry["bytes"]
+    get_cache_stats(manager, entry["namespace"])["evictions"] += 1
+
+
+def enforce_cache_budget(manager) -> None:
+    budget = manager["budget"] - sum(manager["pinned"].values())
+    while manager["entries"] and manager["bytes"] > budget:
+        # Among the least recently used entries, drop the one that is cheapest
+        # to rebuild per byte it frees.
+        candidates = list(itertools.islice(manager["entries"].items(), CACHE_EVICTION_WINDOW))
+        key, _ = min(candidates, key=lambda item: item[1]["cost"] / max(item[1]["bytes"], 1))
+        evict_cache_entry(manager, key)
+
+
+def lookup_cache_entry(manager, key):
+    entry = manager["entries"].get(key)
+    if entry is not None:
+        manager["entries"].move_to_end(key)
+        get_cache_stats(manager, entry["namespace"])["hits"] += 1
+    return entry
+
+
+def store_cache_entry(manager, key, namespace: str, version, value, size: int, cost: float, max_entries) -> None:
+    with manager["lock"]:
+        if key in manager["entries"]:
+            evict_cache_entry(manager, key)
+        manager["entries"][key] = {
+            "namespace": namespace,
+            "version": version,
+            "value": value,
+            "bytes": size,
+            "cost": cost,
+        }
+        manager["bytes"] += size
+        if max_entries is not None:
+            keys = [entry_key for entry_key, entry in manager["entries"].items() if entry["namespace"] == namespace]
+            for stale_key in keys[: max(len(keys) - max_entries, 0)]:
+                evict_cache_entry(manager, stale_key)
+        enforce_cache_budget(manager)
+
+
+def managed_cache(namespace: str, max_entries=None, spinner=None, version_arg="version"):
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (namespace,) + tuple(
+                value for name, value in bound.arguments.items() if not name.startswith("_")
+            )
+            manager = get_cache_manager()
+            with manager["lock"]:
+                entry = lookup_cache_entry(manager, key)
+                if entry is not None:
+                    return entry["value"]
+                key_lock = manager["computing"].setdefault(key, threading.Lock())
+
+            with key_lock:
+                with manager["lock"]:
+                    entry = lookup_cache_entry(manager, key)
+                    if entry is not None:
+                        return entry["value"]
+                    get_cache_stats(manager, namespace)["misses"] += 1
+                started = time.perf_counter()
+                try:
+                    if spinner:
+                        with st.spinner(spinner):
+                            value = func(*args, **kwargs)
+                    else:
+                        value = func(*args, **kwargs)
+                    cost = time.perf_counter() - started
+                    inputs = [argument for name, argument in bound.arguments.items() if name.startswith("_")]
+                    size = estimate_size(value, get_shared_object_ids(inputs))
+                    store_cache_entry(
+                        manager, key, namespace, bound.arguments.get(version_arg), value, size, cost, max_entries
+                    )
+                finally:
+                    with manager["lock"]:
+                        manager["computing"].pop(key, None)
+                return value
+
+        return wrapper
+
+    return decorate
+
+
+def update_cache_versions(versions) -> None:
+    versions = list(versions)
+    manager = get_cache_manager()
+    pinned = {
+        version: sum(size for _, size in get_shared_memory_sizes(dataset, version)) for version, dataset in versions
+    }
+    with manager["lock"]:
+        manager["pinned"] = pinned
+        for key, entry in list(manager["entries"].items()):
+            version = entry["version"]
+            if isinstance(version, str) and version.split("@", 1)[0] not in pinned:
+                evict_cache_entry(manager, key)
+        enforce_cache_budget(manager)
+    # Blobs are named after the version that wrote them, but a dataset loaded
+    # from a snapshot can point at an older name, so follow the references.
+    live_ids = {blob_id for _, dataset in versions for blob_id in get_text_blob_ids(dataset["data"])}
+    release_text_blobs(
+        live_ids | {blob_id for blob_id in get_text_blobs()["blobs"] if blob_id.split("@", 1)[0] in pinned}
+    )
+
+
+def render_cache_report() -> None:
+    manager = get_cache_manager()
+    with manager["lock"]:
+        rows = {}
+        for entry in manager["entries"].values():
+            row = rows.setdefault(entry["namespace"], [0, 0])
+            row[0] += 1
+            row[1] += entry["bytes"]
+        stats = {namespace: dict(values) for namespace, values in manager["stats"].items()}
+        cached_bytes = manager["bytes"]
+        pinned_bytes = sum(manager["pinned"].values())
+    st.caption(
+        f"Cache · {format_bytes(cached_bytes)} cached + {format_bytes(pinned_bytes)} datasets "
+        f"of {format_bytes(manager['budget'])} budget"
+    )
+    blobs = list(get_text_blobs()["blobs"].values())
+    match_cache = get_entity_match_cache()
+    signature_cache = get_minhash_signature_cache()
+    st.caption(
+        f"Text blobs · {len(blobs)} mapped · {format_bytes(sum(len(blob) for blob in blobs))} · "
+        f"brand matches {len(match_cache['entries']):,}/{match_cache['limit']:,} · "
+        f"MinHash signatures {len(signature_cache['entries']):,}/{signature_cache['limit']:,} · "
+        f"trending articles {len(get_trending_state()['articles']):,}/{TRENDING_MAX_ARTICLES:,}"
+    )
+    table_rows = [
+        (
+            namespace,
+            rows.get(namespace, [0, 0])[0],
+            format_bytes(rows.get(namespace, [0, 0])[1]),
+            counters["hits"],
+            counters["misses"],
+            counters["evictions"],
+        )
+        for namespace, counters in sorted(stats.items())
+    ]
+    if table_rows:
+        st.dataframe(
+            pd.DataFrame(table_rows, columns=["Cache", "Entries", "Size", "Hits", "Misses", "Evictions"]),
+            hide_index=True,
+            width="stretch",
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def get_text_blobs():
+    return {"lock": threading.Lock(), "blobs": OrderedDict()}
+
+
+def offload_text_fields(data, blob_id: str, path=None) -> None:
+    pending = []
+    for category_payload in get_categories(data).values():
+        for story in get_story_list(category_payload):
+            pending.extend((story, field) for field in STORY_TEXT_FIELDS)
+            for article in story["articles"]:
+                pending.extend((article, field) for field in ARTICLE_TEXT_FIELDS)
+
+    with open(path, "w+b") if path is not None else tempfile.TemporaryFile() as output:
+        offset = 0
+        refs = []
+        for item, field in pending:
+            text = item.get(field)
+            if f"{field}_ref" in item or not isinstance(text, str) or not text:
+                continue
+            encoded = text.encode("utf-8")
+            output.write(encoded)
+            refs.append((item, field, offset, len(encoded)))
+            offset += len(encoded)
+        if not offset:
+            return
+        output.flush()
+        blob = mmap.mmap(output.fileno(), 0, access=mmap.ACCESS_READ)
+
+    register_text_blob(blob_id, blob)
+    for item, field, start, length in refs:
+        item[f"{field}_ref"] = (blob_id, start, length)
+        # A short prefix stays inline so a session still holding a released
+        # version renders a preview instead of nothing.
+        item[field] = item[field][:TEXT_INLINE_CHARS]
+
+
+def register_text_blob(blob_id: str, blob) -> None:
+    store = get_text_blobs()
+    with store["lock"]:
+        store["blobs"][blob_id] = blob
+
+
+def get_text_blob_ids(data):
+    blob_ids = set()
+    for category_payload in get_categories(data).values():
+        for story in get_story_list(category_payload):
+            items = [(story, STORY_TEXT_FIELDS)] + [(article, ARTICLE_TEXT_FIELDS) for article in story["articles"]]
+            for item, fields in items:
+                blob_ids.update(item[f"{field}_ref"][0] for field in fields if f"{field}_ref" in item)
+    return blob_ids
+
+
+def release_text_blobs(live_ids) -> None:
+    store = get_text_blobs()
+    with store["lock"]:
+        for blob_id in [blob_id for blob_id in store["blobs"] if blob_id not in live_ids]:
+            del store["blobs"][blob_id]
+
+
+def drop_text_blob(blob_id: str) -> None:
+    store = get_text_blobs()
+    with store["lock"]:
+        store["blobs"].pop(blob_id, None)
+
+
+def attach_text_blob(blob_id: str, path: Path) -> None:
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size:
+            register_text_blob(blob_id, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def get_long_text(item, field: str):
+    ref = item.get(f"{field}_ref")
+    if ref is None:
+        return item.get(field)
+    blob_id, start, length = ref
+    blob = get_text_blobs()["blobs"].get(blob_id)
+    if blob is None:
+        return item.get(field)
+    return blob[start : start + length].decode("utf-8")
 
 
 def get_categories(data):
-    categories = (data or {}).get("categories") or {}
-    return categories if isinstance(categories, dict) else {}
+    return data["categories"]
 
 
 def get_story_list(category_payload):
-    stories = (category_payload or {}).get("stories") or []
-    return stories if isinstance(stories, list) else []
+    return category_payload["stories"] if category_payload else []
 
 
 def iter_story_articles(data):
     for category_name, category_payload in get_categories(data).items():
         for story in get_story_list(category_payload):
-            for article in story.get("articles") or []:
-                if isinstance(article, dict):
-                    yield category_name, story, article
+            for article in story["articles"]:
+                yield category_name, story, article
 
 
-def normalize_source(source: str) -> str:
+@functools.lru_cache(maxsize=4096)
+def canonical_source(source) -> str:
     source_name = clean_text(source) if source is not None else ""
-    return source_name if source_name else "Unknown"
+    if not source_name:
+        return "Unknown"
+    return SOURCE_ALIASES.get(" ".join(source_name.lower().split()), source_name)
 
 
-def get_date_bounds(data):
-    dates = []
-    for _, _, article in iter_story_articles(data):
-        dt = parse_datetime(article.get("published_at"))
-        if dt:
-            dates.append(dt.date())
-    if not dates:
-        return None, None
-    return min(dates), max(dates)
+def normalize_source(source: str) -> str:
+    if source is not None and not isinstance(source, str):
+        source = str(source)
+    return canonical_source(source)
+
+
+def build_article_table(data):
+    category_codes = {name: code for code, name in enumerate(CATEGORY_NAMES)}
+    source_codes = {}
+    article_category = []
+    article_source = []
+    article_story = []
+    article_day = []
+    article_timestamp = []
+    article_auto_score = []
+    article_confidence = []
+    stories = []
+    story_category = []
+    story_latest_day = []
+    story_latest_article = []
+    articles = []
+
+    for category_name, category_payload in get_categories(data).items():
+        category_code = category_codes.setdefault(category_name, len(category_codes))
+        for story in get_story_list(category_payload):
+            story_code = len(stories)
+            latest_day = -1
+            latest_article = -1
+            for article in story["articles"]:
+                source_name = article["source"]
+                published_at = parse_datetime(article["published_at"])
+                day = published_at.date().toordinal() if published_at else -1
+                if latest_article < 0 or day > latest_day:
+                    latest_day = day
+                    latest_article = len(articles)
+
+                articles.append(article)
+                article_category.append(category_code)
+                article_source.append(source_codes.setdefault(source_name, len(source_codes)))
+                article_story.append(story_code)
+                article_day.append(day)
+                article_timestamp.append(published_at.timestamp() if published_at else np.nan)
+                article_auto_score.append(article["auto_score"])
+                article_confidence.append(article["category_confidence"])
+
+            stories.append(story)
+            story_category.append(category_code)
+            story_latest_day.append(latest_day)
+            story_latest_article.append(latest_article)
 
+    return {
+        "category_names": tuple(category_codes),
+        "category_codes": category_codes,
+        "source_names": tuple(source_codes),
+        "source_codes": source_codes,
+        "articles": tuple(articles),
+        "stories": tuple(stories),
+        "article_category": np.asarray(article_category, dtype=np.int16),
+        "article_source": np.asarray(article_source, dtype=np.int32),
+        "article_story": np.asarray(article_story, dtype=np.int32),
+        "article_day": np.asarray(article_day, dtype=np.int32),
+        "article_timestamp": np.asarray(article_timestamp, dtype=np.float64),
+        "article_auto_score": np.asarray(article_auto_score, dtype=np.float32),
+        "article_confidence": np.asarray(article_confidence, dtype=np.float32),
+        "story_category": np.asarray(story_category, dtype=np.int16),
+        "story_latest_day": np.asarray(story_latest_day, dtype=np.int32),
+        "story_latest_article": np.asarray(story_latest_article, dtype=np.int32),
+    }
 
-def compute_metrics(data):
-    stats = (data or {}).get("stats") or {}
-    categories = get_categories(data)
 
-    article_sources = set()
-    total_articles_from_payload = 0
-    for _, _, article in iter_story_articles(data):
-        total_articles_from_payload += 1
-        article_sources.add(normalize_source(article.get("source")))
+def get_date_bounds(table):
+    days = table["article_day"][table["article_day"] >= 0]
+    if not len(days):
+        return None, None
+    return date.fromordinal(int(days.min())), date.fromordinal(int(days.max()))
+
 
-    total_input = safe_int(stats.get("total_input"), default=total_articles_from_payload)
-    total_auto = safe_int(stats.get("total_automobile"), default=total_articles_from_payload)
+def compute_metrics(data, table):
+    stats = data["stats"]
+    categories = get_categories(data)
+    total_articles_from_payload = len(table["article_source"])
 
     unique_stories = 0
     active_categories = 0
     for category_name in CATEGORY_NAMES:
-        category_payload = categories.get(category_name) or {}
-        story_count = safe_int(category_payload.get("unique_stories"), default=len(get_story_list(category_payload)))
-        total_articles = safe_int(category_payload.get("total_articles"), default=0)
-        if total_articles > 0 or story_count > 0:
+        category_payload = categories.get(category_name)
+        if category_payload and (category_payload["total_articles"] > 0 or category_payload["unique_stories"] > 0):
             active_categories += 1
-        unique_stories += story_count
+            unique_stories += category_payload["unique_stories"]
 
     if unique_stories == 0:
         for category_payload in categories.values():
-            unique_stories += len(get_story_list(category_payload))
+            unique_stories += category_payload["unique_stories"]
 
     return {
-        "total_articles": max(total_input, 0),
-        "auto_relevant": max(total_auto, 0),
+        "total_articles": max(stats["total_input"], 0),
+        "auto_relevant": max(stats["total_automobile"], 0),
         "categories": active_categories,
         "unique_stories": unique_stories,
-        "sources": len(article_sources),
-        "last_updated": format_run_at((data or {}).get("run_at")),
+        "sources": int(np.count_nonzero(np.bincount(table["article_source"]))) if total_articles_from_payload else 0,
+        "last_updated": format_run_at(data["run_at"]),
+        "similarity_threshold": stats["similarity_threshold"],
     }
 
 
-def aggregate_sources(data, top_n: int = 10):
-    counts = {}
-    for _, _, article in iter_story_articles(data):
-        source = normalize_source(article.get("source"))
-        counts[source] = counts.get(source, 0) + 1
+def build_rollup_cube(table, article_mask=None, story_mask=None):
+    article_day = table["article_day"]
+    dated = article_day >= 0
+    day_start = int(article_day[dated].min()) if dated.any() else date.today().toordinal()
+    day_count = int(article_day[dated].max()) - day_start + 1 if dated.any() else 0
+    shape = (len(table["category_names"]), len(table["source_names"]), day_count + 1)
+
+    # Only occupied cells are stored, so a stray far-off date widens the day
+    # axis without allocating the cells in between.
+    def count_cells(category, source, day):
+        day_slot = np.where(day >= 0, day - day_start, day_count).astype(np.int64)
+        flat = (category.astype(np.int64) * shape[1] + source) * shape[2] + day_slot
+        cells, counts = np.unique(flat, return_counts=True)
+        category_code, rest = np.divmod(cells, shape[1] * shape[2])
+        source_code, day_code = np.divmod(rest, shape[2])
+        return {
+            "category": category_code.astype(np.int32),
+            "source": source_code.astype(np.int32),
+            "day": day_code.astype(np.int32),
+            "count": counts.astype(np.int32),
+        }
+
+    article_mask = np.ones(len(article_day), dtype=bool) if article_mask is None else article_mask
+    has_article = table["story_latest_article"] >= 0
+    if story_mask is not None:
+        has_article &= story_mask
+    latest_article = table["story_latest_article"][has_article]
+    return {
+        "day_start": day_start,
+        "day_count": day_count,
+        "shape": shape,
+        "articles": count_cells(
+            table["article_category"][article_mask],
+            table["article_source"][article_mask],
+            article_day[article_mask],
+        ),
+        "stories": count_cells(
+            table["story_category"][has_article],
+            table["article_source"][latest_article],
+            table["story_latest_day"][has_article],
+        ),
+    }
+
 
-    if not counts:
+def select_cube_axis(coords, size: int, selected):
+    if selected is None:
+        return coords, size
+    selected = np.asarray(selected, dtype=np.intp)
+    positions = np.full(size, -1, dtype=np.int64)
+    positions[selected] = np.arange(len(selected))
+    return positions[coords], len(selected)
+
+
+def query_cube(cube, measure="articles", categories=None, sources=None, day_range=None, keep=()):
+    cells = cube[measure]
+    category, category_size = select_cube_axis(cells["category"], cube["shape"][0], categories)
+    source, source_size = select_cube_axis(cells["source"], cube["shape"][1], sources)
+    day, day_size = cells["day"].astype(np.int64), cube["shape"][2]
+    if day_range is not None:
+        start = max(day_range[0].toordinal() - cube["day_start"], 0)
+        end = min(day_range[1].toordinal() - cube["day_start"], cube["day_count"] - 1)
+        day, day_size = day - start, max(end - start + 1, 0)
+    selected = (category >= 0) & (source >= 0) & (day >= 0) & (day < day_size)
+    axes = {"category": (category, category_size), "source": (source, source_size), "day": (day, day_size)}
+    shape = tuple(axes[name][1] for name in CUBE_AXES if name in keep)
+    flat = np.zeros(int(selected.sum()), dtype=np.int64)
+    for name in CUBE_AXES:
+        if name in keep:
+            coords, size = axes[name]
+            flat = flat * size + coords[selected]
+    counts = np.bincount(flat, weights=cells["count"][selected], minlength=int(np.prod(shape)))
+    return counts[: int(np.prod(shape))].astype(np.int64).reshape(shape)[()]
+
+
+def aggregate_sources(source_names, counts, top_n: int = 10):
+    if not counts.sum():
         return []
 
-    sorted_sources = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    order = np.argsort(-counts, kind="stable")
+    sorted_sources = [(source_names[code], int(counts[code])) for code in order if counts[code] > 0]
     top_slots = max(top_n - 1, 1)
     top_sources = sorted_sources[:top_slots]
     tail_sources = sorted_sources[top_slots:]
@@ -568,47 +1632,32 @@ def aggregate_sources(data, top_n: int = 10):
 
 
 def get_story_summary(story):
-    summary = clean_text(story.get("summary"))
+    summary = clean_text(get_long_text(story, "summary"))
     if summary:
         return summary
-    for article in story.get("articles") or []:
-        preview = clean_text(article.get("content_preview"))
+    for article in story["articles"]:
+        preview = clean_text(get_long_text(article, "content_preview"))
         if preview:
             return preview
     return "No summary available."
 
 
 def get_story_sources(story):
-    story_sources = story.get("sources") or []
-    if story_sources:
-        clean_sources = [normalize_source(source) for source in story_sources]
-        return sorted(set(clean_sources))
-
-    fallback = []
-    for article in story.get("articles") or []:
-        fallback.append(normalize_source(article.get("source")))
-    return sorted(set(fallback))
+    return story["sources"]
 
 
 def get_story_count(story):
-    explicit = safe_int(story.get("story_count"), default=0)
-    if explicit > 0:
-        return explicit
-    return max(len(get_story_sources(story)), 1)
+    return story["story_count"]
 
 
 def get_category_totals(category_payload):
-    stories = get_story_list(category_payload)
-    total_articles = safe_int(category_payload.get("total_articles"), default=0)
-    if total_articles == 0:
-        total_articles = sum(len(story.get("articles") or []) for story in stories)
-
-    unique_stories = safe_int(category_payload.get("unique_stories"), default=len(stories))
-    return total_articles, unique_stories
+    if not category_payload:
+        return 0, 0
+    return category_payload["total_articles"], category_payload["unique_stories"]
 
 
 def get_story_representative_article(story):
-    articles = story.get("articles") or []
+    articles = story["articles"]
     if not articles:
         return {}
 
@@ -636,149 +1685,2036 @@ def make_clickable_url(url, title: str) -> str:
     return f"https://www.google.com/search?q={quote_plus(clean_text(title))}"
 
 
-def get_story_link(story):
-    representative_article = get_story_representative_article(story)
+def get_story_link(story, representative_article=None):
+    if representative_article is None:
+        representative_article = get_story_representative_article(story)
     title = clean_text(representative_article.get("title")) or clean_text(story.get("representative_title")) or "Untitled"
     url = representative_article.get("url")
     if not url:
-        for article in story.get("articles") or []:
-            if article.get("url"):
-                url = article.get("url")
+        for article in story["articles"]:
+            if article["url"]:
+                url = article["url"]
                 break
     return make_clickable_url(url, title)
 
 
 def get_story_importance_score(story) -> float:
     score = float(get_story_count(story))
-    for article in story.get("articles") or []:
-        score += safe_float(article.get("auto_score")) * 2.0
-        score += safe_float(article.get("category_confidence")) * 2.0
+    for article in story["articles"]:
+        score += article["auto_score"] * 2.0
+        score += article["category_confidence"] * 2.0
     return score
 
 
-def collect_ranked_stories(data):
-    ranked = []
-    for category_name, category_payload in get_categories(data).items():
-        for story in get_story_list(category_payload):
-            representative_article = get_story_representative_article(story)
-            published_dt = parse_datetime(representative_article.get("published_at"))
-            title = clean_text(story.get("representative_title")) or "Untitled"
-            ranked.append(
-                {
-                    "category": category_name,
-                    "story": story,
-                    "title": title,
-                    "url": get_story_link(story),
-                    "score": get_story_importance_score(story),
-                    "published_at": published_dt.date() if published_dt else None,
-                }
-            )
-    ranked.sort(
+def build_ranked_row(table, story_index: int):
+    story = table["stories"][story_index]
+    representative_article = get_story_representative_article(story)
+    published_dt = parse_datetime(representative_article.get("published_at"))
+    return {
+        "category": table["category_names"][table["story_category"][story_index]],
+        "story": story,
+        "story_index": story_index,
+        "title": clean_text(story.get("representative_title")) or "Untitled",
+        "url": get_story_link(story, representative_article),
+        "score": get_story_importance_score(story),
+        "published_at": published_dt.date() if published_dt else None,
+    }
+
+
+def sort_ranked_stories(rows):
+    return sorted(
+        rows,
         key=lambda row: (
             row["score"],
             row["published_at"] if row["published_at"] is not None else datetime.min.date(),
         ),
         reverse=True,
     )
-    return ranked
 
 
-def create_scatter_plot(data, selected_categories):
-    fig = go.Figure()
-    categories = get_categories(data)
-    rng = random.Random(42)
-
-    for category_name in CATEGORY_NAMES:
-        if category_name not in selected_categories:
-            continue
+def build_ranking_index(table, ranked_stories):
+    story_count = len(table["stories"])
+    article_story = table["article_story"]
+    article_counts = np.bincount(article_story, minlength=story_count)
+    source_pairs = np.unique(article_story.astype(np.int64) * len(table["source_names"]) + table["article_source"])
+    distinct_sources = np.bincount(source_pairs // len(table["source_names"]), minlength=story_count)
+
+    latest_article = table["story_latest_article"]
+    latest_timestamp = np.where(latest_article >= 0, table["article_timestamp"][latest_article], np.nan)
+    newest = np.nanmax(latest_timestamp) if np.isfinite(latest_timestamp).any() else 0.0
+    recency = np.exp2(-(newest - latest_timestamp) / (RANKING_RECENCY_HALF_LIFE_HOURS * 3600.0))
+
+    features = np.column_stack(
+        [
+            [get_story_count(story) for story in table["stories"]],
+            np.bincount(article_story, weights=table["article_auto_score"], minlength=story_count),
+            np.bincount(article_story, weights=table["article_confidence"], minlength=story_count),
+            np.nan_to_num(recency),
+            distinct_sources / np.maximum(article_counts, 1),
+        ]
+    ).astype(np.float64).reshape(story_count, len(RANKING_FEATURES) - 1)
 
-        stories = get_story_list(categories.get(category_name) or {})
-        if not stories:
-            continue
+    rows = [None] * story_count
+    for row in ranked_stories:
+        rows[row["story_index"]] = row
+    published_day = np.asarray(
+        [row["published_at"].toordinal() if row["published_at"] is not None else 0 for row in rows], dtype=np.int64
+    )
+    return {"features": features, "rows": tuple(rows), "published_day": published_day}
+
+
+def get_default_ranking_weights():
+    return tuple((name, default) for name, (_, default) in RANKING_FEATURES.items())
+
+
+def compute_story_rank_scores(dataset, weights, generation):
+    weights = dict(weights)
+    ranking = dataset["ranking"]
+    scores = ranking["features"] @ np.asarray([weights[name] for name in RANKING_FEATURES if name != "velocity"])
+    if weights["velocity"]:
+        scores = scores + weights["velocity"] * get_trending_scores(dataset, dataset["version"], generation)
+    return scores
+
+
+@managed_cache("ranked_view", max_entries=32)
+def get_ranked_view(_dataset, version, view_key, weights, generation):
+    dataset = _dataset
+    ranking = dataset["ranking"]
+    scores = compute_story_rank_scores(dataset, weights, generation)
+    order = np.lexsort((np.arange(len(scores)), -ranking["published_day"], -scores))
+    if dataset["story_mask"] is not None:
+        order = order[dataset["story_mask"][order]]
+    positions = dataset["related"]["story_positions"]
+    view = dict(dataset)
+    view["rank_scores"] = scores
+    view["ranked_stories"] = tuple(ranking["rows"][index] for index in order)
+    view["fragments"] = {
+        "headlines": build_headline_html(view["ranked_stories"]),
+        "top_story_cards": build_top_story_cards(dataset["data"], key=lambda story: scores[positions[id(story)]]),
+    }
+    return MappingProxyType(view)
 
-        x_positions = []
-        y_positions = []
-        sizes = []
-        hovers = []
 
-        category_index = CATEGORY_NAMES.index(category_name)
-        for story in stories:
-            story_title = clean_text(story.get("representative_title")) or "Untitled"
-            story_summary = get_story_summary(story)
-            story_sources = get_story_sources(story)
-            story_count = get_story_count(story)
+def apply_ranking_weights(dataset, weights):
+    if weights == get_default_ranking_weights():
+        return dataset
+    generation = get_trending_state()["generation"] if dict(weights)["velocity"] else 0
+    return get_ranked_view(dataset, dataset["version"], dataset["view_key"], weights, generation)
 
-            base_x = (category_index % 3) * 30 + rng.uniform(-10, 10)
-            base_y = (category_index // 3) * 30 + rng.uniform(-10, 10)
-            x_positions.append(base_x)
-            y_positions.append(base_y)
-            sizes.append(min(16 + story_count * 7, 58))
 
-            source_preview = ", ".join(story_sources[:4]) if story_sources else "Unknown"
-            if len(story_sources) > 4:
-                source_preview += f" +{len(story_sources) - 4} more"
+def reset_ranking_weights():
+    for name, (_, default) in RANKING_FEATURES.items():
+        st.session_state[f"rank_weight_{name}"] = default
 
-            hovers.append(
-                f"<b>{html.escape(story_title[:75])}</b><br>"
-                f"<b>Category:</b> {html.escape(category_name)}<br>"
-                f"<b>Sources ({story_count}):</b> {html.escape(source_preview)}<br>"
-                f"<b>Summary:</b> {html.escape(story_summary[:160])}..."
-            )
 
-        fig.add_trace(
-            go.Scatter(
-                x=x_positions,
-                y=y_positions,
-                mode="markers",
-                marker=dict(
-                    size=sizes,
-                    color=CATEGORY_COLORS.get(category_name, "#2563eb"),
-                    line=dict(width=1, color="white"),
-                    opacity=0.76,
+def render_ranking_controls():
+    for name, (_, default) in RANKING_FEATURES.items():
+        st.session_state.setdefault(f"rank_weight_{name}", default)
+    with st.expander("Ranking weights", expanded=False):
+        st.button("Reset weights", key="rank_weight_reset", on_click=reset_ranking_weights, width="stretch")
+        weights = tuple(
+            (
+                name,
+                float(
+                    st.slider(label, min_value=0.0, max_value=RANKING_WEIGHT_MAX, step=0.5, key=f"rank_weight_{name}")
                 ),
-                name=category_name,
-                hovertemplate="%{hovertext}<extra></extra>",
-                hovertext=hovers,
-                showlegend=True,
             )
+            for name, (label, _) in RANKING_FEATURES.items()
         )
+        st.caption("Re-ranks the headlines ticker, top stories and trending panel.")
+    return weights
 
-    fig.update_layout(
-        height=560,
-        showlegend=True,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left",
-            x=1.01,
-            bgcolor="rgba(255,255,255,0.92)",
-            bordercolor="#e2e8f0",
-            borderwidth=1,
-        ),
-        hovermode="closest",
-        xaxis=dict(showgrid=True, gridcolor="#e5e7eb", zeroline=False, showticklabels=False, title=""),
-        yaxis=dict(showgrid=True, gridcolor="#e5e7eb", zeroline=False, showticklabels=False, title=""),
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        font=dict(color="#334155"),
-        margin=dict(l=20, r=130, t=15, b=15),
-    )
-    return fig
 
+def build_facet_index(table, entities, story_source_count, story_score):
+    story_count = len(table["stories"])
+    byte_count = (story_count + 7) // 8
+    story_positions = np.arange(story_count)
+    story_bits = (np.uint8(0x80) >> (story_positions % 8).astype(np.uint8)).astype(np.uint8)
 
-def render_pipeline_funnel(metrics):
-    total_articles = metrics["total_articles"]
-    relevant_articles = metrics["auto_relevant"]
-    sources = metrics["sources"]
-    stories = metrics["unique_stories"]
-    categories_total = len(CATEGORY_NAMES)
-    irrelevant_removed = max(total_articles - relevant_articles, 0)
-    duplicates_removed = max(relevant_articles - stories, 0)
+    category_bits = np.zeros((len(table["category_names"]), byte_count), dtype=np.uint8)
+    np.bitwise_or.at(category_bits, (table["story_category"], story_positions // 8), story_bits)
 
-    st.markdown('<div class="section-title">Pipeline Flow</div>', unsafe_allow_html=True)
-    st.markdown(
-        f"""
+    article_story = table["article_story"]
+    source_bits = np.zeros((len(table["source_names"]), byte_count), dtype=np.uint8)
+    np.bitwise_or.at(source_bits, (table["article_source"], article_story // 8), story_bits[article_story])
+
+    entry_story = article_story[entities["entry_article"]]
+    brand_bits = np.zeros((len(entities["brand_names"]), byte_count), dtype=np.uint8)
+    np.bitwise_or.at(brand_bits, (entities["article_brands"], entry_story // 8), story_bits[entry_story])
+
+    return {
+        "story_count": story_count,
+        "category_bits": category_bits,
+        "source_bits": source_bits,
+        "brand_bits": brand_bits,
+        "story_source_count": np.asarray(story_source_count, dtype=np.int32),
+        "story_score": np.asarray(story_score, dtype=np.float32),
+        "source_order": tuple(
+            table["source_names"][code]
+            for code in np.argsort(
+                -np.bincount(table["article_source"], minlength=len(table["source_names"])), kind="stable"
+            )
+        ),
+    }
+
+
+def get_default_facets(dataset):
+    facet_index = dataset["facets"]
+    min_date, max_date = dataset["date_bounds"]
+    score = facet_index["story_score"]
+    return {
+        "categories": (),
+        "sources": (),
+        "brands": (),
+        "dates": (min_date, max_date) if min_date and max_date else None,
+        "min_sources": 1,
+        "score": (
+            float(np.floor(score.min())) if len(score) else 0.0,
+            float(np.ceil(score.max())) if len(score) else 0.0,
+        ),
+    }
+
+
+def compute_story_mask(dataset, facets):
+    table = dataset["table"]
+    facet_index = dataset["facets"]
+    story_count = facet_index["story_count"]
+    defaults = get_default_facets(dataset)
+    bits = None
+
+    if facets["categories"]:
+        codes = [table["category_codes"][name] for name in facets["categories"] if name in table["category_codes"]]
+        bits = np.bitwise_or.reduce(facet_index["category_bits"][codes], axis=0) if codes else np.zeros(
+            facet_index["category_bits"].shape[1], dtype=np.uint8
+        )
+    if facets["sources"]:
+        codes = [table["source_codes"][name] for name in facets["sources"] if name in table["source_codes"]]
+        source_bits = np.bitwise_or.reduce(facet_index["source_bits"][codes], axis=0) if codes else np.zeros(
+            facet_index["source_bits"].shape[1], dtype=np.uint8
+        )
+        bits = source_bits if bits is None else bits & source_bits
+    if facets["brands"]:
+        entities = dataset["entities"]
+        codes = [entities["brand_codes"][name] for name in facets["brands"] if name in entities["brand_codes"]]
+        brand_bits = np.bitwise_or.reduce(facet_index["brand_bits"][codes], axis=0) if codes else np.zeros(
+            facet_index["brand_bits"].shape[1], dtype=np.uint8
+        )
+        bits = brand_bits if bits is None else bits & brand_bits
+
+    mask = np.unpackbits(bits, count=story_count).astype(bool) if bits is not None else np.ones(story_count, dtype=bool)
+
+    if facets["dates"] and facets["dates"] != defaults["dates"]:
+        latest_day = table["story_latest_day"]
+        start, end = facets["dates"][0].toordinal(), facets["dates"][1].toordinal()
+        mask &= ((latest_day >= start) & (latest_day <= end)) | (latest_day < 0)
+    if facets["min_sources"] > 1:
+        mask &= facet_index["story_source_count"] >= facets["min_sources"]
+    if facets["score"] != defaults["score"]:
+        score = facet_index["story_score"]
+        mask &= (score >= facets["score"][0]) & (score <= facets["score"][1])
+    return mask
+
+
+def build_filtered_payload(dataset, story_mask):
+    table = dataset["table"]
+    data = dataset["data"]
+    article_counts = np.bincount(
+        table["article_category"][story_mask[table["article_story"]]],
+        minlength=len(table["category_names"]),
+    )
+    categories = {}
+    for story_index in np.flatnonzero(story_mask):
+        category_name = table["category_names"][table["story_category"][story_index]]
+        payload = categories.setdefault(category_name, {"total_articles": 0, "unique_stories": 0, "stories": []})
+        payload["stories"].append(table["stories"][story_index])
+    for category_name, payload in categories.items():
+        payload["total_articles"] = int(article_counts[table["category_codes"][category_name]])
+        payload["unique_stories"] = len(payload["stories"])
+    return {"run_at": data["run_at"], "stats": data["stats"], "categories": categories}
+
+
+@managed_cache("faceted_view", max_entries=16)
+def get_faceted_view(_dataset, version, facet_key):
+    dataset = _dataset
+    facets = dict(facet_key)
+    story_mask = compute_story_mask(dataset, facets)
+    table = dataset["table"]
+    cube = build_rollup_cube(table, story_mask[table["article_story"]], story_mask)
+    view = dict(dataset)
+    view.update(
+        {
+            "data": build_filtered_payload(dataset, story_mask),
+            "cube": cube,
+            "story_mask": story_mask,
+            "view_key": facet_key,
+            "ranked_stories": tuple(row for row in dataset["ranked_stories"] if story_mask[row["story_index"]]),
+            "source_totals": tuple(
+                aggregate_sources(table["source_names"], query_cube(cube, keep=("source",)), top_n=10)
+            ),
+            "brand_totals": count_brand_articles(dataset["entities"], story_mask[table["article_story"]]),
+        }
+    )
+    build_view_artifacts(view)
+    return MappingProxyType(view)
+
+
+def get_export_story_order(dataset):
+    latest_day = dataset["table"]["story_latest_day"]
+    story_mask = dataset["story_mask"]
+    selected = np.flatnonzero(story_mask) if story_mask is not None else np.arange(len(latest_day))
+    return selected[np.argsort(-latest_day[selected], kind="stable")]
+
+
+def iter_export_rows(dataset, level: str):
+    table = dataset["table"]
+    scores = dataset["facets"]["story_score"]
+    story_order = get_export_story_order(dataset)
+
+    if level == "Stories":
+        for story_index in story_order:
+            story = table["stories"][story_index]
+            latest_article = table["story_latest_article"][story_index]
+            latest = table["articles"][latest_article] if latest_article >= 0 else {}
+            sources = get_story_sources(story)
+            yield (
+                clean_text(story.get("sub_cluster_id")),
+                table["category_names"][table["story_category"][story_index]],
+                clean_text(story.get("representative_title")) or "Untitled",
+                "; ".join(sources),
+                get_story_count(story),
+                len(story["articles"]),
+                clean_text(latest.get("published_at")),
+                round(float(scores[story_index]), 4),
+                get_story_link(story),
+            )
+        return
+
+    article_order = np.argsort(table["article_story"], kind="stable")
+    story_starts = np.searchsorted(table["article_story"][article_order], np.arange(len(table["stories"]) + 1))
+    for story_index in story_order:
+        story = table["stories"][story_index]
+        story_id = clean_text(story.get("sub_cluster_id"))
+        category_name = table["category_names"][table["story_category"][story_index]]
+        for article_index in article_order[story_starts[story_index] : story_starts[story_index + 1]]:
+            article = table["articles"][article_index]
+            title = clean_text(article.get("title")) or "Untitled"
+            yield (
+                clean_text(article.get("id")),
+                story_id,
+                category_name,
+                table["source_names"][table["article_source"][article_index]],
+                title,
+                clean_text(article.get("published_at")),
+                float(table["article_auto_score"][article_index]),
+                float(table["article_confidence"][article_index]),
+                make_clickable_url(article.get("url"), title),
+            )
+
+
+def iter_chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_export_file(output) -> bytes:
+    # download_button buffers the payload in memory anyway; the rows are
+    # streamed to disk so only the finished file is held, once.
+    output.close()
+    try:
+        with open(output.name, "rb") as reader:
+            return reader.read()
+    finally:
+        try:
+            os.unlink(output.name)
+        except OSError:
+            pass
+
+
+def write_csv_export(dataset, level: str):
+    output = tempfile.NamedTemporaryFile(mode="w+b", suffix=".csv", delete=False)
+    text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    writer = csv.writer(text_output)
+    writer.writerow(EXPORT_COLUMNS[level])
+    for chunk in iter_chunks(iter_export_rows(dataset, level), EXPORT_CHUNK_ROWS):
+        writer.writerows(chunk)
+    text_output.flush()
+    text_output.detach()
+    return read_export_file(output)
+
+
+def write_parquet_export(dataset, level: str):
+    output = tempfile.NamedTemporaryFile(mode="w+b", suffix=".parquet", delete=False)
+    columns = EXPORT_COLUMNS[level]
+    writer = None
+    for chunk in iter_chunks(iter_export_rows(dataset, level), EXPORT_CHUNK_ROWS):
+        batch = pa.RecordBatch.from_arrays([pa.array(values) for values in zip(*chunk)], names=columns)
+        if writer is None:
+            writer = pq.ParquetWriter(output, batch.schema)
+        writer.write_batch(batch)
+    if writer is None:
+        pa_schema = pa.schema([(name, pa.string()) for name in columns])
+        writer = pq.ParquetWriter(output, pa_schema)
+    writer.close()
+    return read_export_file(output)
+
+
+def render_export_controls(dataset):
+    st.markdown("**Export view**")
+    level = st.radio("Rows", list(EXPORT_COLUMNS), horizontal=True, key="export_level")
+    file_stem = f"auto_news_{level.lower()}_{slugify(dataset['version'])}"
+    st.download_button(
+        "Download CSV",
+        data=lambda: write_csv_export(dataset, level),
+        file_name=f"{file_stem}.csv",
+        mime="text/csv",
+        key="export_csv",
+        on_click="ignore",
+        width="stretch",
+    )
+    st.download_button(
+        "Download Parquet",
+        data=lambda: write_parquet_export(dataset, level),
+        file_name=f"{file_stem}.parquet",
+        mime="application/vnd.apache.parquet",
+        key="export_parquet",
+        on_click="ignore",
+        disabled=pq is None,
+        help=None if pq is not None else "Install pyarrow to enable Parquet export.",
+        width="stretch",
+    )
+
+
+def build_view_artifacts(view) -> None:
+    view["fragments"] = {
+        "headlines": build_headline_html(view["ranked_stories"]),
+        "top_story_cards": build_top_story_cards(view["data"]),
+    }
+    view["figures"] = {
+        "sources": build_source_figure(view["source_totals"]),
+        "category_pie": build_category_pie_figure(view["table"], view["cube"]),
+        "brands": build_brand_figure(view["entities"]["brand_names"], view["brand_totals"]),
+    }
+
+
+def render_facet_bar(dataset):
+    table = dataset["table"]
+    facet_index = dataset["facets"]
+    defaults = get_default_facets(dataset)
+    category_options = [name for name in CATEGORY_NAMES if name in table["category_codes"]]
+    category_options += [name for name in table["category_names"] if name not in category_options]
+
+    entities = dataset["entities"]
+    brand_options = [entities["brand_names"][code] for code in np.argsort(-entities["brand_articles"], kind="stable")]
+
+    cols = st.columns([1.3, 1.3, 1.3, 1.1, 0.7, 1.1], gap="small")
+    with cols[0]:
+        categories = st.multiselect(
+            "Categories", options=category_options, key="facet_categories", placeholder="All categories"
+        )
+    with cols[1]:
+        sources = st.multiselect(
+            "Sources", options=list(facet_index["source_order"]), key="facet_sources", placeholder="All sources"
+        )
+    with cols[2]:
+        brands = st.multiselect("Brands", options=brand_options, key="facet_brands", placeholder="All brands")
+    with cols[3]:
+        dates = defaults["dates"]
+        if dates:
+            selected_dates = st.date_input(
+                "Date window", value=dates, min_value=dates[0], max_value=dates[1], key="facet_dates"
+            )
+            if isinstance(selected_dates, (list, tuple)) and len(selected_dates) == 2:
+                dates = tuple(selected_dates)
+    with cols[4]:
+        min_sources = st.number_input(
+            "Min. sources",
+            min_value=1,
+            max_value=max(int(facet_index["story_source_count"].max()) if facet_index["story_count"] else 1, 1),
+            value=1,
+            step=1,
+            key="facet_min_sources",
+        )
+    with cols[5]:
+        score_min, score_max = defaults["score"]
+        score = defaults["score"]
+        if score_max > score_min:
+            score = st.slider(
+                "Score range",
+                min_value=score_min,
+                max_value=score_max,
+                value=(score_min, score_max),
+                step=0.5,
+                key="facet_score",
+            )
+
+    facets = {
+        "categories": tuple(categories),
+        "sources": tuple(sources),
+        "brands": tuple(brands),
+        "dates": dates,
+        "min_sources": int(min_sources),
+        "score": (float(score[0]), float(score[1])),
+    }
+    if facets == defaults:
+        return dataset
+    return get_faceted_view(dataset, dataset["version"], tuple(facets.items()))
+
+
+def build_dataset(data, version, quality=None, indexes=None, job=None):
+    offload_text_fields(data, version)
+    table = build_article_table(data)
+    if indexes is None:
+        entities = build_entity_index(table, job=job)
+        related = build_related_index(table)
+    else:
+        entities = make_entity_index(indexes["brand_names"], indexes["article_offsets"], indexes["article_brands"])
+        related = make_related_index(table, indexes["related_neighbors"], indexes["related_scores"])
+    story_indices = range(len(table["stories"]))
+    story_rows = {
+        "ranked": [build_ranked_row(table, story_index) for story_index in story_indices],
+        "feed": [build_feed_row(table, story_index) for story_index in story_indices],
+        "source_count": [get_story_count(story) for story in table["stories"]],
+        "score": [get_story_importance_score(story) for story in table["stories"]],
+    }
+    return assemble_dataset(version, data, quality, table, entities, related, story_rows)
+
+
+def assemble_dataset(version, data, quality, table, entities, related, story_rows):
+    cube = build_rollup_cube(table)
+    ranked_stories = tuple(sort_ranked_stories(story_rows["ranked"]))
+    dataset = {
+        "version": version,
+        "data": data,
+        "table": table,
+        "entities": entities,
+        "facets": build_facet_index(table, entities, story_rows["source_count"], story_rows["score"]),
+        "story_mask": None,
+        "cube": cube,
+        "feed_rows": tuple(story_rows["feed"]),
+        "metrics": compute_metrics(data, table),
+        "date_bounds": get_date_bounds(table),
+        "ranked_stories": ranked_stories,
+        "ranking": build_ranking_index(table, ranked_stories),
+        "view_key": (),
+        "source_totals": tuple(
+            aggregate_sources(table["source_names"], query_cube(cube, keep=("source",)), top_n=10)
+        ),
+        "brand_totals": entities["brand_articles"],
+        "related": related,
+        "quality": quality,
+    }
+    build_view_artifacts(dataset)
+    return MappingProxyType(dataset)
+
+
+def get_shared_snapshot_dir():
+    directory = clean_text(os.getenv("SHARED_SNAPSHOT_DIR", ""))
+    return Path(directory).expanduser() if directory else None
+
+
+def get_shared_snapshot_version(directory: Path):
+    try:
+        return clean_text((directory / SHARED_SNAPSHOT_POINTER).read_text(encoding="utf-8")) or None
+    except OSError:
+        return None
+
+
+def save_snapshot_entry(target: Path, data, quality, blob_id: str, entities, related) -> None:
+    arrays = {
+        "article_offsets": entities["article_offsets"],
+        "article_brands": entities["article_brands"],
+        "related_neighbors": related["neighbors"],
+        "related_scores": related["scores"],
+    }
+    for name, values in arrays.items():
+        np.save(target / f"{name}.npy", values)
+    payload = {"data": data, "quality": quality, "brand_names": entities["brand_names"], "blob_id": blob_id}
+    write_atomically(target / "payload.json", [json.dumps(payload, ensure_ascii=False).encode("utf-8")])
+
+
+def load_snapshot_entry(target: Path, blob_id: str):
+    payload = decode_json_bytes((target / "payload.json").read_bytes())
+    attach_text_blob(payload.get("blob_id", blob_id), target / "text.bin")
+    indexes = {name: np.load(target / f"{name}.npy", mmap_mode="r") for name in SHARED_SNAPSHOT_ARRAYS}
+    indexes["brand_names"] = tuple(payload["brand_names"])
+    return payload["data"], payload["quality"], indexes
+
+
+def write_shared_snapshot(results_path, version, directory: Path):
+    cache_dir = get_derived_cache_dir()
+    cache_key = get_derived_cache_key(results_path) if cache_dir is not None else None
+    cached = get_derived_cache_entry(cache_dir, cache_key) if cache_key else None
+    if cached is None:
+        data, quality = validate_payload(load_data(results_path))
+        if data is None:
+            return None
+    directory.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=directory, prefix=f".{version}."))
+    try:
+        if cached is not None:
+            shutil.copytree(cached, staging, dirs_exist_ok=True)
+        else:
+            offload_text_fields(data, version, staging / "text.bin")
+            table = build_article_table(data)
+            save_snapshot_entry(staging, data, quality, version, build_entity_index(table), build_related_index(table))
+            # Workers map text.bin themselves; the publisher only needed it to build the indexes.
+            drop_text_blob(version)
+            if cache_key:
+                copy_into_derived_cache(cache_dir, cache_key, staging)
+        target = directory / version
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    write_atomically(directory / SHARED_SNAPSHOT_POINTER, [version.encode("utf-8")])
+    # Workers may still be serving an older version from its mmaps, so keep a
+    # few behind the current one instead of deleting it outright.
+    snapshots = [path for path in directory.iterdir() if path.is_dir() and not path.name.startswith(".")]
+    snapshots.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+    for stale_path in snapshots[SHARED_SNAPSHOT_KEEP:]:
+        shutil.rmtree(stale_path, ignore_errors=True)
+    return target
+
+
+def load_shared_snapshot(directory: Path, version: str):
+    return load_snapshot_entry(directory / version, version)
+
+
+def get_derived_cache_dir():
+    directory = os.getenv("DERIVED_CACHE_DIR")
+    if directory is None:
+        cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+        directory = str(Path(cache_home) / DERIVED_CACHE_NAME)
+    if not directory.strip():
+        return None
+    path = Path(directory).expanduser()
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        stat = path.stat()
+    except OSError:
+        return None
+    # Entries are loaded as trusted indexes, so only use a directory that no
+    # other user can write to.
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+        return None
+    return path
+
+
+@functools.lru_cache(maxsize=1)
+def get_code_version() -> str:
+    digest = hashlib.sha1()
+    root = Path(__file__).resolve().parent
+    for name in DERIVED_CACHE_SOURCES:
+        digest.update((root / name).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def get_derived_cache_key(results_path):
+    if results_path is None:
+        return None
+    digest = hashlib.sha1(get_code_version().encode("ascii"))
+    digest.update(json.dumps(get_brand_dictionary(), sort_keys=True).encode("utf-8"))
+    try:
+        for path in get_results_files(results_path):
+            digest.update(str(path.relative_to(results_path) if path != results_path else path.name).encode("utf-8"))
+            with open(path, "rb") as handle:
+                for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                    digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()[:16]
+
+
+def get_derived_cache_entry(cache_dir: Path, cache_key: str):
+    target = cache_dir / cache_key
+    try:
+        if (target / "payload.json").stat().st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+    try:
+        # Touch the entry so size-bounded cleanup treats it as recently used.
+        os.utime(target)
+    except OSError:
+        pass
+    return target
+
+
+def make_derived_cache_staging(cache_dir: Path, cache_key: str):
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(dir=cache_dir, prefix=f".{cache_key}."))
+    except OSError:
+        return None
+
+
+def publish_derived_cache_entry(cache_dir: Path, cache_key: str, staging: Path) -> None:
+    target = cache_dir / cache_key
+    try:
+        os.replace(staging, target)
+    except OSError:
+        # Another process may have published the same entry first.
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    prune_derived_cache(cache_dir, keep=target)
+
+
+def copy_into_derived_cache(cache_dir: Path, cache_key: str, source: Path) -> None:
+    staging = make_derived_cache_staging(cache_dir, cache_key)
+    if staging is None:
+        return
+    try:
+        shutil.copytree(source, staging, dirs_exist_ok=True)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    publish_derived_cache_entry(cache_dir, cache_key, staging)
+
+
+def prune_derived_cache(cache_dir: Path, keep: Path) -> None:
+    limit = int(max(safe_float(os.getenv("DERIVED_CACHE_MAX_MB"), default=DERIVED_CACHE_MAX_MB), 1.0) * 1024 * 1024)
+    now = time.time()
+    entries = []
+    for path in cache_dir.iterdir():
+        try:
+            modified = path.stat().st_mtime
+            if not path.is_dir():
+                continue
+            if path.name.startswith("."):
+                # Staging directories left behind by a crashed writer.
+                if now - modified > DERIVED_CACHE_STAGING_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+            entries.append((modified, sum(item.stat().st_size for item in path.iterdir()), path))
+        except OSError:
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= limit:
+            break
+        if path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+def build_data_version(results_path, version, shared_dir=None):
+    indexes = None
+    cache_key = None
+    if shared_dir is not None:
+        data, quality, indexes = load_shared_snapshot(shared_dir, version)
+    else:
+        cache_dir = get_derived_cache_dir()
+        cache_key = get_derived_cache_key(results_path) if cache_dir is not None else None
+        cached = get_derived_cache_entry(cache_dir, cache_key) if cache_key else None
+        if cached is not None:
+            data, quality, indexes = load_snapshot_entry(cached, version)
+            cache_key = None
+        else:
+            data, quality = validate_payload(load_data(results_path))
+    if data is None:
+        return None
+    staging = make_derived_cache_staging(cache_dir, cache_key) if cache_key else None
+    if staging is not None:
+        offload_text_fields(data, version, staging / "text.bin")
+    job, _ = create_job(("index", version), f"Index {version[:8]}")
+    try:
+        dataset = run_job(job, build_dataset, data, version, quality, indexes)
+    except BaseException:
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if staging is not None:
+        try:
+            save_snapshot_entry(staging, data, quality, version, dataset["entities"], dataset["related"])
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+        else:
+            publish_derived_cache_entry(cache_dir, cache_key, staging)
+    record_trending_articles(get_trending_state(), dataset)
+    get_trending_scores(dataset, version, get_trending_state()["generation"])
+    get_shared_memory_sizes(dataset, version)
+    return dataset
+
+
+def refresh_data_store(store) -> None:
+    shared_dir = get_shared_snapshot_dir()
+    if shared_dir is not None:
+        results_path = None
+        version = get_shared_snapshot_version(shared_dir)
+    else:
+        results_path = resolve_results_path()
+        version = get_data_version(results_path)
+    if version and version != store["version"]:
+        dataset = build_data_version(results_path, version, shared_dir)
+        if dataset is not None:
+            with store["lock"]:
+                store["previous"] = store["current"]
+                store["current"] = dataset
+                store["version"] = version
+                store["loaded_at"] = datetime.now()
+            update_cache_versions(
+                (live["version"], live) for live in (store["current"], store["previous"]) if live is not None
+            )
+            store["ready"].set()
+            snapshot_dir = get_snapshot_dir()
+            if snapshot_dir is not None:
+                store["snapshot_path"] = write_static_snapshot(dataset, snapshot_dir)
+    store["ready"].set()
+
+
+def run_data_watcher(store) -> None:
+    while True:
+        try:
+            refresh_data_store(store)
+            store["error"] = None
+        except Exception as exc:
+            # A malformed results file must not end the watcher thread.
+            store["error"] = str(exc) or exc.__class__.__name__
+            store["ready"].set()
+        store["wake"].wait(store["interval"])
+        store["wake"].clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_store():
+    store = {
+        "lock": threading.Lock(),
+        "current": None,
+        "previous": None,
+        "version": None,
+        "loaded_at": None,
+        "snapshot_path": None,
+        "error": None,
+        "interval": max(safe_float(os.getenv("DATA_WATCH_SECONDS"), default=DATA_WATCH_SECONDS), 0.5),
+        "ready": threading.Event(),
+        "wake": threading.Event(),
+    }
+    remote_sync = get_configured_remote_sync()
+    if remote_sync is not None:
+        remote_sync["listeners"].append(store["wake"])
+    threading.Thread(target=run_data_watcher, args=(store,), name="results-watcher", daemon=True).start()
+    return store
+
+
+def poll_data_version() -> None:
+    store = get_data_store()
+    # Every section renders from the dataset, so a new version needs a full
+    # rerun; unchanged polls only rerun this fragment.
+    if store["version"] != st.session_state.get("data_version"):
+        st.rerun(scope="app")
+    st.caption(f"Auto-refresh on · checked {datetime.now().strftime('%H:%M:%S')}")
+
+
+def render_auto_refresh() -> bool:
+    if not st.toggle("Auto-refresh", value=True, key="auto_refresh"):
+        return False
+    interval = max(safe_float(os.getenv("AUTO_REFRESH_SECONDS"), default=AUTO_REFRESH_SECONDS), 1.0)
+    st.fragment(poll_data_version, run_every=interval)()
+    return True
+
+
+def get_current_dataset():
+    store = get_data_store()
+    if not store["ready"].is_set():
+        with st.spinner("Loading results..."):
+            store["ready"].wait(DATA_FIRST_LOAD_TIMEOUT_SECONDS)
+    with store["lock"]:
+        return store["current"]
+
+
+@st.cache_resource(show_spinner=False)
+def get_trending_state():
+    return {
+        "lock": threading.Lock(),
+        "generation": 0,
+        "applied_versions": OrderedDict(),
+        "articles": {},
+    }
+
+
+def get_story_key(story) -> str:
+    return clean_text(story.get("sub_cluster_id")) or clean_text(story.get("representative_title")) or "Untitled"
+
+
+def get_decay_weights(timestamps, now: float):
+    return np.exp2(-(now - np.asarray(timestamps, dtype=np.float64)) / (TRENDING_HALF_LIFE_HOURS * 3600.0))
+
+
+def prune_trending_articles(state) -> None:
+    articles = state["articles"]
+    keys = list(articles)
+    first_seen = np.fromiter(articles.values(), dtype=np.float64, count=len(keys))
+    weights = get_decay_weights(first_seen, state.get("now", 0.0))
+    keep = weights * (1.0 + TRENDING_SOURCE_WEIGHT) >= TRENDING_PRUNE_EPSILON
+    if keep.sum() > TRENDING_MAX_ARTICLES:
+        keep[np.argsort(-weights, kind="stable")[TRENDING_MAX_ARTICLES:]] = False
+    if not keep.all():
+        state["articles"] = {key: articles[key] for key, kept in zip(keys, keep.tolist()) if kept}
+    while len(state["applied_versions"]) > TRENDING_VERSION_HISTORY:
+        state["applied_versions"].popitem(last=False)
+
+
+def record_trending_articles(state, dataset) -> None:
+    # Only first-seen times are kept, keyed by article id: story ids are
+    # assigned per run, so velocity is summed per story when it is read.
+    table = dataset["table"]
+    run_at = parse_datetime(dataset["data"].get("run_at"))
+    fallback_timestamp = run_at.timestamp() if run_at else time.time()
+    timestamps = np.where(np.isnan(table["article_timestamp"]), fallback_timestamp, table["article_timestamp"])
+
+    with state["lock"]:
+        if dataset["version"] in state["applied_versions"]:
+            return
+        articles = state["articles"]
+        for key, timestamp in zip(get_article_keys(table), timestamps.tolist()):
+            articles.setdefault(key, timestamp)
+        if len(timestamps):
+            state["now"] = max(state.get("now", fallback_timestamp), float(timestamps.max()))
+        state["applied_versions"][dataset["version"]] = True
+        prune_trending_articles(state)
+        state["generation"] += 1
+
+
+@managed_cache("trending_scores", max_entries=4)
+def get_trending_scores(_dataset, version, generation):
+    state = get_trending_state()
+    table = _dataset["table"]
+    keys = get_article_keys(table)
+    with state["lock"]:
+        now = state.get("now", 0.0)
+        articles = state["articles"]
+        timestamps = np.fromiter((articles.get(key, np.nan) for key in keys), dtype=np.float64, count=len(keys))
+
+    seen = np.flatnonzero(~np.isnan(timestamps))
+    story_count = len(table["stories"])
+    article_story = table["article_story"][seen]
+    weights = get_decay_weights(timestamps[seen], now)
+    scores = np.bincount(article_story, weights=weights, minlength=story_count)
+    # A source counts once per story, from its earliest article.
+    pairs = article_story.astype(np.int64) * len(table["source_names"]) + table["article_source"][seen]
+    order = np.lexsort((timestamps[seen], pairs))
+    first = order[np.r_[True, pairs[order][1:] != pairs[order][:-1]]] if len(order) else order
+    scores += TRENDING_SOURCE_WEIGHT * np.bincount(article_story[first], weights=weights[first], minlength=story_count)
+    return scores
+
+
+def get_brand_dictionary():
+    dictionary_path = clean_text(os.getenv("BRAND_DICTIONARY_PATH", ""))
+    if dictionary_path:
+        try:
+            configured = json.loads(Path(dictionary_path).expanduser().read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            configured = None
+        if isinstance(configured, dict):
+            return {
+                clean_text(brand): [clean_text(alias) for alias in aliases if clean_text(alias)]
+                for brand, aliases in configured.items()
+                if clean_text(brand) and isinstance(aliases, list)
+            }
+    return BRAND_DICTIONARY
+
+
+def build_entity_automaton(dictionary):
+    brand_names = tuple(dictionary)
+    transitions = [{}]
+    outputs = [()]
+    for brand_code, brand_name in enumerate(brand_names):
+        for alias in [brand_name, *dictionary[brand_name]]:
+            node = 0
+            for token in WORD_PATTERN.findall(alias.lower()):
+                next_node = transitions[node].get(token)
+                if next_node is None:
+                    next_node = len(transitions)
+                    transitions[node][token] = next_node
+                    transitions.append({})
+                    outputs.append(())
+                node = next_node
+            if node and brand_code not in outputs[node]:
+                outputs[node] += (brand_code,)
+
+    failures = [0] * len(transitions)
+    queue = list(transitions[0].values())
+    for node in queue:
+        for token, next_node in transitions[node].items():
+            fallback = failures[node]
+            while fallback and token not in transitions[fallback]:
+                fallback = failures[fallback]
+            failures[next_node] = transitions[fallback].get(token, 0)
+            outputs[next_node] += tuple(code for code in outputs[failures[next_node]] if code not in outputs[next_node])
+            queue.append(next_node)
+    return {"brand_names": brand_names, "transitions": transitions, "failures": failures, "outputs": outputs}
+
+
+@st.cache_resource(show_spinner=False)
+def get_worker_pool():
+    max_workers = max(safe_int(os.getenv("WORKER_PROCESSES"), default=os.cpu_count() or 1), 1)
+    # Forked children would inherit the server's threads and locks; the fork
+    # server starts clean and only needs the importable workers module.
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["workers"])
+    return {
+        "executor": ProcessPoolExecutor(max_workers=max_workers, mp_context=context),
+        "workers": max_workers,
+        "broken": False,
+        "lock": threading.Lock(),
+        "jobs": OrderedDict(),
+    }
+
+
+def create_job(key, label: str, reuse: bool = False):
+    pool = get_worker_pool()
+    with pool["lock"]:
+        job = pool["jobs"].get(key)
+        # A failed job is kept so its error shows instead of being retried on
+        # every rerun; a running job for other arguments is superseded.
+        if reuse and job is not None and job["label"] == label and (job["finished_at"] is None or job["error"]):
+            pool["jobs"].move_to_end(key)
+            return job, False
+        if job is not None and job["finished_at"] is None:
+            job["cancelled"] = True
+        job = {
+            "key": key,
+            "label": label,
+            "stage": "Queued",
+            "done": 0,
+            "total": 0,
+            "started_at": time.time(),
+            "finished_at": None,
+            "cancelled": False,
+            "error": None,
+        }
+        pool["jobs"][key] = job
+        pool["jobs"].move_to_end(key)
+        finished = [name for name, entry in pool["jobs"].items() if entry["finished_at"] is not None]
+        for name in finished[: max(len(finished) - WORKER_JOB_HISTORY, 0)]:
+            del pool["jobs"][name]
+    return job, True
+
+
+def check_job_cancelled(job) -> None:
+    if job is not None and job["cancelled"]:
+        raise RuntimeError(f"{job['label']} was superseded")
+
+
+def run_job(job, target, *args):
+    try:
+        return target(*args, job=job)
+    except Exception as exc:
+        job["error"] = str(exc) or exc.__class__.__name__
+        raise
+    finally:
+        job["finished_at"] = time.time()
+
+
+def run_background_job(job, target, args) -> None:
+    try:
+        run_job(job, target, *args)
+    except Exception:
+        pass
+
+
+def start_background_job(key, label: str, target, *args):
+    job, created = create_job(key, label, reuse=True)
+    if created:
+        threading.Thread(
+            target=run_background_job, args=(job, target, args), name=f"job-{label}", daemon=True
+        ).start()
+    return job
+
+
+def split_chunks(items, worker_count: int, chunk_items: int = WORKER_CHUNK_ITEMS):
+    size = max(-(-len(items) // (worker_count * 2)), chunk_items)
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def run_job_chunks(job, stage: str, func, items, *args, chunk_items: int = WORKER_CHUNK_ITEMS):
+    pool = get_worker_pool()
+    chunks = split_chunks(items, pool["workers"], chunk_items)
+    if job is not None:
+        job.update(stage=stage, done=0, total=len(chunks))
+    results = [None] * len(chunks)
+    if len(chunks) > 1 and pool["workers"] > 1 and not pool["broken"]:
+        futures = {}
+        try:
+            futures = {pool["executor"].submit(func, chunk, *args): index for index, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if job is not None:
+                    job["done"] += 1
+                check_job_cancelled(job)
+            return results
+        except (BrokenProcessPool, OSError):
+            pool["broken"] = True
+        finally:
+            for future in futures:
+                future.cancel()
+    for index, chunk in enumerate(chunks):
+        check_job_cancelled(job)
+        if results[index] is None:
+            results[index] = func(chunk, *args)
+            if job is not None:
+                job["done"] += 1
+    return results
+
+
+def poll_job(job) -> None:
+    if job["finished_at"] is not None:
+        st.rerun(scope="app")
+    progress = job["done"] / job["total"] if job["total"] else 0.0
+    st.progress(min(progress, 1.0), text=f"{job['label']} · {job['stage']} {job['done']}/{job['total']}")
+
+
+def render_job_progress(job) -> None:
+    if job["error"] is not None:
+        st.error(f"{job['label']} failed: {job['error']}")
+        return
+    st.fragment(poll_job, run_every=WORKER_POLL_SECONDS)(job)
+
+
+def render_job_report() -> None:
+    pool = get_worker_pool()
+    with pool["lock"]:
+        jobs = list(pool["jobs"].values())
+    now = time.time()
+    rows = []
+    for job in reversed(jobs):
+        if job["error"] is not None:
+            status = "failed"
+        elif job["finished_at"] is not None:
+            status = "done"
+        else:
+            status = f"{job['stage']} {job['done']}/{job['total']}"
+        elapsed = (job["finished_at"] or now) - job["started_at"]
+        rows.append((job["label"], status, f"{elapsed:.1f}s"))
+    mode = "inline" if pool["broken"] or pool["workers"] < 2 else f"{pool['workers']} processes"
+    st.caption(f"Worker pool · {mode}")
+    if rows:
+        st.dataframe(pd.DataFrame(rows, columns=["Job", "Status", "Time"]), hide_index=True, width="stretch")
+
+
+@st.cache_resource(show_spinner=False)
+def get_entity_match_cache():
+    return {"lock": threading.Lock(), "entries": OrderedDict(), "limit": ENTITY_MATCH_CACHE_ITEMS}
+
+
+def lookup_keyed_cache(cache, keys):
+    with cache["lock"]:
+        entries = cache["entries"]
+        values = [entries.get(key) for key in keys]
+        for key, value in zip(keys, values):
+            if value is not None:
+                entries.move_to_end(key)
+    return values
+
+
+def fill_keyed_cache(cache, items) -> None:
+    with cache["lock"]:
+        entries = cache["entries"]
+        for key, value in items:
+            entries[key] = value
+            entries.move_to_end(key)
+        while len(entries) > cache["limit"]:
+            entries.popitem(last=False)
+
+
+def build_entity_index(table, dictionary=None, job=None):
+    dictionary = get_brand_dictionary() if dictionary is None else dictionary
+    automaton = build_entity_automaton(dictionary)
+    cache = get_entity_match_cache()
+    cache_token = hashlib.sha1(json.dumps(dictionary, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    # Keyed on the matched text itself: ids are reused across runs for
+    # articles whose title or preview was re-scraped.
+    texts = [
+        " \n ".join(str(get_long_text(article, field) or "") for field in ENTITY_MATCH_FIELDS)
+        for article in table["articles"]
+    ]
+    keys = [(cache_token, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()) for text in texts]
+    matches = lookup_keyed_cache(cache, keys)
+    missing = [index for index, brands in enumerate(matches) if brands is None]
+    if missing:
+        missing_texts = [texts[index] for index in missing]
+        chunks = run_job_chunks(job, "Brand extraction", match_entity_chunk, missing_texts, automaton)
+        for index, brands in zip(missing, (brands for chunk in chunks for brands in chunk)):
+            matches[index] = brands
+        fill_keyed_cache(cache, ((keys[index], matches[index]) for index in missing))
+
+    offsets = [0]
+    article_brands = []
+    for brands in matches:
+        article_brands.extend(brands)
+        offsets.append(len(article_brands))
+
+    return make_entity_index(
+        automaton["brand_names"], np.asarray(offsets, dtype=np.int64), np.asarray(article_brands, dtype=np.int16)
+    )
+
+
+def make_entity_index(brand_names, offsets, article_brands):
+    entry_article = np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets))
+    return {
+        "brand_names": brand_names,
+        "brand_codes": {name: code for code, name in enumerate(brand_names)},
+        "article_offsets": offsets,
+        "article_brands": article_brands,
+        "entry_article": entry_article,
+        "brand_articles": np.bincount(article_brands, minlength=len(brand_names)),
+    }
+
+
+def count_brand_articles(entities, article_mask=None):
+    brand_count = len(entities["brand_names"])
+    if article_mask is None:
+        return entities["brand_articles"]
+    codes = entities["article_brands"][article_mask[entities["entry_article"]]]
+    return np.bincount(codes, minlength=brand_count)
+
+
+def get_group_pairs(keys, limit: int):
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    kept = np.repeat((sizes > 1) & (sizes <= limit), sizes)
+    if not kept.any():
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    positions = np.flatnonzero(kept)
+    counts = np.repeat(starts + sizes, sizes)[kept] - positions - 1
+    left = np.repeat(positions, counts)
+    right = left + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return order[left], order[right]
+
+
+def make_related_index(table, neighbors, scores):
+    return {
+        "story_positions": {id(story): index for index, story in enumerate(table["stories"])},
+        "neighbors": neighbors,
+        "scores": scores,
+    }
+
+
+def build_related_index(table):
+    story_count = len(table["stories"])
+    neighbors = np.full((story_count, RELATED_STORIES_K), -1, dtype=np.int32)
+    scores = np.zeros((story_count, RELATED_STORIES_K), dtype=np.float32)
+    related = make_related_index(table, neighbors, scores)
+
+    vocabulary = {}
+    entry_story = []
+    entry_term = []
+    entry_count = []
+    for story_index, story in enumerate(table["stories"]):
+        counts = Counter()
+        titles = " ".join(article["title"] for article in story["articles"])
+        for text, weight in ((titles, RELATED_TITLE_WEIGHT), (get_story_summary(story), 1)):
+            for token in WORD_PATTERN.findall(text.lower()):
+                if len(token) >= RELATED_MIN_TOKEN:
+                    counts[token] += weight
+        for term, count in counts.items():
+            entry_story.append(story_index)
+            entry_term.append(vocabulary.setdefault(term, len(vocabulary)))
+            entry_count.append(count)
+    if not entry_story:
+        return related
+
+    entry_story = np.asarray(entry_story, dtype=np.int64)
+    entry_term = np.asarray(entry_term, dtype=np.int64)
+    document_frequency = np.bincount(entry_term, minlength=len(vocabulary))[entry_term]
+    # Terms in many stories are stop words or site boilerplate; dropping them
+    # keeps the scores about content and bounds the pairwise join below.
+    max_df = max(min(RELATED_MAX_DF, int(story_count * RELATED_MAX_DF_RATIO)), 2)
+    weights = (1.0 + np.log(entry_count)) * np.log(story_count / document_frequency)
+    weights[document_frequency > max_df] = 0.0
+    norms = np.sqrt(np.bincount(entry_story, weights=weights**2, minlength=story_count))
+    weights = weights / np.maximum(norms[entry_story], 1e-12)
+
+    left, right = get_group_pairs(entry_term, max_df)
+    if not len(left):
+        return related
+    pair_keys, pair_codes = np.unique(entry_story[left] * story_count + entry_story[right], return_inverse=True)
+    similarity = np.bincount(pair_codes, weights=weights[left] * weights[right])
+    keep = similarity >= RELATED_MIN_SIMILARITY
+    first, second = np.divmod(pair_keys[keep], story_count)
+    source = np.r_[first, second]
+    target = np.r_[second, first]
+    similarity = np.r_[similarity[keep], similarity[keep]]
+
+    order = np.lexsort((target, -similarity, source))
+    source, target, similarity = source[order], target[order], similarity[order]
+    group_starts = np.flatnonzero(np.r_[True, source[1:] != source[:-1]])
+    rank = np.arange(len(source)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(source)]))
+    top = rank < RELATED_STORIES_K
+    neighbors[source[top], rank[top]] = target[top]
+    scores[source[top], rank[top]] = similarity[top]
+    return related
+
+
+@st.cache_resource(show_spinner=False)
+def get_minhash_signature_cache():
+    return {"lock": threading.Lock(), "entries": OrderedDict(), "limit": MINHASH_CACHE_ITEMS}
+
+
+def get_minhash_params():
+    rng = np.random.default_rng(MINHASH_SEED)
+    a = rng.integers(1, 1 << 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def compute_minhash_signatures(texts, job=None):
+    a, b = get_minhash_params()
+    chunks = run_job_chunks(job, "MinHash signatures", compute_minhash_chunk, texts, a, b, MINHASH_BATCH_SIZE)
+    if not chunks:
+        return np.empty((0, MINHASH_PERMUTATIONS), dtype=np.uint32)
+    return np.concatenate(chunks)
+
+
+def get_minhash_signatures(articles, job=None):
+    cache = get_minhash_signature_cache()
+    texts = [
+        (str(article.get("title") or ""), str(get_long_text(article, "content_preview") or ""), str(article.get("id")))
+        for article in articles
+    ]
+    keys = [hashlib.blake2b("\x1f".join(text).encode("utf-8"), digest_size=16).digest() for text in texts]
+    signatures = lookup_keyed_cache(cache, keys)
+    missing = [index for index, signature in enumerate(signatures) if signature is None]
+    if missing:
+        computed = compute_minhash_signatures([texts[index] for index in missing], job)
+        for row, index in enumerate(missing):
+            # Copied so evicting some rows does not pin the whole batch array.
+            signatures[index] = computed[row].copy()
+        fill_keyed_cache(cache, ((keys[index], signatures[index]) for index in missing))
+    if not keys:
+        return np.empty((0, MINHASH_PERMUTATIONS), dtype=np.uint32)
+    return np.stack(signatures)
+
+
+def get_lsh_shape(threshold: float):
+    best = (MINHASH_PERMUTATIONS, 1)
+    best_error = float("inf")
+    for bands in range(1, MINHASH_PERMUTATIONS + 1):
+        if MINHASH_PERMUTATIONS % bands:
+            continue
+        rows = MINHASH_PERMUTATIONS // bands
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+def find_root(parents, index: int) -> int:
+    while parents[index] != index:
+        parents[index] = parents[parents[index]]
+        index = parents[index]
+    return index
+
+
+def cluster_signatures(signatures, threshold: float):
+    count = len(signatures)
+    parents = list(range(count))
+    if count < 2:
+        return parents
+
+    bands, rows = get_lsh_shape(threshold)
+    band_mixers = get_minhash_params()[0].ravel()
+    for band in range(bands):
+        band_keys = (signatures[:, band * rows : (band + 1) * rows].astype(np.uint64) * band_mixers[:rows]).sum(axis=1)
+        _, buckets = np.unique(band_keys, return_inverse=True)
+        order = np.argsort(buckets, kind="stable")
+        sorted_buckets = buckets[order]
+        starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+        leaders = order[np.repeat(starts, np.diff(np.r_[starts, count]))]
+        members = order
+        candidates = members != leaders
+        if not candidates.any():
+            continue
+        members, leaders = members[candidates], leaders[candidates]
+        similarity = (signatures[members] == signatures[leaders]).mean(axis=1)
+        for member, leader in zip(members[similarity >= threshold], leaders[similarity >= threshold]):
+            member_root, leader_root = find_root(parents, int(member)), find_root(parents, int(leader))
+            if member_root != leader_root:
+                parents[member_root] = leader_root
+    return [find_root(parents, index) for index in range(count)]
+
+
+def get_related_stories(dataset, story):
+    related = dataset["related"]
+    position = related["story_positions"].get(id(story))
+    if position is None:
+        return []
+    table = dataset["table"]
+    return [
+        (table["stories"][neighbor], table["category_names"][table["story_category"][neighbor]], float(score))
+        for neighbor, score in zip(related["neighbors"][position], related["scores"][position])
+        if neighbor >= 0
+    ]
+
+
+@managed_cache("minhash_signatures", max_entries=2)
+def get_dataset_signatures(_dataset, version, _job=None):
+    return get_minhash_signatures(_dataset["table"]["articles"], _job)
+
+
+def group_reclustered_articles(table, signatures, threshold: float, job=None):
+    article_category = table["article_category"]
+    roots = np.arange(len(article_category))
+    category_codes = np.unique(article_category)
+    if job is not None:
+        job.update(stage="Clustering", done=0, total=len(category_codes))
+    for code in category_codes:
+        members = np.flatnonzero(article_category == code)
+        roots[members] = members[np.asarray(cluster_signatures(signatures[members], threshold), dtype=np.intp)]
+        if job is not None:
+            job["done"] += 1
+        check_job_cancelled(job)
+    # Stories keep the order of their first article, as the payload listed them.
+    _, first, story_codes = np.unique(roots, return_index=True, return_inverse=True)
+    order = np.empty(len(first), dtype=np.int32)
+    order[np.argsort(first, kind="stable")] = np.arange(len(first), dtype=np.int32)
+    return order[story_codes.ravel()]
+
+
+def build_reclustered_story(table, members, threshold: float):
+    members = members.tolist()
+    representative = max(
+        members,
+        key=lambda index: (table["articles"][index]["is_representative"], table["articles"][index]["auto_score"]),
+    )
+    representative_article = table["articles"][representative]
+    origin = table["stories"][table["article_story"][representative]]
+    sources = sorted({table["source_names"][code] for code in table["article_source"][members].tolist()})
+    summary_ref = origin.get("summary_ref") or representative_article.get("content_preview_ref")
+    return {
+        "sub_cluster_id": f"mh_{origin.get('sub_cluster_id') or representative_article.get('id')}",
+        "story_count": len(sources),
+        "summary": origin.get("summary") or representative_article.get("content_preview"),
+        **({"summary_ref": summary_ref} if summary_ref else {}),
+        "representative_title": representative_article.get("title") or origin.get("representative_title"),
+        "sources": sources,
+        "articles": [representative_article]
+        + [table["articles"][index] for index in members if index != representative],
+        "cluster_reason": f"Regrouped at MinHash similarity >= {threshold:.2f}",
+    }
+
+
+def inherit_related_index(table, base_table, base_related):
+    # Neighbours come from the base run's index, mapped onto the new stories,
+    # instead of re-scoring every story's text for each threshold.
+    base_latest = base_table["story_latest_article"]
+    story_of_base = np.where(base_latest >= 0, table["article_story"][base_latest], -1)
+    lead = base_table["article_story"][table["story_latest_article"]]
+    neighbors = np.asarray(base_related["neighbors"])[lead]
+    neighbors = np.where(neighbors >= 0, story_of_base[neighbors], -1)
+    scores = np.array(base_related["scores"])[lead]
+    neighbors[neighbors == np.arange(len(lead))[:, None]] = -1
+    for column in range(1, neighbors.shape[1]):
+        repeated = (neighbors[:, :column] == neighbors[:, column : column + 1]).any(axis=1)
+        neighbors[repeated, column] = -1
+    order = np.argsort(neighbors < 0, axis=1, kind="stable")
+    neighbors = np.take_along_axis(neighbors, order, axis=1).astype(np.int32)
+    scores = np.take_along_axis(scores, order, axis=1)
+    scores[neighbors < 0] = 0.0
+    return make_related_index(table, neighbors, scores)
+
+
+def build_reclustered_dataset(base, threshold: float, job=None):
+    # Only the story layer changes with the threshold: the article list, its
+    # arrays and the brand index are shared with the base dataset, and stories
+    # that come out unchanged keep their rows from the base build.
+    base_table = base["table"]
+    signatures = get_dataset_signatures(base, base["version"], job)
+    article_story = group_reclustered_articles(base_table, signatures, threshold, job)
+    story_count = int(article_story.max()) + 1 if len(article_story) else 0
+    members = np.argsort(article_story, kind="stable")
+    bounds = np.searchsorted(article_story[members], np.arange(story_count + 1))
+    latest = np.lexsort((np.arange(len(article_story)), -base_table["article_day"], article_story))[bounds[:-1]]
+
+    base_story = base_table["article_story"][members]
+    origin = np.full(story_count, -1, dtype=np.int64)
+    if story_count:
+        lowest = np.minimum.reduceat(base_story, bounds[:-1])
+        unchanged = (lowest == np.maximum.reduceat(base_story, bounds[:-1])) & (
+            np.diff(bounds) == np.bincount(base_table["article_story"], minlength=len(base_table["stories"]))[lowest]
+        )
+        origin[unchanged] = lowest[unchanged]
+
+    table = dict(base_table, article_story=article_story)
+    table["story_category"] = base_table["article_category"][members[bounds[:-1]]]
+    table["story_latest_day"] = base_table["article_day"][latest]
+    table["story_latest_article"] = latest.astype(np.int32)
+    origin = origin.tolist()
+    table["stories"] = tuple(
+        base_table["stories"][source]
+        if source >= 0
+        else build_reclustered_story(base_table, members[bounds[index] : bounds[index + 1]], threshold)
+        for index, source in enumerate(origin)
+    )
+
+    data = base["data"]
+    categories = {name: {"total_articles": 0, "unique_stories": 0, "stories": []} for name in get_categories(data)}
+    for story, code in zip(table["stories"], table["story_category"]):
+        categories[table["category_names"][code]]["stories"].append(story)
+    article_counts = np.bincount(base_table["article_category"], minlength=len(base_table["category_names"]))
+    for category_name, payload in categories.items():
+        payload["total_articles"] = int(article_counts[table["category_codes"][category_name]])
+        payload["unique_stories"] = len(payload["stories"])
+    data = {
+        "run_at": data["run_at"],
+        "stats": dict(data["stats"], similarity_threshold=threshold),
+        "categories": categories,
+    }
+
+    base_ranked = base["ranking"]["rows"]
+    base_facets = base["facets"]
+    story_rows = {"ranked": [], "feed": [], "source_count": [], "score": []}
+    for index, (story, source) in enumerate(zip(table["stories"], origin)):
+        if source >= 0:
+            story_rows["ranked"].append(dict(base_ranked[source], story_index=index))
+            story_rows["feed"].append(base["feed_rows"][source])
+            story_rows["source_count"].append(base_facets["story_source_count"][source])
+            story_rows["score"].append(base_ranked[source]["score"])
+        else:
+            story_rows["ranked"].append(build_ranked_row(table, index))
+            story_rows["feed"].append(build_feed_row(table, index))
+            story_rows["source_count"].append(get_story_count(story))
+            story_rows["score"].append(get_story_importance_score(story))
+
+    related = inherit_related_index(table, base_table, base["related"])
+    return assemble_dataset(
+        f"{base['version']}@{threshold:.2f}", data, base["quality"], table, base["entities"], related, story_rows
+    )
+
+
+def run_recluster_job(base, threshold: float, job=None):
+    started = time.perf_counter()
+    dataset = build_reclustered_dataset(base, threshold, job=job)
+    manager = get_cache_manager()
+    key = ("recluster", base["version"], threshold)
+    size = estimate_size(dataset, get_shared_object_ids([base]))
+    cost = time.perf_counter() - started
+    store_cache_entry(manager, key, "recluster", base["version"], dataset, size, cost, RECLUSTER_CACHE_ENTRIES)
+    with manager["lock"]:
+        if key not in manager["entries"]:
+            raise RuntimeError("re-clustered dataset does not fit in the cache budget")
+
+
+def get_recluster_job(dataset, threshold: float):
+    threshold = round(threshold, 2)
+    manager = get_cache_manager()
+    with manager["lock"]:
+        entry = lookup_cache_entry(manager, ("recluster", dataset["version"], threshold))
+    if entry is not None:
+        return entry["value"], None
+    # One job per base version: moving the slider supersedes the running
+    # build instead of stacking a thread per threshold.
+    job = start_background_job(
+        ("recluster", dataset["version"]),
+        f"Re-cluster {dataset['version'][:8]} @ {threshold:.2f}",
+        run_recluster_job,
+        dataset,
+        threshold,
+    )
+    return None, job
+
+
+def get_article_keys(table):
+    return [article["id"] or f"{article['title']}|{article['source']}" for article in table["articles"]]
+
+
+def get_shared_codes(names, codes):
+    return np.fromiter((codes.setdefault(name, len(codes)) for name in names), dtype=np.int64, count=len(names))
+
+
+def compare_runs(base_table, current_table):
+    base_positions = {}
+    for index, key in enumerate(get_article_keys(base_table)):
+        base_positions.setdefault(key, index)
+    current_keys = get_article_keys(current_table)
+    match = np.fromiter((base_positions.get(key, -1) for key in current_keys), dtype=np.int64, count=len(current_keys))
+
+    in_both = match >= 0
+    matched = np.zeros(len(base_table["articles"]), dtype=bool)
+    matched[match[in_both]] = True
+    current_index = np.flatnonzero(in_both)
+    base_index = match[in_both]
+
+    story_codes = {}
+    base_story = get_shared_codes([story["sub_cluster_id"] for story in base_table["stories"]], story_codes)
+    current_story = get_shared_codes([story["sub_cluster_id"] for story in current_table["stories"]], story_codes)
+    category_codes = {}
+    base_category = get_shared_codes(base_table["category_names"], category_codes)
+    current_category = get_shared_codes(current_table["category_names"], category_codes)
+
+    story_before = base_story[base_table["article_story"][base_index]]
+    story_after = current_story[current_table["article_story"][current_index]]
+    category_before = base_category[base_table["article_category"][base_index]]
+    category_after = current_category[current_table["article_category"][current_index]]
+    score_delta = np.round(
+        current_table["article_auto_score"][current_index].astype(np.float64)
+        - base_table["article_auto_score"][base_index].astype(np.float64),
+        4,
+    )
+    rescored = np.flatnonzero(score_delta != 0)
+    rescored = rescored[np.argsort(-np.abs(score_delta[rescored]), kind="stable")]
+
+    pairs = np.unique(story_after * len(story_codes) + story_before)
+    merged_stories, merged_counts = np.unique(pairs // len(story_codes), return_counts=True) if len(pairs) else ([], [])
+    split_stories, split_counts = np.unique(pairs % len(story_codes), return_counts=True) if len(pairs) else ([], [])
+    base_story_set = set(base_story[base_table["article_story"]].tolist())
+    current_story_set = set(current_story[current_table["article_story"]].tolist())
+
+    return {
+        "base_articles": len(base_table["articles"]),
+        "current_articles": len(current_table["articles"]),
+        "new": np.flatnonzero(~in_both),
+        "dropped": np.flatnonzero(~matched),
+        "moved": (current_index[story_before != story_after], base_index[story_before != story_after]),
+        "recategorized": (
+            current_index[category_before != category_after],
+            base_index[category_before != category_after],
+        ),
+        "rescored": (current_index[rescored], base_index[rescored], score_delta[rescored]),
+        "stories_added": len(current_story_set - base_story_set),
+        "stories_removed": len(base_story_set - current_story_set),
+        "stories_merged": int(np.count_nonzero(np.asarray(merged_counts) > 1)),
+        "stories_split": int(np.count_nonzero(np.asarray(split_counts) > 1)),
+    }
+
+
+def describe_articles(table, indices, prefix: str = ""):
+    articles = table["articles"]
+    return {
+        f"{prefix}title": [articles[index]["title"] for index in indices],
+        f"{prefix}story": [table["stories"][table["article_story"][index]]["sub_cluster_id"] for index in indices],
+        f"{prefix}category": [table["category_names"][table["article_category"][index]] for index in indices],
+    }
+
+
+def build_comparison_rows(comparison, base_table, current_table, name: str, limit: int):
+    if name in ("new", "dropped"):
+        table = current_table if name == "new" else base_table
+        indices = comparison[name][:limit]
+        ids = [table["articles"][index]["id"] for index in indices]
+        return pd.DataFrame({"id": ids, **describe_articles(table, indices)})
+
+    current_index, base_index = comparison[name][0][:limit], comparison[name][1][:limit]
+    rows = {"id": [current_table["articles"][index]["id"] for index in current_index]}
+    if name == "rescored":
+        rows["title"] = [current_table["articles"][index]["title"] for index in current_index]
+        rows["score_before"] = base_table["article_auto_score"][base_index]
+        rows["score_after"] = current_table["article_auto_score"][current_index]
+        rows["score_delta"] = comparison[name][2][:limit]
+        return pd.DataFrame(rows)
+    before = describe_articles(base_table, base_index, "before_")
+    after = describe_articles(current_table, current_index, "after_")
+    field = "story" if name == "moved" else "category"
+    rows.update(
+        {
+            "title": after["after_title"],
+            f"{field}_before": before[f"before_{field}"],
+            f"{field}_after": after[f"after_{field}"],
+        }
+    )
+    return pd.DataFrame(rows)
+
+
+@managed_cache("run_comparison", max_entries=4, spinner="Comparing runs...", version_arg="current_version")
+def get_run_comparison(_base_table, base_version, _current_table, current_version):
+    return compare_runs(_base_table, _current_table)
+
+
+@managed_cache("comparison_table", max_entries=1, spinner="Loading comparison run...", version_arg=None)
+def get_comparison_table(version, results_path: str):
+    data, _ = validate_payload(load_results(Path(results_path)))
+    return build_article_table(data) if data is not None else None
+
+
+def get_comparison_baselines(dataset):
+    baselines = {}
+    base_version = dataset["version"].split("@", 1)[0]
+    store = get_data_store()
+    current = store["current"]
+    if dataset["version"] != base_version and current is not None and current["version"] == base_version:
+        baselines["Upstream clustering"] = (current["table"], base_version)
+    previous = store["previous"]
+    if previous is not None:
+        baselines[f"Previous run ({previous['metrics']['last_updated']})"] = (previous["table"], previous["version"])
+    compare_path = clean_text(os.getenv("RESULTS_COMPARE_PATH", ""))
+    if compare_path:
+        results_path = Path(compare_path).expanduser()
+        version = get_data_version(results_path) if results_path.exists() else None
+        if version:
+            baselines[f"Comparison file ({results_path.name})"] = (results_path, version)
+    return baselines
+
+
+def estimate_size(obj, seen=None) -> int:
+    seen = set() if seen is None else seen
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        nbytes = getattr(current, "nbytes", None)
+        if isinstance(nbytes, int):
+            total += nbytes
+            continue
+        total += sys.getsizeof(current)
+        if isinstance(current, (dict, MappingProxyType)):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return total
+
+
+@managed_cache("memory_sizes", max_entries=4)
+def get_shared_memory_sizes(_dataset, version):
+    dataset = _dataset
+    seen = set()
+    return tuple((name, estimate_size(value, seen)) for name, value in dataset.items())
+
+
+@st.cache_resource(show_spinner=False)
+def get_session_registry():
+    return {}
+
+
+def get_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+
+def track_session_memory() -> None:
+    registry = get_session_registry()
+    now = time.time()
+    state = {key: st.session_state[key] for key in st.session_state}
+    registry[get_session_id()] = {
+        "user": st.session_state.get("user") or "-",
+        "bytes": estimate_size(state),
+        "seen_at": now,
+    }
+    for session_id, entry in list(registry.items()):
+        if now - entry["seen_at"] > SESSION_STALE_SECONDS:
+            registry.pop(session_id, None)
+
+
+def flush_interaction_log(log) -> None:
+    with log["lock"]:
+        records = []
+        while log["queue"]:
+            records.append(log["queue"].popleft())
+        if not records:
+            return
+        payload = "".join(json.dumps(record, default=str) + "\n" for record in records).encode("utf-8")
+        try:
+            log["path"].parent.mkdir(parents=True, exist_ok=True)
+            rotate_interaction_log(log, len(payload))
+            # One O_APPEND write per batch keeps lines whole when several
+            # worker processes share the log.
+            fd = os.open(log["path"], os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+            log["written"] += len(records)
+        except OSError as exc:
+            log["error"] = str(exc)
+            log["dropped"] += len(records)
+
+
+def rotate_interaction_log(log, incoming: int) -> None:
+    try:
+        size = log["path"].stat().st_size
+    except FileNotFoundError:
+        return
+    if size and size + incoming > log["max_bytes"]:
+        try:
+            os.replace(log["path"], log["path"].with_name(log["path"].name + ".1"))
+        except FileNotFoundError:
+            # Another worker sharing the log rotated it first.
+            pass
+
+
+def run_interaction_log_writer(log) -> None:
+    while True:
+        log["wake"].wait(INTERACTION_LOG_FLUSH_SECONDS)
+        log["wake"].clear()
+        flush_interaction_log(log)
+
+
+@st.cache_resource(show_spinner=False)
+def get_interaction_log():
+    configured = os.getenv("INTERACTION_LOG_PATH", "")
+    if not configured.strip():
+        return None
+    max_mb = safe_float(os.getenv("INTERACTION_LOG_MAX_MB"), default=INTERACTION_LOG_MAX_MB)
+    log = {
+        "path": Path(configured).expanduser(),
+        "max_bytes": int(max(max_mb, 1.0) * 1024 * 1024),
+        "queue": deque(),
+        "lock": threading.Lock(),
+        "wake": threading.Event(),
+        "written": 0,
+        "dropped": 0,
+        "error": None,
+    }
+    threading.Thread(target=run_interaction_log_writer, args=(log,), name="interaction-log", daemon=True).start()
+    atexit.register(flush_interaction_log, log)
+    return log
+
+
+def get_interaction_state():
+    return {
+        key: st.session_state[key]
+        for key in sorted(st.session_state)
+        if isinstance(key, str) and key.startswith(INTERACTION_STATE_KEYS)
+    }
+
+
+def record_interaction(started: float, error=None) -> None:
+    log = get_interaction_log()
+    if log is None or not st.session_state.get("logged_in"):
+        return
+    # st.rerun() and st.stop() end a run by raising; compare by name rather
+    # than importing Streamlit's runner internals.
+    outcome = "ok" if error is None else INTERACTION_OUTCOMES.get(type(error).__name__, "error")
+    started = st.session_state.pop("_interaction_rerun_started", started)
+    if outcome == "rerun":
+        # The rerun belongs to the same interaction: log it once, timed from
+        # the first run and diffed against the state before it.
+        st.session_state["_interaction_rerun_started"] = started
+        return
+    elapsed = time.perf_counter() - started
+    state = json.loads(json.dumps(get_interaction_state(), default=str))
+    previous = st.session_state.get("_interaction_state")
+    st.session_state["_interaction_state"] = state
+    if previous is None:
+        changed = ["login"]
+    else:
+        changed = [
+            key
+            for key, value in state.items()
+            if (value is True if key in INTERACTION_TRIGGER_KEYS else previous.get(key) != value)
+        ]
+    if len(log["queue"]) >= INTERACTION_LOG_BUFFER:
+        log["dropped"] += 1
+        return
+    log["queue"].append(
+        {
+            "ts": round(time.time(), 3),
+            "session": get_session_id(),
+            "version": st.session_state.get("data_version"),
+            "changed": changed,
+            "page": st.session_state.get("grid_page", 0),
+            "state": state,
+            "duration_ms": round(elapsed * 1000, 1),
+            "outcome": outcome,
+        }
+    )
+
+
+def render_interaction_log_status() -> None:
+    log = get_interaction_log()
+    if log is None:
+        st.caption("Interaction log · off")
+        return
+    status = f"Interaction log · {log['written']:,} written · {len(log['queue'])} buffered"
+    if log["dropped"]:
+        status += f" · {log['dropped']:,} dropped"
+    st.caption(status)
+    if log["error"]:
+        st.caption(f"Last log write failed: {log['error'][:120]}")
+
+
+def render_remote_status(remote_sync) -> None:
+    meta = read_remote_meta(remote_sync["cache_path"])
+    fetched = format_run_at(meta.get("fetched_at")) if meta else "never"
+    checked = remote_sync["checked_at"].strftime("%H:%M:%S") if remote_sync["checked_at"] else "pending"
+    st.caption(f"Remote results · fetched {fetched} · checked {checked}")
+    if remote_sync["error"]:
+        st.caption(f"Last fetch failed, serving cached copy: {remote_sync['error'][:120]}")
+
+
+def format_bytes(value: int) -> str:
+    size = float(value)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def render_quality_report(quality) -> None:
+    if not quality:
+        st.caption("No data-quality report for this dataset.")
+        return
+    st.caption(
+        f"{quality['categories']} categories · {quality['stories']:,} stories · {quality['articles']:,} articles"
+    )
+    if not quality["issues"]:
+        st.caption("No malformed fields found.")
+        return
+    rows = list(quality["issues"].items())
+    st.dataframe(pd.DataFrame(rows, columns=["Issue", "Count"]), hide_index=True, width="stretch")
+
+
+def render_memory_report(dataset):
+    shared_sizes = get_shared_memory_sizes(dataset, dataset["version"])
+    shared_rows = [(name, format_bytes(size)) for name, size in shared_sizes]
+    shared_total = sum(size for _, size in shared_sizes)
+    st.caption(f"Shared dataset · version {dataset['version']} · {format_bytes(shared_total)}")
+    st.dataframe(pd.DataFrame(shared_rows, columns=["Structure", "Size"]), hide_index=True, width="stretch")
+
+    current_session = get_session_id()
+    session_rows = []
+    for session_id, entry in sorted(get_session_registry().items(), key=lambda item: item[1]["seen_at"], reverse=True):
+        label = f"{session_id[:8]} (you)" if session_id == current_session else session_id[:8]
+        session_rows.append((label, entry["user"], format_bytes(entry["bytes"])))
+    st.caption(f"{len(session_rows)} active sessions")
+    st.dataframe(pd.DataFrame(session_rows, columns=["Session", "User", "State"]), hide_index=True, width="stretch")
+
+
+@st.cache_resource(show_spinner=False)
+def get_render_stats():
+    return {"lock": threading.Lock(), "cost": dict(RENDER_COST_SECONDS)}
+
+
+def get_render_limit(section: str, item_count: int) -> int:
+    cost = max(get_render_stats()["cost"][section], 1e-6)
+    limit = max(int(RENDER_BUDGET_SECONDS[section] / cost), RENDER_MIN_ITEMS[section])
+    return min(item_count, limit)
+
+
+def record_render_time(section: str, elapsed: float, item_count: int) -> None:
+    if item_count <= 0:
+        return
+    stats = get_render_stats()
+    with stats["lock"]:
+        previous = stats["cost"][section]
+        stats["cost"][section] = previous + RENDER_COST_SMOOTHING * (elapsed / item_count - previous)
+
+
+def create_scatter_plot(dataset, selected_categories, limit=None):
+    fig = go.Figure()
+    data = dataset["data"]
+    table = dataset["table"]
+    story_scores = dataset["facets"]["story_score"]
+    categories = get_categories(data)
+    rng = random.Random(42)
+    total = sum(len(get_story_list(categories.get(name) or {})) for name in selected_categories)
+    keep_fraction = 1.0 if limit is None or total <= limit else limit / total
+
+    for category_name in CATEGORY_NAMES:
+        if category_name not in selected_categories:
+            continue
+
+        stories = get_story_list(categories.get(category_name) or {})
+        if not stories:
+            continue
+        positions = range(len(stories))
+        if keep_fraction < 1.0:
+            keep = max(int(len(stories) * keep_fraction), 1)
+            # Table stories are laid out category by category in payload order,
+            # and a faceted view keeps that order, so this category's scores
+            # line up with its (filtered) story list.
+            selected = table["story_category"] == table["category_codes"][category_name]
+            if dataset["story_mask"] is not None:
+                selected &= dataset["story_mask"]
+            scores = story_scores[selected]
+            positions = np.sort(np.argpartition(-scores, keep - 1)[:keep]).tolist()
+
+        x_positions = []
+        y_positions = []
+        sizes = []
+        hovers = []
+
+        category_index = CATEGORY_NAMES.index(category_name)
+        for position in positions:
+            story = stories[position]
+            story_title = clean_text(story.get("representative_title")) or "Untitled"
+            story_sources = get_story_sources(story)
+            story_count = get_story_count(story)
+
+            base_x = (category_index % 3) * 30 + rng.uniform(-10, 10)
+            base_y = (category_index // 3) * 30 + rng.uniform(-10, 10)
+            x_positions.append(base_x)
+            y_positions.append(base_y)
+            sizes.append(min(16 + story_count * 7, 58))
+
+            source_preview = ", ".join(story_sources[:4]) if story_sources else "Unknown"
+            if len(story_sources) > 4:
+                source_preview += f" +{len(story_sources) - 4} more"
+
+            hovers.append(
+                f"<b>{html.escape(story_title[:75])}</b><br>"
+                f"<b>Category:</b> {html.escape(category_name)}<br>"
+                f"<b>Sources ({story_count}):</b> {html.escape(source_preview)}<br>"
+                "<i>Click for summary</i>"
+            )
+
+        fig.add_trace(
+            go.Scatter(
+                x=x_positions,
+                y=y_positions,
+                mode="markers",
+                marker=dict(
+                    size=sizes,
+                    color=CATEGORY_COLORS.get(category_name, "#2563eb"),
+                    line=dict(width=1, color="white"),
+                    opacity=0.76,
+                ),
+                name=category_name,
+                hovertemplate="%{hovertext}<extra></extra>",
+                hovertext=hovers,
+                customdata=[[category_name, position] for position in positions],
+                showlegend=True,
+            )
+        )
+
+    fig.update_layout(
+        height=560,
+        showlegend=True,
+        legend=dict(
+            orientation="v",
+            yanchor="top",
+            y=1,
+            xanchor="left",
+            x=1.01,
+            bgcolor="rgba(255,255,255,0.92)",
+            bordercolor="#e2e8f0",
+            borderwidth=1,
+        ),
+        hovermode="closest",
+        xaxis=dict(showgrid=True, gridcolor="#e5e7eb", zeroline=False, showticklabels=False, title=""),
+        yaxis=dict(showgrid=True, gridcolor="#e5e7eb", zeroline=False, showticklabels=False, title=""),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(color="#334155"),
+        margin=dict(l=20, r=130, t=15, b=15),
+    )
+    return fig
+
+
+def build_funnel_html(metrics) -> str:
+    total_articles = metrics["total_articles"]
+    relevant_articles = metrics["auto_relevant"]
+    sources = metrics["sources"]
+    stories = metrics["unique_stories"]
+    categories_total = len(CATEGORY_NAMES)
+    irrelevant_removed = max(total_articles - relevant_articles, 0)
+    duplicates_removed = max(relevant_articles - stories, 0)
+
+    return f"""
         <div class="funnel-container">
             <div class="funnel-stage" style="background: linear-gradient(135deg, #1e3a8a 0%, #2563eb 100%);">
                 <div class="funnel-value">{sources}</div>
@@ -807,38 +3743,86 @@ def render_pipeline_funnel(metrics):
                 <div class="funnel-label" style="color:#1e3a8a;">Categories</div>
             </div>
         </div>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
 
 
-def render_headline_ticker(data):
-    st.markdown('<div class="section-title">Latest Headlines</div>', unsafe_allow_html=True)
+def render_pipeline_funnel(metrics):
+    st.markdown('<div class="section-title">Pipeline Flow</div>', unsafe_allow_html=True)
+    st.markdown(build_funnel_html(metrics), unsafe_allow_html=True)
+
+
+def build_headline_html(ranked_stories) -> str:
     headlines = []
-    for row in collect_ranked_stories(data)[:15]:
+    for row in ranked_stories[:15]:
         safe_title = html.escape(row["title"][:120])
         safe_url = html.escape(row["url"], quote=True)
         headlines.append(f'<a href="{safe_url}" target="_blank" title="{safe_url}">• {safe_title}</a>')
+    return " &nbsp;&nbsp; ".join(headlines)
 
-    if not headlines:
-        st.info("No headlines available.")
-        return
 
-    headline_text = " &nbsp;&nbsp; ".join(headlines)
-    now_text = datetime.now().strftime("%B %d, %Y • %I:%M %p")
+def get_pipeline_timezone():
+    name = clean_text(os.getenv("PIPELINE_TIMEZONE", ""))
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
 
-    st.markdown(
-        f"""
+def get_data_age_seconds(data):
+    run_at = parse_datetime((data or {}).get("run_at"))
+    if run_at is None:
+        return None
+    # A naive run_at says nothing about its zone, so the age is only known
+    # when PIPELINE_TIMEZONE names the zone the pipeline stamps it in.
+    if run_at.tzinfo is None:
+        pipeline_timezone = get_pipeline_timezone()
+        if pipeline_timezone is None:
+            return None
+        run_at = run_at.replace(tzinfo=pipeline_timezone)
+    return max((datetime.now(timezone.utc) - run_at).total_seconds(), 0.0)
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+
+def get_ticker_status_html(data, auto_refresh: bool) -> str:
+    age = get_data_age_seconds(data)
+    if age is None:
+        return '<span class="headline-time">UPDATED —</span>'
+    if auto_refresh and age <= DATA_LIVE_SECONDS:
+        return '<span class="headline-time flashing">LIVE</span>'
+    return f'<span class="headline-time">UPDATED {format_age(age)} AGO</span>'
+
+
+def build_ticker_html(dataset, status_html: str) -> str:
+    run_at = parse_datetime(dataset["data"]["run_at"])
+    updated_text = run_at.strftime("%B %d, %Y • %I:%M %p") if run_at else "—"
+    return f"""
         <div class="scrolling-text">
-            <span class="headline-time flashing">LIVE</span>
-            <span class="headline-time">{html.escape(now_text)}</span>
+            {status_html}
+            <span class="headline-time">{html.escape(updated_text)}</span>
             <marquee behavior="scroll" direction="left" scrollamount="5" style="display:inline-block;width:calc(100% - 220px);">
-                {headline_text}
+                {dataset["fragments"]["headlines"]}
             </marquee>
         </div>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def render_headline_ticker(dataset, auto_refresh: bool = False):
+    st.markdown('<div class="section-title">Latest Headlines</div>', unsafe_allow_html=True)
+    if not dataset["fragments"]["headlines"]:
+        st.info("No headlines available.")
+        return
+
+    status_html = get_ticker_status_html(dataset["data"], auto_refresh)
+    st.markdown(build_ticker_html(dataset, status_html), unsafe_allow_html=True)
 
 
 def render_story_details(story, index: int):
@@ -863,115 +3847,119 @@ def render_story_details(story, index: int):
     subtle_hr()
 
 
-def render_top_stories_grid(data):
-    st.markdown('<div class="section-title">Top Stories</div>', unsafe_allow_html=True)
+def build_top_story_cards(data, key=get_story_importance_score):
     categories = get_categories(data)
+    cards = {}
+    for category_name in CATEGORY_NAMES:
+        category_payload = categories.get(category_name) or {}
+        stories = sorted(get_story_list(category_payload), key=key, reverse=True)
+        top_rows = []
+        for story in stories[:3]:
+            title = clean_text(story.get("representative_title")) or "Untitled"
+            url = get_story_link(story)
+            top_rows.append((title, url))
+
+        if not top_rows:
+            top_rows = [("No stories available", "")]
+
+        titles_html = ""
+        for title, url in top_rows:
+            safe_title = html.escape(title[:120])
+            if url:
+                safe_url = html.escape(url, quote=True)
+                titles_html += f'<li><a href="{safe_url}" target="_blank" title="{safe_url}">{safe_title}</a></li>'
+            else:
+                titles_html += f"<li>{safe_title}</li>"
+        cards[category_name] = f"""
+                    <div class="top-story-card" style="border-top: 3px solid {CATEGORY_COLORS.get(category_name, '#2563eb')};">
+                        <p class="top-story-title">{html.escape(category_name)}</p>
+                        <ul class="top-story-list">{titles_html}</ul>
+                    </div>
+                    """
+    return cards
+
+
+def render_top_stories_grid(dataset):
+    st.markdown('<div class="section-title">Top Stories</div>', unsafe_allow_html=True)
+    cards = dataset["fragments"]["top_story_cards"]
 
     for start_idx in range(0, len(CATEGORY_NAMES), 4):
         cols = st.columns(4, gap="small")
         for offset, category_name in enumerate(CATEGORY_NAMES[start_idx : start_idx + 4]):
             with cols[offset]:
-                category_payload = categories.get(category_name) or {}
-                stories = sorted(get_story_list(category_payload), key=get_story_importance_score, reverse=True)
-                top_rows = []
-                for story in stories[:3]:
-                    title = clean_text(story.get("representative_title")) or "Untitled"
-                    url = get_story_link(story)
-                    top_rows.append((title, url))
-
-                if not top_rows:
-                    top_rows = [("No stories available", "")]
-
-                titles_html = ""
-                for title, url in top_rows:
-                    safe_title = html.escape(title[:120])
-                    if url:
-                        safe_url = html.escape(url, quote=True)
-                        titles_html += f'<li><a href="{safe_url}" target="_blank" title="{safe_url}">{safe_title}</a></li>'
-                    else:
-                        titles_html += f"<li>{safe_title}</li>"
-                st.markdown(
-                    f"""
-                    <div class="top-story-card" style="border-top: 3px solid {CATEGORY_COLORS.get(category_name, '#2563eb')};">
-                        <p class="top-story-title">{html.escape(category_name)}</p>
-                        <ul class="top-story-list">{titles_html}</ul>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+                st.markdown(cards[category_name], unsafe_allow_html=True)
 
 
-def build_recent_story_rows(data, selected_range, selected_category):
-    rows = []
+def build_feed_row(table, story_index: int):
+    story = table["stories"][story_index]
+    latest_article = table["story_latest_article"][story_index]
+    latest_day = table["story_latest_day"][story_index]
+    articles = story["articles"]
+    if latest_article >= 0 and latest_day >= 0:
+        representative_article = table["articles"][latest_article]
+    else:
+        representative_article = articles[0] if articles else {}
 
-    for category_name, category_payload in get_categories(data).items():
-        if selected_category != "All Categories" and category_name != selected_category:
-            continue
+    title = clean_text(representative_article.get("title"))
+    if not title:
+        title = clean_text(story.get("representative_title")) or "Untitled"
 
-        for story in get_story_list(category_payload):
-            articles = story.get("articles") or []
-            representative_article = articles[0] if articles else {}
-            latest_date = None
+    return {
+        "title": title,
+        "category": table["category_names"][table["story_category"][story_index]],
+        "source": normalize_source(representative_article.get("source")),
+        "url": make_clickable_url(representative_article.get("url"), title),
+        "published_at": date.fromordinal(int(latest_day)) if latest_day >= 0 else None,
+    }
 
-            for article in articles:
-                published_at = parse_datetime(article.get("published_at"))
-                if not published_at:
-                    continue
-                if latest_date is None or published_at.date() > latest_date:
-                    latest_date = published_at.date()
-                    representative_article = article
 
-            if latest_date and selected_range and len(selected_range) == 2:
-                if not (selected_range[0] <= latest_date <= selected_range[1]):
-                    continue
+def build_recent_story_rows(dataset):
+    latest_day = dataset["table"]["story_latest_day"]
+    story_mask = dataset["story_mask"]
+    selected = np.flatnonzero(story_mask) if story_mask is not None else np.arange(len(latest_day))
+    order = selected[np.argsort(-latest_day[selected], kind="stable")]
+    feed_rows = dataset["feed_rows"]
+    return [feed_rows[index] for index in order]
 
-            title = clean_text(representative_article.get("title"))
-            if not title:
-                title = clean_text(story.get("representative_title")) or "Untitled"
-
-            rows.append(
-                {
-                    "title": title,
-                    "category": category_name,
-                    "source": normalize_source(representative_article.get("source")),
-                    "url": make_clickable_url(representative_article.get("url"), title),
-                    "published_at": latest_date,
-                }
-            )
 
-    rows.sort(key=lambda item: item["published_at"] or datetime.min.date(), reverse=True)
-    return rows
+def build_news_card_html(story) -> str:
+    title = story["title"]
+    if len(title) > 110:
+        title = title[:107] + "..."
+
+    category = story["category"]
+    category_color = CATEGORY_COLORS.get(category, "#2563eb")
+    source_name = story["source"]
+    published = story["published_at"].strftime("%d %b %Y") if story.get("published_at") else "Unknown date"
 
+    safe_title = html.escape(title)
+    safe_category = html.escape(category)
+    safe_source = html.escape(source_name)
 
-def render_recent_news_grid(data):
+    title_html = safe_title
+    if story.get("url"):
+        safe_url = html.escape(story["url"], quote=True)
+        title_html = f'<a href="{safe_url}" target="_blank" title="{safe_url}">{safe_title}</a>'
+
+    return f"""
+                    <div class="news-card">
+                        <p class="news-title">{title_html}</p>
+                        <div class="news-meta">
+                            <span style="color:{category_color};font-weight:700;">&#9679;</span> {safe_category}<br>
+                            {safe_source}<br>
+                            {published}
+                        </div>
+                    </div>
+                    """
+
+
+def render_recent_news_grid(dataset):
     st.markdown('<div class="section-title">Latest Articles Feed</div>', unsafe_allow_html=True)
 
     if "grid_page" not in st.session_state:
         st.session_state.grid_page = 0
 
-    min_date, max_date = get_date_bounds(data)
-    if not min_date or not max_date:
-        today = datetime.now().date()
-        min_date = today
-        max_date = today
-
-    filter_col1, filter_col2 = st.columns([1.2, 1], gap="small")
-    with filter_col1:
-        selected_range = st.date_input(
-            "Date Range",
-            value=(min_date, max_date),
-            min_value=min_date,
-            max_value=max_date,
-            key="date_filter",
-        )
-    with filter_col2:
-        selected_category = st.selectbox(
-            "Category",
-            options=["All Categories"] + CATEGORY_NAMES,
-            index=0,
-            key="grid_category_filter",
-        )
-    filtered_rows = build_recent_story_rows(data, selected_range, selected_category)
+    filtered_rows = build_recent_story_rows(dataset)
 
     items_per_page = 8
     total_pages = max(1, (len(filtered_rows) + items_per_page - 1) // items_per_page)
@@ -1007,75 +3995,56 @@ def render_recent_news_grid(data):
         row_cols = st.columns(2, gap="small")
         for offset, story in enumerate(page_rows[start_idx : start_idx + 2]):
             with row_cols[offset]:
-                title = story["title"]
-                if len(title) > 110:
-                    title = title[:107] + "..."
-
-                category = story["category"]
-                category_color = CATEGORY_COLORS.get(category, "#2563eb")
-                source_name = story["source"]
-                published = story["published_at"].strftime("%d %b %Y") if story.get("published_at") else "Unknown date"
-
-                safe_title = html.escape(title)
-                safe_category = html.escape(category)
-                safe_source = html.escape(source_name)
-
-                title_html = safe_title
-                if story.get("url"):
-                    safe_url = html.escape(story["url"], quote=True)
-                    title_html = f'<a href="{safe_url}" target="_blank" title="{safe_url}">{safe_title}</a>'
-
-                st.markdown(
-                    f"""
-                    <div class="news-card">
-                        <p class="news-title">{title_html}</p>
-                        <div class="news-meta">
-                            <span style="color:{category_color};font-weight:700;">&#9679;</span> {safe_category}<br>
-                            {safe_source}<br>
-                            {published}
-                        </div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+                st.markdown(build_news_card_html(story), unsafe_allow_html=True)
 
     return None
 
 
-def render_trending_panel(data):
-    st.markdown('<div class="section-title">Trending Topics</div>', unsafe_allow_html=True)
-
-    trending = []
-    for category_name, category_payload in get_categories(data).items():
-        for story in get_story_list(category_payload):
-            trending.append(
-                {
-                    "title": clean_text(story.get("representative_title")) or "Untitled",
-                    "category": category_name,
-                    "count": get_story_count(story),
-                }
-            )
-
-    trending.sort(key=lambda row: row["count"], reverse=True)
-
-    for row in trending[:8]:
-        safe_title = html.escape(row["title"][:120])
-        safe_category = html.escape(row["category"])
-        color = CATEGORY_COLORS.get(row["category"], "#2563eb")
-        st.markdown(
+def build_trending_items(dataset):
+    table = dataset["table"]
+    scores = get_trending_scores(dataset, dataset["version"], get_trending_state()["generation"])
+    candidates = np.flatnonzero(dataset["story_mask"]) if dataset["story_mask"] is not None else np.arange(len(scores))
+    candidates = candidates[scores[candidates] > 0]
+    # Under custom ranking weights the stories with any velocity are ordered
+    # by the weighted score; the defaults order them by velocity alone.
+    order_scores = dataset.get("rank_scores", scores)
+    if len(candidates) > TRENDING_LIMIT:
+        candidates = candidates[np.argpartition(-order_scores[candidates], TRENDING_LIMIT)[:TRENDING_LIMIT]]
+    candidates = candidates[np.argsort(-order_scores[candidates], kind="stable")]
+
+    items = []
+    for story_index in candidates:
+        story = table["stories"][story_index]
+        category_name = table["category_names"][table["story_category"][story_index]]
+        safe_title = html.escape((clean_text(story.get("representative_title")) or "Untitled")[:120])
+        safe_category = html.escape(category_name)
+        color = CATEGORY_COLORS.get(category_name, "#2563eb")
+        meta = f"{safe_category} · {get_story_count(story)} sources · velocity {scores[story_index]:.1f}"
+        items.append(
             f"""
             <div class="trending-item">
                 <div class="trending-title">{safe_title}</div>
-                <div class="trending-meta"><span style="color:{color};font-weight:700;">&#9679;</span> {safe_category} · {row['count']} sources</div>
+                <div class="trending-meta"><span style="color:{color};font-weight:700;">&#9679;</span> {meta}</div>
             </div>
-            """,
-            unsafe_allow_html=True,
+            """
         )
+    return items
 
 
-def render_category_breakdown(data):
-    st.markdown('<div class="section-title">Category Breakdown</div>', unsafe_allow_html=True)
+def render_trending_panel(dataset):
+    st.markdown('<div class="section-title">Trending Topics</div>', unsafe_allow_html=True)
+
+    items = build_trending_items(dataset)
+    if not items:
+        st.info("No trending stories.")
+        return
+
+    for item in items:
+        st.markdown(item, unsafe_allow_html=True)
+
 
+def build_category_breakdown_items(data):
+    items = []
     categories = get_categories(data)
     for category_name in CATEGORY_NAMES:
         category_payload = categories.get(category_name) or {}
@@ -1087,24 +4056,27 @@ def render_category_breakdown(data):
         color = CATEGORY_COLORS.get(category_name, "#2563eb")
         safe_name = html.escape(category_name)
 
-        st.markdown(
+        items.append(
             f"""
             <div class="category-item" style="border-left-color:{color};">
                 <strong>{safe_name}</strong><br>
                 {total_articles} articles · {unique_stories} stories
             </div>
-            """,
-            unsafe_allow_html=True,
+            """
         )
+    return items
 
 
-def render_source_chart(data):
-    st.markdown('<div class="section-title">Articles by Source</div>', unsafe_allow_html=True)
+def render_category_breakdown(data):
+    st.markdown('<div class="section-title">Category Breakdown</div>', unsafe_allow_html=True)
+
+    for item in build_category_breakdown_items(data):
+        st.markdown(item, unsafe_allow_html=True)
 
-    aggregated = aggregate_sources(data, top_n=10)
+
+def build_source_figure(aggregated):
     if not aggregated:
-        st.info("No source data available.")
-        return
+        return None
 
     df_sources = pd.DataFrame(aggregated, columns=["Source", "Articles"])
 
@@ -1136,23 +4108,78 @@ def render_source_chart(data):
         xaxis_title="Articles",
         font=dict(size=11, color="#334155"),
     )
+    return fig_bar
 
-    st.plotly_chart(fig_bar, use_container_width=True)
 
+def build_brand_figure(brand_names, brand_totals):
+    rows = sorted(
+        ((brand_names[code], int(count)) for code, count in enumerate(brand_totals) if count > 0),
+        key=lambda row: row[1],
+        reverse=True,
+    )[:12]
+    if not rows:
+        return None
 
-def render_category_pie(data):
-    st.markdown('<div class="section-title">Articles by Category</div>', unsafe_allow_html=True)
+    df_brands = pd.DataFrame(rows, columns=["Brand", "Articles"])
+    fig_bar = go.Figure(
+        data=[
+            go.Bar(
+                x=df_brands["Articles"],
+                y=df_brands["Brand"],
+                orientation="h",
+                marker=dict(color="#0f766e"),
+                text=df_brands["Articles"],
+                textposition="outside",
+                hovertemplate="<b>%{y}</b><br>Articles: %{x}<extra></extra>",
+            )
+        ]
+    )
+    fig_bar.update_layout(
+        height=360,
+        margin=dict(l=10, r=10, t=5, b=10),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        showlegend=False,
+        yaxis={"categoryorder": "total ascending", "title": ""},
+        xaxis_title="Articles mentioning the brand",
+        font=dict(size=11, color="#334155"),
+    )
+    return fig_bar
+
+
+def render_brand_chart(dataset):
+    st.markdown('<div class="section-title">Coverage by Brand</div>', unsafe_allow_html=True)
+
+    fig_bar = dataset["figures"]["brands"]
+    if fig_bar is None:
+        st.info("No brand mentions found.")
+        return
+
+    st.plotly_chart(fig_bar, width="stretch")
+
+
+def render_source_chart(dataset):
+    st.markdown('<div class="section-title">Articles by Source</div>', unsafe_allow_html=True)
 
+    fig_bar = dataset["figures"]["sources"]
+    if fig_bar is None:
+        st.info("No source data available.")
+        return
+
+    st.plotly_chart(fig_bar, use_container_width=True)
+
+
+def build_category_pie_figure(table, cube):
+    category_codes = table["category_codes"]
+    category_totals = query_cube(cube, keep=("category",))
     rows = []
     for category_name in CATEGORY_NAMES:
-        payload = get_categories(data).get(category_name) or {}
-        total_articles, _ = get_category_totals(payload)
+        total_articles = int(category_totals[category_codes[category_name]])
         if total_articles > 0:
             rows.append((category_name, total_articles))
 
     if not rows:
-        st.info("No category data available.")
-        return
+        return None
 
     df = pd.DataFrame(rows, columns=["Category", "Articles"])
 
@@ -1175,11 +4202,121 @@ def render_category_pie(data):
         showlegend=False,
         paper_bgcolor="white",
     )
+    return fig
+
+
+def render_category_pie(dataset):
+    st.markdown('<div class="section-title">Articles by Category</div>', unsafe_allow_html=True)
+
+    fig = dataset["figures"]["category_pie"]
+    if fig is None:
+        st.info("No category data available.")
+        return
 
     st.plotly_chart(fig, use_container_width=True)
 
 
-def render_scatter_section(data):
+def render_coverage_timeline(dataset):
+    st.markdown('<div class="section-title">Coverage Timeline</div>', unsafe_allow_html=True)
+
+    min_date, max_date = dataset["date_bounds"]
+    if not min_date or not max_date:
+        st.info("No dated articles available.")
+        return
+
+    table = dataset["table"]
+    top_sources = get_timeline_top_sources(dataset["cube"])
+
+    control_col1, control_col2, control_col3 = st.columns([1, 1, 1.4], gap="small")
+    with control_col1:
+        group_by = st.radio("Break down by", ["Category", "Source"], horizontal=True, key="timeline_group")
+    with control_col2:
+        measure = st.radio("Count", ["Articles", "Stories"], horizontal=True, key="timeline_measure")
+    with control_col3:
+        if group_by == "Category":
+            source_options = ["All Sources"] + [table["source_names"][code] for code in top_sources]
+            selected_source = st.selectbox("Source", options=source_options, key="timeline_source")
+            categories = None
+            sources = None if selected_source == "All Sources" else [table["source_codes"][selected_source]]
+        else:
+            category_options = ["All Categories"] + [name for name in CATEGORY_NAMES if name in table["category_codes"]]
+            selected_category = st.selectbox("Category", options=category_options, key="timeline_category")
+            categories = None if selected_category == "All Categories" else [table["category_codes"][selected_category]]
+            sources = None
+
+    fig = build_timeline_figure(dataset, group_by, measure, categories, sources, top_sources)
+    if fig is None:
+        st.info("No coverage for this selection.")
+        return
+    st.plotly_chart(fig, width="stretch")
+
+
+def get_timeline_top_sources(cube):
+    source_totals = query_cube(cube, keep=("source",))
+    top_codes = np.argsort(-source_totals, kind="stable")[:TIMELINE_TOP_SOURCES]
+    return [int(code) for code in top_codes if source_totals[code] > 0]
+
+
+def build_timeline_figure(dataset, group_by: str, measure: str, categories, sources, top_sources):
+    table = dataset["table"]
+    cube = dataset["cube"]
+    min_date, max_date = dataset["date_bounds"]
+    keep = ("category", "day") if group_by == "Category" else ("source", "day")
+    series = query_cube(
+        cube,
+        measure=measure.lower(),
+        categories=categories,
+        sources=sources,
+        day_range=(min_date, max_date),
+        keep=keep,
+    )
+    days = [date.fromordinal(cube["day_start"] + offset) for offset in range(series.shape[1])]
+
+    traces = []
+    if group_by == "Category":
+        for category_name in CATEGORY_NAMES:
+            code = table["category_codes"].get(category_name)
+            if code is not None and series[code].any():
+                traces.append((category_name, series[code], CATEGORY_COLORS.get(category_name, "#2563eb")))
+    else:
+        for code in top_sources:
+            if series[code].any():
+                traces.append((table["source_names"][code], series[code], None))
+        other = series.sum(axis=0) - series[top_sources].sum(axis=0) if top_sources else series.sum(axis=0)
+        if other.any():
+            traces.append(("Other", other, "#64748b"))
+
+    if not traces:
+        return None
+
+    fig = go.Figure()
+    for name, values, color in traces:
+        fig.add_trace(
+            go.Bar(
+                x=days,
+                y=values,
+                name=name,
+                marker=dict(color=color) if color else None,
+                hovertemplate=f"<b>{html.escape(name)}</b><br>%{{x|%d %b %Y}}: %{{y}} {measure.lower()}<extra></extra>",
+            )
+        )
+
+    fig.update_layout(
+        barmode="stack",
+        height=320,
+        margin=dict(l=10, r=10, t=10, b=10),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        legend=dict(orientation="h", yanchor="top", y=-0.12, xanchor="left", x=0, font=dict(size=10)),
+        xaxis=dict(showgrid=False, tickformat="%d %b"),
+        yaxis=dict(showgrid=True, gridcolor="#e5e7eb", title=measure),
+        font=dict(size=11, color="#334155"),
+    )
+    return fig
+
+
+def render_scatter_section(dataset):
+    data = dataset["data"]
     st.markdown('<div class="section-title">Story Scatter Plot Visualization</div>', unsafe_allow_html=True)
     st.caption("Each bubble represents one clustered story. Bubble size maps to source count.")
 
@@ -1199,17 +4336,42 @@ def render_scatter_section(data):
         st.info("Select at least one cluster category to display the plot.")
         return
 
-    fig = create_scatter_plot(data, selected_categories)
+    categories = get_categories(data)
+    story_total = sum(len(get_story_list(categories.get(name) or {})) for name in selected_categories)
+    limit = get_render_limit("scatter", story_total)
+    started = time.perf_counter()
+    fig = create_scatter_plot(dataset, selected_categories, limit)
     config = {
         "scrollZoom": True,
         "displayModeBar": True,
         "modeBarButtonsToRemove": ["select2d", "lasso2d"],
         "toImageButtonOptions": {"format": "png", "filename": "auto_news_scatter"},
     }
-    st.plotly_chart(fig, use_container_width=True, config=config)
+    event = st.plotly_chart(
+        fig,
+        use_container_width=True,
+        config=config,
+        key="scatter_plot",
+        on_select="rerun",
+        selection_mode="points",
+    )
+    record_render_time("scatter", time.perf_counter() - started, limit)
+    if limit < story_total:
+        st.caption(
+            f"Reduced detail: showing the top {limit:,} of {story_total:,} stories to keep this section responsive."
+        )
+
+    for point in (event.selection.points if event else [])[:1]:
+        category_name, position = point.get("customdata") or (None, None)
+        stories = get_story_list(get_categories(data).get(category_name) or {})
+        if position is not None and 0 <= int(position) < len(stories):
+            story = stories[int(position)]
+            title = clean_text(story.get("representative_title")) or "Untitled"
+            st.info(f"**{title}**\n\n{get_story_summary(story)}")
 
 
-def render_detailed_stories(data):
+def render_detailed_stories(dataset):
+    data = dataset["data"]
     st.markdown('<div class="section-title">Detailed Stories by Category</div>', unsafe_allow_html=True)
 
     available_categories = [
@@ -1233,19 +4395,37 @@ def render_detailed_stories(data):
     total_articles, unique_stories = get_category_totals(category_payload)
     st.caption(f"{total_articles} articles · {unique_stories} stories")
 
-    for index, story in enumerate(stories, 1):
+    limit_key = f"detailed_story_limit_{slugify(selected_category)}"
+    budget_limit = get_render_limit("detailed_stories", len(stories))
+    limit = min(max(st.session_state.get(limit_key, budget_limit), budget_limit), len(stories))
+    started = time.perf_counter()
+
+    # Expander state follows the story, not its position, so an open story
+    # stays open when a refresh or re-ranking reorders the list.
+    seen_keys = set()
+    for index, story in enumerate(stories[:limit], 1):
         title = clean_text(story.get("representative_title")) or "Untitled"
-        summary = get_story_summary(story)
         sources = get_story_sources(story)
         story_count = get_story_count(story)
-
-        with st.expander(f"Story #{index}: {title} ({story_count} sources)", expanded=False):
-            st.info(f"Summary: {summary}")
+        story_key = get_story_key(story)
+        if story_key in seen_keys:
+            story_key = f"{story_key}#{index}"
+        seen_keys.add(story_key)
+
+        expander = st.expander(
+            f"Story #{index}: {title} ({story_count} sources)",
+            expanded=False,
+            key=f"story_detail_{slugify(selected_category)}_{story_key}",
+            on_change="rerun",
+        )
+        if not expander.open:
+            continue
+        with expander:
+            st.info(f"Summary: {get_story_summary(story)}")
             st.caption(f"Covered by: {', '.join(sources) if sources else 'Unknown'}")
             subtle_hr()
 
-            articles = story.get("articles") or []
-            for article_index, article in enumerate(articles, 1):
+            for article_index, article in enumerate(story["articles"], 1):
                 article_title = clean_text(article.get("title")) or "Untitled"
                 article_url = make_clickable_url(article.get("url"), article_title)
                 source = normalize_source(article.get("source"))
@@ -1254,6 +4434,202 @@ def render_detailed_stories(data):
                 st.markdown(f"{article_index}. **[{article_title}]({article_url})**")
                 st.caption(f"Source: {source} · Published: {published}")
 
+            related_stories = get_related_stories(dataset, story)
+            if related_stories:
+                subtle_hr()
+                st.markdown("**Related stories**")
+                for related_story, related_category, score in related_stories:
+                    related_title = clean_text(related_story.get("representative_title")) or "Untitled"
+                    related_articles = related_story["articles"]
+                    related_url = make_clickable_url(
+                        related_articles[0]["url"] if related_articles else None, related_title
+                    )
+                    st.markdown(f"- [{related_title}]({related_url})")
+                    st.caption(f"{related_category} · {get_story_count(related_story)} sources · {score:.0%} similar")
+
+    record_render_time("detailed_stories", time.perf_counter() - started, limit)
+    if limit < len(stories):
+        st.caption(f"Reduced detail: showing {limit:,} of {len(stories):,} stories to keep this section responsive.")
+        if st.button("Load more stories", key=f"detailed_story_more_{slugify(selected_category)}"):
+            st.session_state[limit_key] = limit + budget_limit
+            st.rerun()
+
+
+def build_story_details_html(story, index: int) -> str:
+    title = html.escape(clean_text(story.get("representative_title")) or "Untitled")
+    sources = get_story_sources(story)
+    article_items = []
+    for article in story["articles"]:
+        article_title = clean_text(article["title"]) or "Untitled"
+        safe_url = html.escape(make_clickable_url(article["url"], article_title), quote=True)
+        published = clean_text(article["published_at"])[:10] or "N/A"
+        article_items.append(
+            f'<li><a href="{safe_url}" target="_blank">{html.escape(article_title)}</a> · '
+            f"{html.escape(article['source'])} · {html.escape(published)}</li>"
+        )
+    return (
+        f'<details class="snapshot-story"><summary>Story #{index}: {title} ({get_story_count(story)} sources)</summary>'
+        f"<p>Summary: {html.escape(get_story_summary(story))}</p>"
+        f"<p>Covered by: {html.escape(', '.join(sources) if sources else 'Unknown')}</p>"
+        f"<ol>{''.join(article_items)}</ol></details>"
+    )
+
+
+def build_static_snapshot(dataset) -> str:
+    data = dataset["data"]
+    metrics = dataset["metrics"]
+    figures = []
+
+    def figure_html(fig):
+        if fig is None:
+            return '<div class="snapshot-caption">No data available.</div>'
+        figures.append(fig)
+        return fig.to_html(
+            full_html=False, include_plotlyjs=len(figures) == 1, config={"displaylogo": False, "responsive": True}
+        )
+
+    def section(title: str, body: str) -> str:
+        return f'<div class="section-title">{html.escape(title)}</div>{body}<hr>'
+
+    feed_rows = build_recent_story_rows(dataset)[:SNAPSHOT_FEED_ROWS]
+    cards = dataset["fragments"]["top_story_cards"]
+    top_sources = get_timeline_top_sources(dataset["cube"])
+    scatter_categories = [name for name in CATEGORY_NAMES if get_story_list(get_categories(data).get(name))]
+    scatter_total = sum(len(get_story_list(get_categories(data).get(name))) for name in scatter_categories)
+
+    story_sections = []
+    for category_name in scatter_categories:
+        stories = get_story_list(get_categories(data)[category_name])
+        details = "".join(
+            build_story_details_html(story, index)
+            for index, story in enumerate(stories[:SNAPSHOT_STORIES_PER_CATEGORY], 1)
+        )
+        if len(stories) > SNAPSHOT_STORIES_PER_CATEGORY:
+            details += f'<div class="snapshot-caption">{len(stories) - SNAPSHOT_STORIES_PER_CATEGORY} more stories in the live dashboard.</div>'
+        total_articles, unique_stories = get_category_totals(get_categories(data)[category_name])
+        story_sections.append(
+            f"<h3>{html.escape(category_name)}</h3>"
+            f'<div class="snapshot-caption">{total_articles} articles · {unique_stories} stories</div>{details}'
+        )
+
+    left = section(
+        "Latest Articles Feed",
+        f'<div class="snapshot-grid-2">{"".join(build_news_card_html(row) for row in feed_rows)}</div>',
+    ) + section("Articles by Source", figure_html(dataset["figures"]["sources"])) + section(
+        "Coverage by Brand", figure_html(dataset["figures"]["brands"])
+    )
+    right = section("Articles by Category", figure_html(dataset["figures"]["category_pie"])) + section(
+        "Category Breakdown", "".join(build_category_breakdown_items(data))
+    ) + section("Trending Topics", "".join(build_trending_items(dataset)) or "No trending stories.")
+
+    body = (
+        '<h1>Auto News Intelligence Dashboard</h1>'
+        f'<div class="snapshot-caption">Last updated: {html.escape(metrics["last_updated"])} · '
+        f'Static snapshot of data version {html.escape(dataset["version"])}, generated '
+        f'{datetime.now().strftime("%d %b %Y, %H:%M")}</div><hr>'
+        + section("Pipeline Flow", build_funnel_html(metrics))
+        + section(
+            "Latest Headlines",
+            build_ticker_html(dataset, '<span class="headline-time">SNAPSHOT</span>')
+            if dataset["fragments"]["headlines"]
+            else "No headlines available.",
+        )
+        + section("Top Stories", f'<div class="snapshot-grid-4">{"".join(cards[name] for name in CATEGORY_NAMES)}</div>')
+        + f'<div class="snapshot-columns"><div>{left}</div><div>{right}</div></div>'
+        + section(
+            "Coverage Timeline",
+            figure_html(build_timeline_figure(dataset, "Category", "Articles", None, None, top_sources))
+            if dataset["date_bounds"][0]
+            else "No dated articles available.",
+        )
+        + section(
+            "Story Scatter Plot Visualization",
+            figure_html(
+                create_scatter_plot(dataset, scatter_categories, get_render_limit("scatter", scatter_total))
+                if scatter_categories
+                else None
+            ),
+        )
+        + section("Detailed Stories by Category", "".join(story_sections) or "No story details available.")
+    )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>Auto News Intelligence Dashboard · {html.escape(metrics['last_updated'])}</title>"
+        f"{get_global_css()}{SNAPSHOT_CSS}</head>"
+        f'<body class="stApp"><div class="block-container">{body}</div></body></html>'
+    )
+
+
+def get_snapshot_dir():
+    snapshot_dir = clean_text(os.getenv("STATIC_SNAPSHOT_DIR", ""))
+    return Path(snapshot_dir).expanduser() if snapshot_dir else None
+
+
+def write_static_snapshot(dataset, directory: Path) -> Path:
+    content = build_static_snapshot(dataset).encode("utf-8")
+    snapshot_path = directory / f"dashboard-{dataset['version']}.html"
+    for path in (snapshot_path, directory / "index.html"):
+        write_atomically(path, [content])
+        path.chmod(0o644)
+    snapshots = sorted(directory.glob("dashboard-*.html"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for stale_path in snapshots[SNAPSHOT_KEEP:]:
+        stale_path.unlink(missing_ok=True)
+    return snapshot_path
+
+
+def render_comparison_view(dataset):
+    st.title("Run Comparison")
+    baselines = get_comparison_baselines(dataset)
+    if not baselines:
+        st.info(
+            "Nothing to compare yet. Turn on re-clustering, wait for a new results version, "
+            "or set RESULTS_COMPARE_PATH to an earlier results file."
+        )
+        return
+
+    label = st.selectbox("Compare current run against", options=list(baselines), key="comparison_baseline")
+    base_table, base_version = baselines[label]
+    if isinstance(base_table, Path):
+        base_table = get_comparison_table(base_version, str(base_table))
+        if base_table is None:
+            st.error("The comparison file could not be read.")
+            return
+    comparison = get_run_comparison(base_table, base_version, dataset["table"], dataset["version"])
+
+    st.caption(
+        f"{comparison['base_articles']:,} articles in the baseline · "
+        f"{comparison['current_articles']:,} articles in the current run"
+    )
+    cols = st.columns(4, gap="small")
+    cols[0].metric("New articles", f"{len(comparison['new']):,}")
+    cols[1].metric("Dropped articles", f"{len(comparison['dropped']):,}")
+    cols[2].metric("Moved articles", f"{len(comparison['moved'][0]):,}")
+    cols[3].metric("Category changes", f"{len(comparison['recategorized'][0]):,}")
+    cols = st.columns(4, gap="small")
+    cols[0].metric("Stories added", f"{comparison['stories_added']:,}")
+    cols[1].metric("Stories removed", f"{comparison['stories_removed']:,}")
+    cols[2].metric("Stories merged", f"{comparison['stories_merged']:,}")
+    cols[3].metric("Stories split", f"{comparison['stories_split']:,}")
+
+    sections = {
+        "New": "new",
+        "Dropped": "dropped",
+        "Moved": "moved",
+        "Category changes": "recategorized",
+        "Score changes": "rescored",
+    }
+    for tab, (label, name) in zip(st.tabs(list(sections)), sections.items()):
+        with tab:
+            total = len(comparison[name]) if name in ("new", "dropped") else len(comparison[name][0])
+            if not total:
+                st.info(f"No {label.lower()} between these runs.")
+                continue
+            if total > COMPARISON_ROW_LIMIT:
+                st.caption(f"Showing the first {COMPARISON_ROW_LIMIT:,} of {total:,} rows.")
+            rows = build_comparison_rows(comparison, base_table, dataset["table"], name, COMPARISON_ROW_LIMIT)
+            st.dataframe(rows, hide_index=True, width="stretch")
+
 
 def render_login() -> bool:
     if "logged_in" not in st.session_state:
@@ -1335,45 +4711,117 @@ def main():
             st.session_state.user = None
             st.rerun()
 
-    data = load_data()
-    if data is None:
+    remote_sync = get_configured_remote_sync()
+    if remote_sync is not None:
+        with st.sidebar:
+            render_remote_status(remote_sync)
+
+    dataset = get_current_dataset()
+    load_error = get_data_store()["error"]
+    if dataset is None:
+        if remote_sync is not None and remote_sync["status"] in ("pending", "failed"):
+            st.info("Waiting for the first results download from RESULTS_JSON_URL.")
+            return
+        if load_error:
+            st.error(f"Could not load results: {load_error[:200]}")
+            return
         st.error("No data found. Ensure results.json is present in streamlit-app/.")
         return
+    if load_error:
+        with st.sidebar:
+            st.caption(f"Last reload failed, serving the previous results: {load_error[:120]}")
+    st.session_state.data_version = dataset["version"]
+
+    with st.sidebar:
+        auto_refresh = render_auto_refresh()
+        upstream_threshold = dataset["metrics"]["similarity_threshold"]
+        if st.checkbox("Re-cluster stories", key="recluster_enabled"):
+            threshold = st.slider(
+                "Merge threshold",
+                min_value=0.3,
+                max_value=0.95,
+                value=min(max(upstream_threshold, 0.3), 0.95),
+                step=0.05,
+                key="recluster_threshold",
+                help="MinHash similarity of title and preview required to merge articles into one story.",
+            )
+            reclustered, recluster_job = get_recluster_job(dataset, threshold)
+            if reclustered is not None:
+                dataset = reclustered
+            else:
+                render_job_progress(recluster_job)
+        ranking_weights = render_ranking_controls()
+
+        view_mode = st.radio("View", options=["Dashboard", "Compare runs"], horizontal=True, key="view_mode")
+
+        if st.checkbox("Show memory report", key="show_memory_report"):
+            render_memory_report(dataset)
+            render_cache_report()
+            render_job_report()
+            render_interaction_log_status()
+
+        if st.checkbox("Show data quality", key="show_data_quality"):
+            render_quality_report(dataset["quality"])
+
+    if view_mode == "Compare runs":
+        render_comparison_view(dataset)
+        track_session_memory()
+        return
 
-    metrics = compute_metrics(data)
+    metrics = dataset["metrics"]
     st.title("Auto News Intelligence Dashboard")
     st.caption(f"Last updated: {metrics['last_updated'] if metrics['last_updated'] != '-' else '—'}")
 
+    dataset = apply_ranking_weights(render_facet_bar(dataset), ranking_weights)
+    data = dataset["data"]
+
+    with st.sidebar:
+        subtle_hr()
+        render_export_controls(dataset)
+
     subtle_hr()
     render_pipeline_funnel(metrics)
     subtle_hr()
-    render_headline_ticker(data)
+    render_headline_ticker(dataset, auto_refresh)
     subtle_hr()
-    render_top_stories_grid(data)
+    render_top_stories_grid(dataset)
     subtle_hr()
     st.markdown("<div style='height:0.3rem;'></div>", unsafe_allow_html=True)
 
     left_col, right_col = st.columns([2, 1], gap="medium")
     with left_col:
-        render_recent_news_grid(data)
+        render_recent_news_grid(dataset)
         subtle_hr()
-        render_source_chart(data)
+        render_source_chart(dataset)
+        subtle_hr()
+        render_brand_chart(dataset)
 
     with right_col:
-        render_category_pie(data)
+        render_category_pie(dataset)
         subtle_hr()
         render_category_breakdown(data)
+        subtle_hr()
+        render_trending_panel(dataset)
+
+    subtle_hr()
+    render_coverage_timeline(dataset)
 
     subtle_hr()
     st.markdown('<div class="widget-shell">', unsafe_allow_html=True)
-    render_scatter_section(data)
+    render_scatter_section(dataset)
     st.markdown("</div>", unsafe_allow_html=True)
 
     subtle_hr()
     st.markdown('<div class="widget-shell">', unsafe_allow_html=True)
-    render_detailed_stories(data)
+    render_detailed_stories(dataset)
     st.markdown("</div>", unsafe_allow_html=True)
 
+    track_session_memory()
+
 
 if __name__ == "__main__":
-    main()
+    run_started = time.perf_counter()
+    try:
+        main()
+    finally:
+        record_interaction(run_started, sys.exc_info()[1])
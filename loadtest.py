@@ -0,0 +1,343 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import streamlit
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+from app import CATEGORY_NAMES, USERS
+
+APP_PATH = Path(__file__).resolve().parent / "app.py"
+
+WORDS = [
+    "Maruti", "Suzuki", "Tata", "Mahindra", "Hyundai", "Kia", "Toyota", "Honda", "Nissan", "MG",
+    "EV", "SUV", "sedan", "launch", "price", "sales", "plant", "battery", "charging", "exports",
+    "dealers", "tariff", "policy", "subsidy", "semiconductor", "supply", "chain", "recall", "facelift",
+    "hybrid", "production", "capacity", "quarter", "profit", "revenue", "market", "share", "demand",
+    "steel", "logistics", "rail", "port", "carbon", "credits", "emission", "norms", "safety", "rating",
+]
+
+SOURCES = [f"Source {index:02d}" for index in range(40)] + ["The Economic Times", "ET Auto", "Unknown"]
+
+
+class SharedRuntimeMeta(type):
+    def __setattr__(cls, name, value):
+        if name != "_instance":
+            super().__setattr__(name, value)
+        elif value is not None and Runtime._instance is None:
+            Runtime._instance = value
+
+
+class SharedRuntime(Runtime, metaclass=SharedRuntimeMeta):
+    pass
+
+
+def check_test_internals() -> None:
+    required = [
+        (app_test, "Runtime"),
+        (app_test, "ScriptCache"),
+        (local_script_runner, "ScriptCache"),
+        (Runtime, "_instance"),
+    ]
+    missing = [f"{module.__name__}.{name}" for module, name in required if not hasattr(module, name)]
+    if missing:
+        raise RuntimeError(
+            f"streamlit {streamlit.__version__} no longer exposes {', '.join(missing)}; "
+            "share_test_runtime() needs updating for this version (see requirements-dev.txt for the tested pin)"
+        )
+
+
+def share_test_runtime() -> None:
+    check_test_internals()
+    # AppTest installs a mock Runtime for the duration of each run and clears
+    # it afterwards, which breaks sessions running concurrently in one process.
+    # Keep the first mock installed for every session instead.
+    app_test.Runtime = SharedRuntime
+    # Each run also compiles the script into a fresh cache, and concurrent
+    # compile() calls can fail on Python 3.11. A real server compiles once.
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+def build_synthetic_results(article_count: int, seed: int = 7):
+    rng = random.Random(seed)
+    end = datetime(2026, 2, 26, 12, 0, 0)
+    categories = {name: {"total_articles": 0, "unique_stories": 0, "stories": []} for name in CATEGORY_NAMES}
+    article_index = 0
+    story_index = 0
+
+    while article_index < article_count:
+        category_name = rng.choice(CATEGORY_NAMES)
+        size = min(rng.choice([1, 1, 1, 2, 2, 3, 4, 6]), article_count - article_index)
+        topic = rng.sample(WORDS, 6)
+        story_start = end - timedelta(days=rng.uniform(0, 14))
+        articles = []
+        for offset in range(size):
+            title_words = topic[:4] + rng.sample(WORDS, 3)
+            rng.shuffle(title_words)
+            preview = " ".join(topic + rng.sample(WORDS, 20))
+            articles.append(
+                {
+                    "id": f"art_{article_index:08x}",
+                    "title": " ".join(title_words).capitalize(),
+                    "source": rng.choice(SOURCES),
+                    "published_at": (story_start + timedelta(hours=rng.uniform(0, 48))).isoformat(timespec="seconds"),
+                    "is_representative": offset == 0,
+                    "content_preview": preview[:200],
+                    "auto_score": round(rng.uniform(0.5, 1.0), 3),
+                    "category_confidence": round(rng.uniform(0.2, 0.6), 3),
+                    "url": f"https://example.com/news/{article_index}",
+                }
+            )
+            article_index += 1
+
+        story_sources = sorted({article["source"] for article in articles})
+        payload = categories[category_name]
+        payload["stories"].append(
+            {
+                "sub_cluster_id": f"sc_{story_index:06d}",
+                "story_count": len(story_sources),
+                "summary": articles[0]["content_preview"],
+                "representative_title": articles[0]["title"],
+                "sources": story_sources,
+                "articles": articles,
+            }
+        )
+        payload["total_articles"] += len(articles)
+        payload["unique_stories"] += 1
+        story_index += 1
+
+    return {
+        "run_at": end.isoformat(),
+        "stats": {
+            "total_input": article_count * 2,
+            "total_automobile": article_count,
+            "unique_sources": len(SOURCES),
+            "similarity_threshold": 0.85,
+        },
+        "categories": {name: payload for name, payload in categories.items() if payload["stories"]},
+    }
+
+
+def login(at):
+    username, password = next(iter(USERS.items()))
+    at.run()
+    at.text_input[0].input(username)
+    at.text_input[1].input(password)
+    at.button[0].click()
+    at.run()
+
+
+def page_feed(at, rng):
+    next_button = at.button(key="grid_next")
+    prev_button = at.button(key="grid_prev")
+    if not next_button.disabled and (prev_button.disabled or rng.random() < 0.7):
+        next_button.click()
+    elif not prev_button.disabled:
+        prev_button.click()
+    at.run()
+
+
+def change_date_range(at, rng):
+    date_filter = at.date_input(key="facet_dates")
+    min_date, max_date = date_filter.min, date_filter.max
+    span = max((max_date - min_date).days, 0)
+    start = min_date + timedelta(days=rng.randint(0, span))
+    end = start + timedelta(days=rng.randint(0, max((max_date - start).days, 0)))
+    date_filter.set_value((start, end))
+    at.run()
+
+
+def change_category_filter(at, rng):
+    category_filter = at.multiselect(key="facet_categories")
+    options = list(category_filter.options)
+    category_filter.set_value(rng.sample(options, rng.randint(0, min(3, len(options)))))
+    at.run()
+
+
+def change_source_filter(at, rng):
+    source_filter = at.multiselect(key="facet_sources")
+    options = list(source_filter.options)
+    source_filter.set_value(rng.sample(options[:15], rng.randint(0, min(2, len(options)))))
+    at.run()
+
+
+def change_brand_filter(at, rng):
+    brand_filter = at.multiselect(key="facet_brands")
+    options = list(brand_filter.options)
+    brand_filter.set_value(rng.sample(options[:12], rng.randint(0, min(2, len(options)))))
+    at.run()
+
+
+def toggle_scatter_categories(at, rng):
+    scatter_filter = at.multiselect(key="scatter_filter")
+    options = list(scatter_filter.options)
+    scatter_filter.set_value(rng.sample(options, rng.randint(1, len(options))))
+    at.run()
+
+
+def open_detailed_category(at, rng):
+    detail_filter = at.selectbox(key="detailed_story_category")
+    detail_filter.set_value(rng.choice(detail_filter.options))
+    at.run()
+
+
+INTERACTIONS = {
+    "page_feed": (page_feed, 4),
+    "date_range": (change_date_range, 2),
+    "category_filter": (change_category_filter, 2),
+    "source_filter": (change_source_filter, 1),
+    "brand_filter": (change_brand_filter, 1),
+    "scatter_toggle": (toggle_scatter_categories, 1),
+    "detailed_category": (open_detailed_category, 1),
+}
+
+
+def run_session(session_index: int, args, timings, errors, lock):
+    rng = random.Random(args.seed + session_index)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=args.timeout)
+    names = list(INTERACTIONS)
+    weights = [INTERACTIONS[name][1] for name in names]
+
+    def measure(name, action):
+        started = time.perf_counter()
+        try:
+            action()
+        except Exception as exc:
+            with lock:
+                errors.append(f"session {session_index} {name}: {exc}")
+            return False
+        elapsed = time.perf_counter() - started
+        with lock:
+            timings.setdefault(name, []).append(elapsed)
+        if at.exception:
+            with lock:
+                errors.append(f"session {session_index} {name}: {at.exception[0].value}")
+            return False
+        return True
+
+    if not measure("login", lambda: login(at)):
+        return
+    for _ in range(args.interactions):
+        name = rng.choices(names, weights=weights)[0]
+        action = INTERACTIONS[name][0]
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time))
+        if not measure(name, lambda: action(at, rng)):
+            return
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(timings, wall_seconds: float):
+    rows = []
+    for name, values in sorted(timings.items()):
+        rows.append(
+            {
+                "interaction": name,
+                "count": len(values),
+                "mean_ms": statistics.fmean(values) * 1000,
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p90_ms": percentile(values, 0.90) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "max_ms": max(values) * 1000,
+            }
+        )
+    total = sum(len(values) for values in timings.values())
+    return {
+        "interactions": rows,
+        "total_interactions": total,
+        "wall_seconds": wall_seconds,
+        "throughput_per_second": total / wall_seconds if wall_seconds > 0 else 0.0,
+    }
+
+
+def print_report(report, title: str) -> None:
+    print(title)
+    header = f"{'interaction':<24}{'count':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in report["interactions"]:
+        print(
+            f"{row['interaction']:<24}{row['count']:>7}{row['mean_ms']:>8.0f}ms{row['p50_ms']:>8.0f}ms"
+            f"{row['p90_ms']:>8.0f}ms{row['p99_ms']:>8.0f}ms{row['max_ms']:>8.0f}ms"
+        )
+    print("-" * len(header))
+    print(
+        f"{report['total_interactions']} reruns in {report['wall_seconds']:.1f}s · "
+        f"{report['throughput_per_second']:.2f} reruns/s"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Drive app.py headlessly with concurrent analyst sessions.")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--interactions", type=int, default=20, help="interactions per session after login")
+    parser.add_argument("--articles", type=int, default=5000, help="synthetic dataset size")
+    parser.add_argument("--results", help="use an existing results file or shard directory instead")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between interactions (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", help="also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    share_test_runtime()
+    # Synthetic sessions stay out of the production interaction log unless
+    # a path is set explicitly.
+    os.environ.setdefault("INTERACTION_LOG_PATH", "")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.results:
+            os.environ["RESULTS_JSON_PATH"] = str(Path(args.results).resolve())
+        else:
+            results_path = Path(tmp_dir) / "results.json"
+            results_path.write_text(json.dumps(build_synthetic_results(args.articles, args.seed)), encoding="utf-8")
+            os.environ["RESULTS_JSON_PATH"] = str(results_path)
+
+        timings = {}
+        errors = []
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(target=run_session, args=(index, args, timings, errors, lock), daemon=True)
+            for index in range(args.sessions)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - started
+
+    report = summarize(timings, wall_seconds)
+    report["errors"] = errors
+    print_report(
+        report,
+        f"{args.sessions} sessions · {args.interactions} interactions each · {args.articles} synthetic articles",
+    )
+    for error in errors[:10]:
+        print(f"error: {error}", file=sys.stderr)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from loadtest import APP_PATH, build_synthetic_results, login, print_report, share_test_runtime, summarize
+
+WIDGET_TYPES = (
+    "button",
+    "checkbox",
+    "toggle",
+    "radio",
+    "selectbox",
+    "multiselect",
+    "slider",
+    "select_slider",
+    "date_input",
+    "number_input",
+)
+
+
+def read_interaction_log(path: Path):
+    sessions = {}
+    skipped = 0
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+                sessions.setdefault(record["session"], []).append(record)
+            except (ValueError, KeyError, TypeError):
+                skipped += 1
+    for records in sessions.values():
+        records.sort(key=lambda record: record.get("ts") or 0.0)
+    return sessions, skipped
+
+
+def find_widget(at, key: str):
+    for widget_type in WIDGET_TYPES:
+        try:
+            return getattr(at, widget_type)(key=key)
+        except KeyError:
+            continue
+    return None
+
+
+def decode_value(widget, value):
+    if widget.type == "date_input":
+        if isinstance(value, list):
+            return tuple(date.fromisoformat(item) for item in value)
+        return date.fromisoformat(value)
+    if widget.type == "multiselect":
+        options = set(widget.options)
+        return [item for item in value if item in options]
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def apply_interaction(at, record) -> bool:
+    applied = False
+    for key in record["changed"]:
+        value = record["state"].get(key)
+        widget = find_widget(at, key)
+        if widget is None:
+            # Paging buttons rerun straight away, so the log only sees the
+            # page they moved to.
+            if key == "grid_page":
+                at.session_state[key] = value
+                applied = True
+            continue
+        if widget.disabled:
+            continue
+        if widget.type == "button":
+            if value is True:
+                widget.click()
+                applied = True
+            continue
+        try:
+            widget.set_value(decode_value(widget, value))
+        except (ValueError, TypeError):
+            continue
+        applied = True
+    return applied
+
+
+def get_interaction_name(record) -> str:
+    if not record["changed"]:
+        return "rerun"
+    key = record["changed"][0]
+    return "rank_weight" if key.startswith("rank_weight_") else key
+
+
+def replay_session(session_index: int, records, args, origin: float, timings, errors, counts, lock):
+    at = AppTest.from_file(str(APP_PATH), default_timeout=args.timeout)
+    first_ts = records[0].get("ts") or 0.0
+    if args.speed > 0:
+        time.sleep(min(max(first_ts - origin, 0.0) / args.speed, args.max_gap))
+
+    def measure(name, action):
+        started = time.perf_counter()
+        try:
+            action()
+        except Exception as exc:
+            with lock:
+                errors.append(f"session {session_index} {name}: {exc}")
+            return False
+        elapsed = time.perf_counter() - started
+        with lock:
+            timings.setdefault(name, []).append(elapsed)
+        if at.exception:
+            with lock:
+                errors.append(f"session {session_index} {name}: {at.exception[0].value}")
+            return False
+        return True
+
+    if not measure("login", lambda: login(at)):
+        return
+    previous_ts = first_ts
+    for record in records:
+        if record["changed"] == ["login"]:
+            continue
+        ts = record.get("ts") or previous_ts
+        if args.speed > 0:
+            time.sleep(min(max(ts - previous_ts, 0.0) / args.speed, args.max_gap))
+        previous_ts = ts
+        if not apply_interaction(at, record) and record["changed"]:
+            with lock:
+                counts["skipped"] += 1
+            continue
+        with lock:
+            counts["recorded_ms"].append(record.get("duration_ms") or 0.0)
+        if not measure(get_interaction_name(record), at.run):
+            return
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded interaction log against app.py and report latency.")
+    parser.add_argument("log", help="interaction log written by the dashboard (JSON lines)")
+    parser.add_argument("--results", help="results file or shard directory to replay against")
+    parser.add_argument("--articles", type=int, default=5000, help="synthetic dataset size when --results is not set")
+    parser.add_argument("--sessions", type=int, default=0, help="replay only the first N sessions (0 = all)")
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale for recorded gaps (0 = back to back)")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="cap on any single replayed pause (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", help="also write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    sessions, malformed = read_interaction_log(Path(args.log))
+    session_records = [records for _, records in sorted(sessions.items(), key=lambda item: item[1][0].get("ts") or 0.0)]
+    if args.sessions > 0:
+        session_records = session_records[: args.sessions]
+    if not session_records:
+        print(f"no interactions in {args.log}", file=sys.stderr)
+        return 1
+    origin = min(records[0].get("ts") or 0.0 for records in session_records)
+
+    share_test_runtime()
+    os.environ["INTERACTION_LOG_PATH"] = ""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.results:
+            os.environ["RESULTS_JSON_PATH"] = str(Path(args.results).resolve())
+        else:
+            results_path = Path(tmp_dir) / "results.json"
+            results_path.write_text(json.dumps(build_synthetic_results(args.articles, args.seed)), encoding="utf-8")
+            os.environ["RESULTS_JSON_PATH"] = str(results_path)
+
+        timings = {}
+        errors = []
+        counts = {"skipped": 0, "recorded_ms": []}
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=replay_session,
+                args=(index, records, args, origin, timings, errors, counts, lock),
+                daemon=True,
+            )
+            for index, records in enumerate(session_records)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - started
+
+    report = summarize(timings, wall_seconds)
+    report["errors"] = errors
+    report["skipped"] = counts["skipped"]
+    report["malformed"] = malformed
+    recorded = counts["recorded_ms"]
+    report["recorded_mean_ms"] = sum(recorded) / len(recorded) if recorded else 0.0
+    source = args.results or f"{args.articles} synthetic articles"
+    print_report(
+        report, f"replaying {len(session_records)} sessions from {args.log} · {source} · speed {args.speed:g}x"
+    )
+    print(
+        f"recorded mean {report['recorded_mean_ms']:.0f}ms · {counts['skipped']} interactions skipped · "
+        f"{malformed} malformed lines"
+    )
+    for error in errors[:10]:
+        print(f"error: {error}", file=sys.stderr)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
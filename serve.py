@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import itertools
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookies import CookieError, SimpleCookie
+from pathlib import Path
+
+from app import (
+    DATA_FIRST_LOAD_TIMEOUT_SECONDS,
+    DATA_WATCH_SECONDS,
+    get_configured_remote_sync,
+    get_data_version,
+    get_shared_snapshot_version,
+    resolve_results_path,
+    safe_float,
+    write_shared_snapshot,
+)
+
+APP_PATH = Path(__file__).resolve().parent / "app.py"
+STICKY_COOKIE = "dashboard_worker"
+HEAD_LIMIT = 64 * 1024
+PIPE_CHUNK_BYTES = 64 * 1024
+WORKER_RESTART_SECONDS = 2.0
+
+BAD_GATEWAY = b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+
+def run_snapshot_publisher(directory: Path, ready: threading.Event, wake: threading.Event) -> None:
+    interval = max(safe_float(os.getenv("DATA_WATCH_SECONDS"), default=DATA_WATCH_SECONDS), 0.5)
+    published = get_shared_snapshot_version(directory)
+    while True:
+        try:
+            results_path = resolve_results_path()
+            version = get_data_version(results_path)
+            if version and version != published:
+                started = time.perf_counter()
+                if write_shared_snapshot(results_path, version, directory) is not None:
+                    published = version
+                    print(f"published {version} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        except Exception as exc:
+            print(f"snapshot publish failed: {exc!r}", file=sys.stderr)
+        ready.set()
+        wake.wait(interval)
+        wake.clear()
+
+
+def get_worker_env(directory: Path, index: int, worker_count: int, cookie_secret: str):
+    env = dict(os.environ, SHARED_SNAPSHOT_DIR=str(directory))
+    # Each worker would otherwise size its process pool to every core.
+    if not env.get("WORKER_PROCESSES"):
+        env["WORKER_PROCESSES"] = str(max((os.cpu_count() or 1) // worker_count, 1))
+    # The supervisor owns downloads and publishing; one worker writes the
+    # static HTML export so the others do not race on the same files.
+    env.pop("RESULTS_JSON_URL", None)
+    if index:
+        env.pop("STATIC_SNAPSHOT_DIR", None)
+    env["STREAMLIT_SERVER_COOKIE_SECRET"] = cookie_secret
+    return env
+
+
+def start_worker(port: int, env):
+    command = [
+        sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+        "--server.port", str(port),
+        "--server.address", "127.0.0.1",
+        "--server.headless", "true",
+    ]
+    return subprocess.Popen(command, env=env)
+
+
+def supervise_workers(workers, ports, envs, stopping: threading.Event) -> None:
+    while not stopping.wait(WORKER_RESTART_SECONDS):
+        for index, process in enumerate(workers):
+            if process.poll() is not None:
+                print(f"worker {index} exited with {process.returncode}, restarting", file=sys.stderr)
+                workers[index] = start_worker(ports[index], envs[index])
+
+
+def get_sticky_worker(head: bytes, worker_count: int):
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() != b"cookie":
+            continue
+        cookie = SimpleCookie()
+        try:
+            cookie.load(value.decode("latin-1"))
+        except CookieError:
+            continue
+        morsel = cookie.get(STICKY_COOKIE)
+        if morsel is not None and morsel.value.isdigit() and int(morsel.value) < worker_count:
+            return int(morsel.value)
+    return None
+
+
+async def pipe(reader, writer, half_close: bool = False) -> None:
+    try:
+        while True:
+            chunk = await reader.read(PIPE_CHUNK_BYTES)
+            if not chunk:
+                break
+            writer.write(chunk)
+            await writer.drain()
+        if half_close and writer.can_write_eof():
+            writer.write_eof()
+            return
+    except ConnectionError:
+        pass
+    if not writer.is_closing():
+        writer.close()
+
+
+async def open_backend(ports, first: int):
+    for offset in range(len(ports)):
+        index = (first + offset) % len(ports)
+        try:
+            return index, await asyncio.open_connection("127.0.0.1", ports[index])
+        except OSError:
+            continue
+    return None, (None, None)
+
+
+async def forward_with_cookie(backend_reader, client_writer, index: int) -> None:
+    try:
+        head = await backend_reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        client_writer.close()
+        return
+    cookie = f"Set-Cookie: {STICKY_COOKIE}={index}; Path=/; HttpOnly; SameSite=Lax\r\n".encode("latin-1")
+    client_writer.write(head[:-2] + cookie + b"\r\n")
+    await pipe(backend_reader, client_writer)
+
+
+async def handle_client(client_reader, client_writer, ports, rotation) -> None:
+    try:
+        head = await client_reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        client_writer.close()
+        return
+
+    sticky = get_sticky_worker(head, len(ports))
+    index, (backend_reader, backend_writer) = await open_backend(
+        ports, sticky if sticky is not None else next(rotation) % len(ports)
+    )
+    if backend_reader is None:
+        client_writer.write(BAD_GATEWAY)
+        client_writer.close()
+        return
+
+    # The client finishing its request only half-closes the backend; the
+    # connection ends when the backend's response stream does.
+    backend_writer.write(head)
+    upstream = pipe(client_reader, backend_writer, half_close=True)
+    if index == sticky:
+        downstream = pipe(backend_reader, client_writer)
+    else:
+        downstream = forward_with_cookie(backend_reader, client_writer, index)
+    await asyncio.gather(upstream, downstream)
+    if not backend_writer.is_closing():
+        backend_writer.close()
+
+
+async def run_balancer(host: str, port: int, ports) -> None:
+    rotation = itertools.count()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_client(reader, writer, ports, rotation), host, port, limit=HEAD_LIMIT
+    )
+    print(f"balancing {host}:{port} across {len(ports)} workers on ports {ports[0]}-{ports[-1]}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve app.py from several worker processes behind one port.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 0)) or os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8501)))
+    parser.add_argument("--worker-port", type=int, help="first worker port (defaults to --port + 1)")
+    parser.add_argument("--snapshot-dir", help="shared data snapshot directory (defaults to SHARED_SNAPSHOT_DIR)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    snapshot_dir = args.snapshot_dir or os.getenv("SHARED_SNAPSHOT_DIR") or tempfile.mkdtemp(prefix="dashboard-")
+    snapshot_dir = Path(snapshot_dir).expanduser()
+
+    ready = threading.Event()
+    wake = threading.Event()
+    remote_sync = get_configured_remote_sync()
+    if remote_sync is not None:
+        remote_sync["listeners"].append(wake)
+    threading.Thread(
+        target=run_snapshot_publisher, args=(snapshot_dir, ready, wake), name="snapshot-publisher", daemon=True
+    ).start()
+    ready.wait(DATA_FIRST_LOAD_TIMEOUT_SECONDS)
+
+    first_port = args.worker_port or args.port + 1
+    ports = [first_port + index for index in range(max(args.workers, 1))]
+    cookie_secret = secrets.token_hex(32)
+    envs = [get_worker_env(snapshot_dir, index, len(ports), cookie_secret) for index in range(len(ports))]
+    workers = [start_worker(port, env) for port, env in zip(ports, envs)]
+    stopping = threading.Event()
+    threading.Thread(
+        target=supervise_workers, args=(workers, ports, envs, stopping), name="worker-supervisor", daemon=True
+    ).start()
+
+    def stop(signum, frame):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        asyncio.run(run_balancer(args.host, args.port, ports))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopping.set()
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import argparse
+import sys
+from pathlib import Path
+
+from app import (
+    build_dataset,
+    get_data_version,
+    get_snapshot_dir,
+    load_results,
+    resolve_results_path,
+    validate_payload,
+    write_static_snapshot,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render the default dashboard view to a static HTML file.")
+    parser.add_argument("--results", help="results file or shard directory (defaults to the app's own lookup)")
+    parser.add_argument("--output", help="snapshot directory (defaults to STATIC_SNAPSHOT_DIR)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results_path = Path(args.results).expanduser() if args.results else resolve_results_path()
+    output_dir = Path(args.output).expanduser() if args.output else get_snapshot_dir()
+    if output_dir is None:
+        print("error: pass --output or set STATIC_SNAPSHOT_DIR", file=sys.stderr)
+        return 2
+
+    version = get_data_version(results_path)
+    data, quality = validate_payload(load_results(results_path)) if version else (None, None)
+    if data is None:
+        print(f"error: no readable results at {results_path}", file=sys.stderr)
+        return 1
+
+    snapshot_path = write_static_snapshot(build_dataset(data, version, quality), output_dir)
+    print(f"wrote {snapshot_path} and {output_dir / 'index.html'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from app import BRAND_DICTIONARY, build_article_table, build_entity_automaton, build_entity_index, validate_payload
+from workers import WORD_PATTERN, match_entities
+
+
+def naive_matches(dictionary, text):
+    tokens = WORD_PATTERN.findall(text.lower())
+    found = set()
+    for code, brand_name in enumerate(dictionary):
+        for alias in [brand_name, *dictionary[brand_name]]:
+            alias_tokens = WORD_PATTERN.findall(alias.lower())
+            if any(tokens[start : start + len(alias_tokens)] == alias_tokens for start in range(len(tokens))):
+                found.add(code)
+    return found
+
+
+@pytest.fixture(scope="module")
+def automaton():
+    return build_entity_automaton(BRAND_DICTIONARY)
+
+
+def brands(automaton, text):
+    return {automaton["brand_names"][code] for code in match_entities(automaton, text)}
+
+
+def test_matches_multi_word_and_overlapping_aliases(automaton):
+    assert brands(automaton, "Maruti Suzuki Swift bookings open") == {"Maruti Suzuki"}
+    assert brands(automaton, "Tata Punch EV and the Hyundai Creta lead June sales") == {"Tata Motors", "Hyundai"}
+    # "eicher motors" starts inside "volvo eicher"; only the failure links find it.
+    assert brands(automaton, "Volvo Eicher Motors JV") == {"Eicher VECV", "Royal Enfield"}
+
+
+def test_matches_whole_words_only(automaton):
+    assert brands(automaton, "Kiara Advani at the launch") == set()
+    assert brands(automaton, "Kia's Syros") == {"Kia"}
+    assert brands(automaton, "TATA MOTORS results") == {"Tata Motors"}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Monsoon expected to be 6 days late in the city",
+        "Trekkers stranded on a Himalayan pass",
+        "Heatwave grips the Thar desert",
+    ],
+)
+def test_ambiguous_words_need_the_maker(automaton, text):
+    assert brands(automaton, text) == set()
+
+
+def test_agrees_with_naive_search(automaton):
+    rng = random.Random(5)
+    vocabulary = sorted(
+        {token for aliases in BRAND_DICTIONARY.values() for alias in aliases for token in alias.split()}
+    )
+    vocabulary += ["the", "new", "launch", "price", "city", "be", "6"]
+    for _ in range(500):
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 12)))
+        assert match_entities(automaton, text) == naive_matches(BRAND_DICTIONARY, text), text
+
+
+def test_entity_index_rows_follow_the_article_table():
+    dictionary = {"Tata Motors": ["nexon"], "Hyundai": ["creta"]}
+    payload = {
+        "stats": {},
+        "categories": {
+            "EV": {
+                "stories": [
+                    {
+                        "articles": [
+                            {"id": "a1", "title": "Nexon EV", "content_preview": "beats the Creta", "source": "x"}
+                        ]
+                    },
+                    {"articles": [{"id": "a2", "title": "Scooter sales", "source": "y"}]},
+                    {"articles": [{"id": "a3", "title": "Creta recall", "source": "y"}]},
+                ]
+            }
+        },
+    }
+    data, _ = validate_payload(payload)
+    entities = build_entity_index(build_article_table(data), dictionary)
+    assert entities["brand_names"] == ("Tata Motors", "Hyundai")
+    assert entities["article_offsets"].tolist() == [0, 2, 2, 3]
+    assert entities["article_brands"].tolist() == [0, 1, 1]
+    assert np.array_equal(entities["brand_articles"], [1, 2])
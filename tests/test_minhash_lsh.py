@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from app import (
+    MINHASH_PERMUTATIONS,
+    build_dataset,
+    build_reclustered_dataset,
+    cluster_signatures,
+    get_lsh_shape,
+    get_minhash_params,
+    validate_payload,
+)
+from loadtest import build_synthetic_results
+from workers import compute_minhash_chunk
+
+WORDS = "tata motors nexon ev price cut dealers report strong bookings across metro cities this festive season".split()
+
+
+def signatures(texts):
+    a, b = get_minhash_params()
+    texts = [(title, preview, str(index)) for index, (title, preview) in enumerate(texts)]
+    return compute_minhash_chunk(texts, a, b, 64)
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.7, 0.85])
+def test_lsh_shape_splits_all_permutations(threshold):
+    bands, rows = get_lsh_shape(threshold)
+    assert bands * rows == MINHASH_PERMUTATIONS
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.15
+
+
+def test_signature_agreement_tracks_overlap():
+    base = " ".join(WORDS)
+    near = " ".join(WORDS[:-1] + ["today"])
+    other = "bajaj chetak scooter recall over brake issue affects early batches in pune"
+    rows = signatures([(base, base), (base, base), (near, near), (other, other)])
+    assert rows.shape == (4, MINHASH_PERMUTATIONS)
+    assert np.array_equal(rows[0], rows[1])
+    assert (rows[0] == rows[2]).mean() > 0.6
+    assert (rows[0] == rows[3]).mean() < 0.1
+
+
+def test_cluster_signatures_groups_near_duplicates_only():
+    base = " ".join(WORDS)
+    near = " ".join(WORDS[:-1] + ["today"])
+    other = "bajaj chetak scooter recall over brake issue affects early batches in pune"
+    roots = cluster_signatures(signatures([(base, base), (other, other), (near, near), (base, base)]), 0.5)
+    assert roots[0] == roots[2] == roots[3]
+    assert roots[1] != roots[0]
+    assert cluster_signatures(signatures([(base, base)]), 0.5) == [0]
+
+
+def test_higher_threshold_never_merges_more():
+    rows = signatures(
+        [(" ".join(WORDS[offset:] + WORDS[:offset]), " ".join(WORDS[: 8 + offset])) for offset in range(8)]
+    )
+    loose = len(set(cluster_signatures(rows, 0.3)))
+    strict = len(set(cluster_signatures(rows, 0.9)))
+    assert loose <= strict
+
+
+@pytest.fixture(scope="module")
+def base():
+    data, quality = validate_payload(build_synthetic_results(800, seed=11))
+    return build_dataset(data, "test-minhash-base", quality)
+
+
+@pytest.mark.parametrize("threshold", [0.2, 0.5, 0.9])
+def test_reclustered_dataset_partitions_the_articles(base, threshold):
+    dataset = build_reclustered_dataset(base, threshold)
+    table = dataset["table"]
+    assert table["articles"] is base["table"]["articles"]
+    assert dataset["version"] == f"test-minhash-base@{threshold:.2f}"
+
+    story_of = {}
+    for index, story in enumerate(table["stories"]):
+        assert story["articles"]
+        for article in story["articles"]:
+            assert id(article) not in story_of
+            story_of[id(article)] = index
+    assert len(story_of) == len(table["articles"])
+    assert [story_of[id(article)] for article in table["articles"]] == table["article_story"].tolist()
+
+    for index, story in enumerate(table["stories"]):
+        days = table["article_day"][table["article_story"] == index]
+        assert table["story_latest_day"][index] == days.max()
+        assert table["article_story"][table["story_latest_article"][index]] == index
+    categories = dataset["data"]["categories"]
+    assert sum(payload["total_articles"] for payload in categories.values()) == len(table["articles"])
+    assert sum(payload["unique_stories"] for payload in categories.values()) == len(table["stories"])
+    assert sorted(row["story_index"] for row in dataset["ranked_stories"]) == list(range(len(table["stories"])))
+
+    neighbors = dataset["related"]["neighbors"]
+    assert not (neighbors == np.arange(len(neighbors))[:, None]).any()
+
+
+def test_unchanged_stories_are_reused(base):
+    base_stories = {id(story) for story in base["table"]["stories"]}
+    dataset = build_reclustered_dataset(base, 0.99)
+    reused = [story for story in dataset["table"]["stories"] if id(story) in base_stories]
+    assert reused
+    for story in dataset["table"]["stories"]:
+        if id(story) in base_stories:
+            continue
+        assert story["sub_cluster_id"].startswith("mh_")
+        assert story["cluster_reason"] == "Regrouped at MinHash similarity >= 0.99"
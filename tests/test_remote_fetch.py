@@ -0,0 +1,126 @@
+import gzip
+import json
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import fetch_remote_results
+
+BODY = json.dumps({"run_at": "2026-02-26T13:29:37", "stats": {}, "categories": {}}).encode("utf-8")
+ETAG = '"results-v1"'
+LAST_MODIFIED = "Thu, 26 Feb 2026 13:30:00 GMT"
+
+
+class ResultsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        mode = server.mode
+        if mode == "error":
+            self.send_error(500)
+            return
+        if self.headers.get("If-None-Match") == ETAG or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = gzip.compress(BODY) if mode in ("gzip", "truncated_gzip") else BODY
+        if mode == "invalid":
+            body = b"<html>maintenance</html>"
+        sent = body[: len(body) // 2] if mode.startswith("truncated") else body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        # The truncated plain body announces its full length and stops short;
+        # the truncated gzip body is complete on the wire but cut mid-stream.
+        self.send_header("Content-Length", str(len(body) if mode == "truncated" else len(sent)))
+        if mode in ("gzip", "truncated_gzip"):
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(sent)
+        self.close_connection = True
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ResultsHandler)
+    httpd.mode = "plain"
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/results.json"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read_cache(cache_path):
+    return cache_path.read_bytes(), cache_path.with_suffix(".meta.json").read_bytes()
+
+
+def test_fetch_stores_body_and_validators(server, tmp_path):
+    cache_path = tmp_path / "results.json"
+    assert fetch_remote_results(server.url, cache_path, timeout=5) == "updated"
+    assert cache_path.read_bytes() == BODY
+    meta = json.loads(cache_path.with_suffix(".meta.json").read_text())
+    assert meta["etag"] == ETAG
+    assert meta["last_modified"] == LAST_MODIFIED
+    assert "If-None-Match" not in server.requests[0]
+
+
+def test_unchanged_results_answer_not_modified(server, tmp_path):
+    cache_path = tmp_path / "results.json"
+    fetch_remote_results(server.url, cache_path, timeout=5)
+    before = read_cache(cache_path)
+
+    assert fetch_remote_results(server.url, cache_path, timeout=5) == "not_modified"
+    assert server.requests[1]["If-None-Match"] == ETAG
+    assert server.requests[1]["If-Modified-Since"] == LAST_MODIFIED
+    assert read_cache(cache_path) == before
+
+
+def test_stale_meta_fetches_unconditionally(server, tmp_path):
+    cache_path = tmp_path / "results.json"
+    fetch_remote_results(server.url, cache_path, timeout=5)
+    cache_path.write_bytes(BODY + b" ")
+
+    assert fetch_remote_results(server.url, cache_path, timeout=5) == "updated"
+    assert "If-None-Match" not in server.requests[1]
+    assert cache_path.read_bytes() == BODY
+
+
+def test_gzip_body_is_decompressed(server, tmp_path):
+    server.mode = "gzip"
+    cache_path = tmp_path / "results.json"
+    assert fetch_remote_results(server.url, cache_path, timeout=5) == "updated"
+    assert server.requests[0]["Accept-Encoding"] == "gzip"
+    assert cache_path.read_bytes() == BODY
+
+
+@pytest.mark.parametrize(
+    "mode, error",
+    [
+        ("truncated", ValueError),
+        ("truncated_gzip", ValueError),
+        ("invalid", ValueError),
+        ("error", urllib.error.HTTPError),
+    ],
+)
+def test_failed_fetch_keeps_cached_results(server, tmp_path, mode, error):
+    cache_path = tmp_path / "results.json"
+    fetch_remote_results(server.url, cache_path, timeout=5)
+    # Drop the validators so the server sends a body instead of a 304.
+    cache_path.with_suffix(".meta.json").unlink()
+    before = cache_path.read_bytes()
+
+    server.mode = mode
+    with pytest.raises(error):
+        fetch_remote_results(server.url, cache_path, timeout=5)
+    assert cache_path.read_bytes() == before
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["results.json"]
@@ -0,0 +1,81 @@
+import json
+import os
+
+from app import RESULTS_MANIFEST_NAME, get_data_version, load_results
+
+
+def write_json(path, payload):
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def make_shard(category, titles):
+    stories = [{"title": title, "articles": [{"title": title, "source": "Autocar"}]} for title in titles]
+    payload = {"total_articles": len(stories), "unique_stories": len(stories), "stories": stories}
+    return {"categories": {category: payload}}
+
+
+def test_directory_merges_shards_in_manifest_order(tmp_path):
+    write_json(tmp_path / "b.json", make_shard("Cars", ["Second"]))
+    write_json(tmp_path / "a.json", make_shard("Cars", ["First"]))
+    write_json(tmp_path / "unlisted.json", make_shard("Cars", ["Ignored"]))
+    write_json(tmp_path / RESULTS_MANIFEST_NAME, {
+        "run_at": "2026-02-26T13:29:37",
+        "stats": {"total_articles": 2},
+        "shards": ["b.json", "a.json"],
+    })
+
+    results = load_results(tmp_path)
+
+    assert results["run_at"] == "2026-02-26T13:29:37"
+    assert results["stats"] == {"total_articles": 2}
+    cars = results["categories"]["Cars"]
+    assert [story["title"] for story in cars["stories"]] == ["Second", "First"]
+    assert cars["total_articles"] == 2
+    assert cars["unique_stories"] == 2
+
+
+def test_directory_without_manifest_globs_sorted_shards(tmp_path):
+    write_json(tmp_path / "2.json", make_shard("Bikes", ["Later"]))
+    write_json(tmp_path / "1.json", make_shard("Bikes", ["Earlier"]))
+
+    results = load_results(tmp_path)
+
+    assert [story["title"] for story in results["categories"]["Bikes"]["stories"]] == ["Earlier", "Later"]
+
+
+def test_bad_shards_are_skipped(tmp_path):
+    write_json(tmp_path / "good.json", make_shard("Cars", ["Kept"]))
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    (tmp_path / "latin1.json").write_bytes('{"title": "caf\xe9"}'.encode("latin-1"))
+    write_json(tmp_path / "list.json", [1, 2, 3])
+
+    results = load_results(tmp_path)
+
+    assert [story["title"] for story in results["categories"]["Cars"]["stories"]] == ["Kept"]
+
+
+def test_directory_with_only_bad_shards_returns_none(tmp_path):
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+
+    assert load_results(tmp_path) is None
+
+
+def test_missing_manifest_shard_returns_none(tmp_path):
+    write_json(tmp_path / RESULTS_MANIFEST_NAME, {"shards": ["missing.json"]})
+
+    assert load_results(tmp_path) is None
+
+
+def test_data_version_changes_when_a_shard_changes(tmp_path):
+    shard = tmp_path / "a.json"
+    write_json(shard, make_shard("Cars", ["First"]))
+    write_json(tmp_path / RESULTS_MANIFEST_NAME, {"shards": ["a.json"]})
+
+    before = get_data_version(tmp_path)
+    assert before == get_data_version(tmp_path)
+
+    write_json(shard, make_shard("Cars", ["First", "Second"]))
+    stat = shard.stat()
+    os.utime(shard, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert get_data_version(tmp_path) != before
@@ -0,0 +1,86 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app import build_article_table, build_rollup_cube, query_cube, validate_payload
+from loadtest import build_synthetic_results
+
+
+@pytest.fixture(scope="module")
+def table():
+    data, _ = validate_payload(build_synthetic_results(600, seed=3))
+    # A few undated articles and one far-off date exercise the spare day slot
+    # and the sparse day axis.
+    articles = [
+        article
+        for payload in data["categories"].values()
+        for story in payload["stories"]
+        for article in story["articles"]
+    ]
+    for article in articles[:5]:
+        article["published_at"] = ""
+    articles[5]["published_at"] = "2019-01-01T00:00:00"
+    return build_article_table(data)
+
+
+def dense_counts(table, mask):
+    counts = np.zeros((len(table["category_names"]), len(table["source_names"])), dtype=np.int64)
+    np.add.at(counts, (table["article_category"][mask], table["article_source"][mask]), 1)
+    return counts
+
+
+def test_full_rollup_matches_article_counts(table):
+    cube = build_rollup_cube(table)
+    counts = query_cube(cube, keep=("category", "source"))
+    assert np.array_equal(counts, dense_counts(table, np.ones(len(table["articles"]), dtype=bool)))
+    assert query_cube(cube) == len(table["articles"])
+
+
+def test_cells_are_sparse(table):
+    cube = build_rollup_cube(table)
+    assert cube["day_count"] > 2000
+    assert len(cube["articles"]["count"]) <= len(table["articles"])
+
+
+def test_filters_match_masked_counts(table):
+    cube = build_rollup_cube(table)
+    categories = [0, 2, 3]
+    sources = [1, 4, 7, 9]
+    start, end = date(2026, 2, 16), date(2026, 2, 22)
+    day = table["article_day"]
+    mask = (
+        np.isin(table["article_category"], categories)
+        & np.isin(table["article_source"], sources)
+        & (day >= start.toordinal())
+        & (day <= end.toordinal())
+    )
+    counts = query_cube(
+        cube, categories=categories, sources=sources, day_range=(start, end), keep=("category", "source")
+    )
+    assert np.array_equal(counts, dense_counts(table, mask)[np.ix_(categories, sources)])
+
+
+def test_day_axis_counts_dated_articles(table):
+    cube = build_rollup_cube(table)
+    per_day = query_cube(cube, day_range=(date(2019, 1, 1), date(2026, 12, 31)), keep=("day",))
+    dated = table["article_day"] >= 0
+    assert per_day.sum() == dated.sum()
+    assert per_day[0] == 1
+
+
+def test_story_measure_counts_latest_article(table):
+    cube = build_rollup_cube(table)
+    by_category = query_cube(cube, measure="stories", keep=("category",))
+    has_article = table["story_latest_article"] >= 0
+    assert np.array_equal(
+        by_category, np.bincount(table["story_category"][has_article], minlength=len(table["category_names"]))
+    )
+
+
+def test_masks_restrict_both_measures(table):
+    story_mask = np.zeros(len(table["stories"]), dtype=bool)
+    story_mask[::3] = True
+    cube = build_rollup_cube(table, story_mask[table["article_story"]], story_mask)
+    assert query_cube(cube) == int(story_mask[table["article_story"]].sum())
+    assert query_cube(cube, measure="stories") == int((story_mask & (table["story_latest_article"] >= 0)).sum())
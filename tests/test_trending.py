@@ -0,0 +1,109 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app import (
+    CATEGORY_NAMES,
+    TRENDING_HALF_LIFE_HOURS,
+    TRENDING_SOURCE_WEIGHT,
+    build_dataset,
+    get_trending_scores,
+    get_trending_state,
+    record_trending_articles,
+    validate_payload,
+)
+
+VERSIONS = itertools.count()
+
+
+@pytest.fixture(autouse=True)
+def trending_state():
+    get_trending_state.clear()
+    yield get_trending_state()
+    get_trending_state.clear()
+
+
+def article(article_id, source, published_at):
+    return {"id": article_id, "title": article_id, "source": source, "published_at": published_at}
+
+
+def make_dataset(*stories, run_at="2026-03-01T12:00:00"):
+    payload = {
+        "run_at": run_at,
+        "stats": {},
+        "categories": {
+            CATEGORY_NAMES[0]: {
+                "stories": [{"sub_cluster_id": story_id, "articles": articles} for story_id, articles in stories]
+            }
+        },
+    }
+    data, quality = validate_payload(payload)
+    return build_dataset(data, f"test-trending-{next(VERSIONS)}", quality)
+
+
+def scores_for(dataset):
+    state = get_trending_state()
+    record_trending_articles(state, dataset)
+    return get_trending_scores(dataset, dataset["version"], state["generation"])
+
+
+def test_fresh_article_counts_once_with_its_source():
+    dataset = make_dataset(("sc_1", [article("a1", "ET Auto", "2026-03-01T12:00:00")]))
+    assert scores_for(dataset) == pytest.approx([1.0 + TRENDING_SOURCE_WEIGHT])
+
+
+def test_scores_halve_per_half_life():
+    newest = "2026-03-01T12:00:00"
+    older = f"2026-03-01T{12 - int(TRENDING_HALF_LIFE_HOURS):02d}:00:00"
+    dataset = make_dataset(
+        ("sc_new", [article("a1", "ET Auto", newest)]),
+        ("sc_old", [article("a2", "ET Auto", older)]),
+    )
+    new_score, old_score = scores_for(dataset)
+    assert old_score == pytest.approx(new_score / 2)
+
+
+def test_source_counts_once_per_story_from_its_earliest_article():
+    dataset = make_dataset(
+        (
+            "sc_1",
+            [
+                article("a1", "ET Auto", "2026-03-01T12:00:00"),
+                article("a2", "ET Auto", "2026-03-01T00:00:00"),
+                article("a3", "Autocar", "2026-03-01T12:00:00"),
+            ],
+        )
+    )
+    half = 0.5 ** (12 / TRENDING_HALF_LIFE_HOURS)
+    expected = (1.0 + half + 1.0) + TRENDING_SOURCE_WEIGHT * (half + 1.0)
+    assert scores_for(dataset) == pytest.approx([expected])
+
+
+def test_reapplying_a_version_changes_nothing(trending_state):
+    dataset = make_dataset(("sc_1", [article("a1", "ET Auto", "2026-03-01T12:00:00")]))
+    first = scores_for(dataset).copy()
+    generation = trending_state["generation"]
+    record_trending_articles(trending_state, dataset)
+    assert trending_state["generation"] == generation
+    assert np.array_equal(scores_for(dataset), first)
+
+
+def test_reused_story_ids_do_not_share_velocity():
+    first_run = make_dataset(
+        ("sc_000001", [article(f"a{index}", "ET Auto", "2026-03-01T12:00:00") for index in range(5)])
+    )
+    scores_for(first_run)
+    # The next run numbers its stories from scratch, so an unrelated story
+    # gets the same sub_cluster_id.
+    second_run = make_dataset(("sc_000001", [article("b1", "Autocar", "2026-03-01T12:00:00")]))
+    assert scores_for(second_run) == pytest.approx([1.0 + TRENDING_SOURCE_WEIGHT])
+
+
+def test_undated_article_keeps_its_first_seen_time():
+    scores_for(make_dataset(("sc_1", [article("a1", "ET Auto", "")])))
+    later = make_dataset(
+        ("sc_9", [article("a1", "ET Auto", ""), article("a2", "ET Auto", "")]), run_at="2026-03-02T00:00:00"
+    )
+    half = 0.5 ** (12 / TRENDING_HALF_LIFE_HOURS)
+    assert scores_for(later) == pytest.approx([half + 1.0 + TRENDING_SOURCE_WEIGHT * half])
@@ -0,0 +1,105 @@
+import pytest
+
+from app import validate_payload
+
+
+def make_article(**overrides):
+    article = {
+        "id": "a1",
+        "title": "Nexon EV price cut",
+        "source": "Rushlane",
+        "published_at": "2026-02-26T10:00:00",
+        "url": "https://example.com/a1",
+        "auto_score": 0.9,
+        "category_confidence": 0.5,
+    }
+    article.update(overrides)
+    return article
+
+
+def make_payload(categories, **fields):
+    payload = {"run_at": "2026-02-26T13:29:37", "stats": {"total_input": 10, "total_automobile": 8}}
+    payload["categories"] = categories
+    payload.update(fields)
+    return payload
+
+
+@pytest.mark.parametrize("payload", [None, [], "results", 3])
+def test_non_object_payload_is_rejected(payload):
+    data, report = validate_payload(payload)
+    assert data is None
+    assert report["issues"] == {"payload not an object": 1}
+
+
+def test_valid_payload_reports_no_issues():
+    story = {"sub_cluster_id": "sc_1", "representative_title": "Nexon", "articles": [make_article()]}
+    payload = make_payload({"EV": {"total_articles": 1, "unique_stories": 1, "stories": [story]}})
+    data, report = validate_payload(payload)
+    assert report == {"categories": 1, "stories": 1, "articles": 1, "issues": {}}
+    assert data["categories"]["EV"]["stories"][0]["sources"] == ["Rushlane"]
+    assert data["stats"]["similarity_threshold"] == 0.85
+
+
+def test_fields_are_coerced_or_defaulted():
+    article = make_article(auto_score="0.75", category_confidence=1, is_representative="true", title=None)
+    article.pop("url")
+    story = {"sub_cluster_id": 17, "representative_title": "Nexon", "story_count": "2.0", "articles": [article]}
+    data, report = validate_payload(make_payload({"EV": {"stories": [story]}}))
+    story = data["categories"]["EV"]["stories"][0]
+    article = story["articles"][0]
+    assert (article["auto_score"], article["category_confidence"], article["is_representative"]) == (0.75, 1.0, True)
+    assert (article["title"], article["url"], story["sub_cluster_id"], story["story_count"]) == ("", "", "17", 2)
+    issues = report["issues"]
+    assert issues["article.auto_score coerced"] == 1
+    assert issues["article.title missing"] == 1
+    assert issues["article.url missing"] == 1
+    assert issues["story.sub_cluster_id coerced"] == 1
+
+
+def test_malformed_entries_are_dropped_and_counted():
+    stories = [
+        "not a story",
+        {"sub_cluster_id": "sc_1", "representative_title": "x", "articles": "nope"},
+        {"sub_cluster_id": "sc_2", "representative_title": "y", "articles": [make_article(), 5]},
+    ]
+    data, report = validate_payload(make_payload({"EV": {"stories": stories}, "Bad": [], "Sales": {"stories": {}}}))
+    assert list(data["categories"]) == ["EV", "Sales"]
+    assert [len(story["articles"]) for story in data["categories"]["EV"]["stories"]] == [0, 1]
+    assert report["stories"] == 2
+    assert report["articles"] == 1
+    for issue in ("story not an object", "story.articles not a list", "article not an object"):
+        assert report["issues"][issue] == 1
+    assert report["issues"]["category not an object"] == 1
+    assert report["issues"]["category.stories not a list"] == 1
+
+
+def test_category_totals_are_reconciled_with_the_stories():
+    story = {"sub_cluster_id": "sc_1", "representative_title": "x", "articles": [make_article(), make_article(id="a2")]}
+    payload = make_payload({"EV": {"total_articles": 9, "unique_stories": 4, "stories": [story]}})
+    data, report = validate_payload(payload)
+    assert (data["categories"]["EV"]["total_articles"], data["categories"]["EV"]["unique_stories"]) == (2, 1)
+    assert report["issues"]["category.total_articles reconciled"] == 1
+    assert report["issues"]["category.unique_stories reconciled"] == 1
+
+
+def test_colliding_category_names_are_merged():
+    first = {"sub_cluster_id": "sc_1", "representative_title": "x", "articles": [make_article()]}
+    second = {"sub_cluster_id": "sc_2", "representative_title": "y", "articles": [make_article(id="a2")] * 2}
+    data, report = validate_payload(make_payload({"EV": {"stories": [first]}, " EV\u0000": {"stories": [second]}}))
+    assert list(data["categories"]) == ["EV"]
+    merged = data["categories"]["EV"]
+    assert [story["sub_cluster_id"] for story in merged["stories"]] == ["sc_1", "sc_2"]
+    assert (merged["total_articles"], merged["unique_stories"]) == (3, 2)
+    assert (report["categories"], report["stories"], report["articles"]) == (1, 2, 3)
+    assert report["issues"]["category name merged"] == 1
+
+
+def test_stats_fall_back_to_counted_totals():
+    story = {"sub_cluster_id": "sc_1", "representative_title": "x", "articles": [make_article()]}
+    data, report = validate_payload(make_payload({"EV": {"stories": [story]}}, stats=None, run_at=20260226))
+    assert data["stats"]["total_input"] == 1
+    assert data["stats"]["total_automobile"] == 1
+    assert data["stats"]["unique_sources"] == 1
+    assert data["run_at"] is None
+    assert report["issues"]["run_at malformed"] == 1
+    assert "stats not an object" not in report["issues"]
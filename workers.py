@@ -0,0 +1,49 @@
+import re
+import zlib
+
+import numpy as np
+
+# Functions here run inside worker processes, so they must stay importable
+# without Streamlit and take only plain, picklable arguments.
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def get_text_shingles(title: str, preview: str, fallback: str):
+    title_words = WORD_PATTERN.findall(title.lower())
+    preview_words = WORD_PATTERN.findall(preview.lower())
+    shingles = {f"t:{word}" for word in title_words}
+    shingles.update(f"t:{first} {second}" for first, second in zip(title_words, title_words[1:]))
+    shingles.update(f"p:{first} {second}" for first, second in zip(preview_words, preview_words[1:]))
+    if not shingles:
+        shingles.add(f"id:{fallback}")
+    return np.fromiter((zlib.crc32(shingle.encode("ascii")) for shingle in shingles), dtype=np.uint64)
+
+
+def compute_minhash_chunk(texts, a, b, batch_size: int):
+    signatures = np.empty((len(texts), len(a)), dtype=np.uint32)
+    for start in range(0, len(texts), batch_size):
+        batch = [get_text_shingles(*text) for text in texts[start : start + batch_size]]
+        offsets = np.cumsum([0] + [len(shingles) for shingles in batch[:-1]])
+        hashed = (a * np.concatenate(batch)[None, :] + b) >> np.uint64(32)
+        signatures[start : start + len(batch)] = np.minimum.reduceat(hashed, offsets, axis=1).T
+    return signatures
+
+
+def match_entities(automaton, text: str):
+    transitions = automaton["transitions"]
+    failures = automaton["failures"]
+    outputs = automaton["outputs"]
+    node = 0
+    found = set()
+    for token in WORD_PATTERN.findall(text.lower()):
+        while node and token not in transitions[node]:
+            node = failures[node]
+        node = transitions[node].get(token, 0)
+        if outputs[node]:
+            found.update(outputs[node])
+    return found
+
+
+def match_entity_chunk(texts, automaton):
+    return [tuple(sorted(match_entities(automaton, text))) for text in texts]